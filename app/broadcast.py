@@ -0,0 +1,135 @@
+import asyncio
+import os
+from collections import deque
+from typing import AsyncGenerator, Deque, Optional, Set, Tuple
+
+
+# Server-sent events fan-out. Every subscriber (one per open /api/stream) gets its own bounded
+# deque; publish() appends a message reference to each without awaiting, so one slow
+# client can never stall the others: a subscriber whose queue is full is evicted and its
+# browser reconnects with Last-Event-ID. Recent messages are kept in a ring buffer for that
+# replay. Event ids are '<epoch>-<seq>' where the epoch changes per process, so an id from
+# before a restart is recognised as a gap and answered with a 'reset' event.
+
+class Subscriber:
+    """Pending messages for one client plus the future its stream waits on when idle. Kept to a
+    deque and a slot per client (no asyncio.Queue) so thousands of idle streams stay cheap."""
+
+    __slots__ = ('pending', 'maxsize', 'waiter', 'evicted')
+
+    def __init__(self, maxsize: int) -> None:
+        self.pending: Deque[str] = deque()
+        self.maxsize = maxsize
+        self.waiter: Optional[asyncio.Future] = None
+        self.evicted = False
+
+    def push(self, message: str) -> bool:
+        """Queue a message; False if the client is already maxsize messages behind."""
+        if len(self.pending) >= self.maxsize:
+            return False
+        self.pending.append(message)
+        self.wake()
+        return True
+
+    def wake(self) -> None:
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+
+def format_event(data: str, event: Optional[str] = None, event_id: Optional[str] = None) -> str:
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in data.split('\n'))
+    return '\n'.join(lines) + '\n\n'
+
+
+class Hub:
+    """Pub/sub hub for SSE with bounded per-subscriber queues, replay and heartbeats."""
+
+    def __init__(self, queue_size: int = 32, history: int = 256, heartbeat_seconds: float = 15.0,
+                 retry_ms: int = 3000) -> None:
+        self.queue_size = queue_size
+        self.retry_ms = retry_ms
+        self.heartbeat_seconds = heartbeat_seconds
+        self.epoch = os.urandom(4).hex()
+        self._seq = 0
+        self._history: Deque[Tuple[int, str]] = deque(maxlen=history)
+        self._subscribers: Set[Subscriber] = set()
+        self.evictions = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, data: str, event: Optional[str] = None) -> str:
+        """Send a message to every subscriber. Returns its event id. Never blocks."""
+        self._seq += 1
+        event_id = f"{self.epoch}-{self._seq}"
+        # Formatted once; every queue holds a reference to the same string
+        message = format_event(data, event, event_id)
+        self._history.append((self._seq, message))
+        for sub in list(self._subscribers):
+            if not sub.push(message):
+                self._evict(sub)
+        return event_id
+
+    def _evict(self, sub: Subscriber) -> None:
+        self._subscribers.discard(sub)
+        sub.evicted = True
+        self.evictions += 1
+        # Drop the backlog; the client reconnects and replays from its last id instead
+        sub.pending.clear()
+        sub.wake()
+
+    def _replay(self, last_event_id: Optional[str]) -> Optional[list]:
+        """Messages after last_event_id, or None if they are no longer (or never were) buffered."""
+        epoch, _, seq = (last_event_id or '').partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if seq > self._seq:
+            return None
+        oldest = self._history[0][0] if self._history else self._seq + 1
+        if seq + 1 < oldest:
+            return None
+        return [message for s, message in self._history if s > seq]
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        sub = Subscriber(self.queue_size)
+        if last_event_id:
+            missed = self._replay(last_event_id)
+            if missed is None or len(missed) > self.queue_size:
+                # Too far behind (or from an earlier process): tell the client to refetch
+                missed = [format_event('gap', 'reset', f"{self.epoch}-{self._seq}")]
+            sub.pending.extend(missed)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self._subscribers.discard(sub)
+
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncGenerator[str, None]:
+        """SSE text for one client: replay after last_event_id, then live messages, with a comment
+        line as heartbeat when idle. The subscription lives exactly as long as the generator."""
+        loop = asyncio.get_running_loop()
+        sub = self.subscribe(last_event_id)
+        try:
+            yield f"retry: {self.retry_ms}\n\n"
+            while not sub.evicted:
+                if sub.pending:
+                    yield sub.pending.popleft()
+                    continue
+                sub.waiter = loop.create_future()
+                timer = loop.call_later(self.heartbeat_seconds, sub.wake)
+                try:
+                    await sub.waiter
+                finally:
+                    timer.cancel()
+                    sub.waiter = None
+                if not sub.pending and not sub.evicted:
+                    yield ': ping\n\n'
+        finally:
+            self.unsubscribe(sub)
@@ -1,9 +1,9 @@
 import argparse
-import asyncio
-import uvicorn
+import json
+import sys
 
-from .config import settings
-from .pipeline import refresh_event
+# Everything below argparse is imported inside the command that needs it, so `parlay --help`
+# and the lightweight commands start without loading asyncio, pydantic, uvicorn, numpy or bs4.
 
 
 def main():
@@ -18,16 +18,78 @@ def main():
     watch.add_argument('--host', default='127.0.0.1')
     watch.add_argument('--port', type=int, default=8000)
 
+    rescore = sub.add_parser('rescore', help='What-if: score stored events with a new rules table')
+    rescore.add_argument('--rules', required=True, help='Rules table (.json/.yaml)')
+    rescore.add_argument('--out', required=False, help='Write the diff report here instead of stdout')
+    rescore.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+
+    sub.add_parser('rules', help='Print the active scoring rules table')
+
+    score = sub.add_parser('score-teams', help='Score fantasy team rosters (NDJSON or CSV) in bulk')
+    score.add_argument('input', help="Rosters file, or '-' for stdin")
+    score.add_argument('--format', choices=('ndjson', 'csv'), default=None,
+                       help='Input format (default: from the file extension, else ndjson)')
+    score.add_argument('--out', required=False, help='Write NDJSON results here instead of stdout')
+    score.add_argument('--generation', required=False, help='Score against a published generation')
+    score.add_argument('--totals-only', action='store_true', help='Omit per-player breakdowns')
+
     args = parser.parse_args()
+    from .config import settings
 
     if args.cmd == 'once':
+        import asyncio
+        from .pipeline import refresh_event
         if args.event:
             settings.EVENT_URL = args.event
         asyncio.run(refresh_event())
     elif args.cmd == 'watch':
+        import uvicorn
         if args.event:
             settings.EVENT_URL = args.event
         uvicorn.run('app.server:app', host=args.host, port=args.port, reload=False)
+    elif args.cmd == 'rescore':
+        from .rules import load_rules
+        from .scoring import rescore_events
+        report = rescore_events(load_rules(args.rules), json_dir=settings.JSON_DIR, workers=args.workers)
+        for event, diff in report['events'].items():
+            print(f"{event}: {diff['players_changed']}/{diff['players']} players changed, "
+                  f"total {diff['total_current']} -> {diff['total_new']}", file=sys.stderr)
+        for warning in report['warnings']['new']:
+            print(f"warning: {warning}", file=sys.stderr)
+        text = json.dumps(report, indent=2, ensure_ascii=False)
+        if args.out:
+            with open(args.out, 'w', encoding='utf-8') as f:
+                f.write(text)
+        else:
+            print(text)
+    elif args.cmd == 'rules':
+        from .rules import active_ruleset
+        print(json.dumps(active_ruleset().spec, indent=2, ensure_ascii=False))
+    elif args.cmd == 'score-teams':
+        import time
+        from .storage import json_dumps
+        from .teams import load_points_table, parse_teams, score_teams, team_format
+        fmt = args.format or team_format(args.input)
+        if args.input == '-':
+            data = sys.stdin.buffer.read()
+        else:
+            with open(args.input, 'rb') as f:
+                data = f.read()
+        start = time.perf_counter()
+        try:
+            team_ids, rosters = parse_teams(data, fmt)
+        except ValueError as e:
+            parser.error(f"{args.input}: {e}")
+        results = score_teams(team_ids, rosters, load_points_table(args.generation), breakdown=not args.totals_only)
+        out = open(args.out, 'wb') if args.out else sys.stdout.buffer
+        try:
+            for record in results:
+                out.write(json_dumps(record) + b'\n')
+        finally:
+            if args.out:
+                out.close()
+        elapsed = time.perf_counter() - start
+        print(f"scored {len(rosters)} teams in {elapsed:.2f}s", file=sys.stderr)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from .generations import generation_dir, is_generation_id
+
+
+# Read-only columnar snapshot of a generation, written once by the publishing process and
+# memory-mapped by every worker. The joined roster and the merged points table are stored as .npy
+# structured arrays with fixed-width string fields, so np.load(mmap_mode='r') gives views onto the
+# page cache: N workers share one copy, and a worker that sees a new CURRENT only maps two files
+# instead of parsing and joining JSON. Generations are immutable, so the swap is the CURRENT flip.
+
+ROSTER_FILE = '_players.npy'
+POINTS_FILE = '_points.npy'
+
+ROSTER_STRINGS = ('name', 'event', 'role', 'team', 'agents')
+ROSTER_NUMBERS = ('ppg', 'cost', 'games_played', 'total_points', 'r2_0', 'acs', 'kast')
+INTEGER_FIELDS = ('games_played', 'total_points')
+
+
+def _string_dtype(values: List[str]) -> str:
+    return f"<U{max([1] + [len(v) for v in values])}"
+
+
+def _save(directory: str, name: str, array: np.ndarray) -> str:
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        np.save(f, array, allow_pickle=False)
+    path = os.path.join(directory, name)
+    os.replace(temp_path, path)
+    return path
+
+
+def roster_array(roster: List[dict]) -> np.ndarray:
+    strings = {}
+    for field in ROSTER_STRINGS:
+        values = []
+        for row in roster:
+            value = row.get(field)
+            if field == 'agents' and value is not None:
+                value = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+            values.append(value if isinstance(value, str) else '')
+        strings[field] = values
+    dtype = [(f, _string_dtype(strings[f])) for f in ROSTER_STRINGS] + [(f, 'f8') for f in ROSTER_NUMBERS]
+    array = np.empty(len(roster), dtype=dtype)
+    for field in ROSTER_STRINGS:
+        array[field] = strings[field]
+    for field in ROSTER_NUMBERS:
+        values = []
+        for row in roster:
+            try:
+                values.append(float(row.get(field)))
+            except (TypeError, ValueError):
+                values.append(np.nan)
+        array[field] = values
+    return array
+
+
+def write_columnar(directory: str, names: Iterable[str], source_dir: str) -> List[str]:
+    """Write the roster and points snapshot of the outputs `names` (read from source_dir) into a
+    generation directory being staged. Returns the file names written."""
+    from .players import build_roster, roster_inputs
+    from .teams import POINTS_SUFFIX, PointsTable, merge_points
+
+    names = sorted(names)
+    roster = build_roster(None, roster_inputs(None, names), base_dir=source_dir)
+    _save(directory, ROSTER_FILE, roster_array(roster))
+
+    table = PointsTable.from_points(merge_points(
+        os.path.join(source_dir, n) for n in names if n.endswith(POINTS_SUFFIX)))
+    points = np.empty(len(table.names), dtype=[
+        ('name', _string_dtype(list(table.names))),
+        ('key', _string_dtype(list(table.keys))),
+        ('points', 'f8'),
+    ])
+    points['name'] = table.names
+    points['key'] = table.keys
+    points['points'] = table.values[:-1]
+    _save(directory, POINTS_FILE, points)
+    return [ROSTER_FILE, POINTS_FILE]
+
+
+class MappedGeneration:
+    """Memory-mapped snapshot of one generation."""
+
+    def __init__(self, roster: np.ndarray, points: np.ndarray) -> None:
+        self.roster = roster
+        self.points = points
+
+    def roster_rows(self) -> List[dict]:
+        """Roster dicts in the shape players.build_roster returns, in the stored (PPG) order."""
+        from .players import PLAYER_FIELDS
+        columns = {f: self.roster[f].tolist() for f in ROSTER_STRINGS + ROSTER_NUMBERS}
+        rows = []
+        for i in range(len(self.roster)):
+            row = {}
+            for field in PLAYER_FIELDS:
+                value = columns[field][i]
+                if field in ROSTER_STRINGS:
+                    value = value or None
+                    if field == 'agents' and value is not None:
+                        value = json.loads(value)
+                elif value != value:  # NaN
+                    value = None
+                elif field in INTEGER_FIELDS and value.is_integer():
+                    value = int(value)
+                row[field] = value
+            rows.append(row)
+        return rows
+
+    def points_table(self):
+        from .teams import PointsTable
+        # Names and keys stay views onto the mapping; only the float column gains its zero slot
+        return PointsTable(self.points['name'], self.points['key'], np.append(self.points['points'], 0.0))
+
+
+@lru_cache(maxsize=4)
+def load_columnar(gen_id: Optional[str]) -> Optional[MappedGeneration]:
+    """Map a published generation's snapshot, or None if it has none (published before snapshots
+    existed, or not a generation)."""
+    if not gen_id or not is_generation_id(gen_id):
+        return None
+    directory = generation_dir(gen_id)
+    try:
+        roster = np.load(os.path.join(directory, ROSTER_FILE), mmap_mode='r', allow_pickle=False)
+        points = np.load(os.path.join(directory, POINTS_FILE), mmap_mode='r', allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+    return MappedGeneration(roster, points)
@@ -6,6 +6,7 @@ class Settings(BaseSettings):
     EVENT_URL: str = Field('', description="Default event URL to watch")
     EVENT_URLS: str = Field('', description="Comma-separated list of event URLs")
     POLL_SECONDS: int = Field(60, description="Background poll interval in seconds")
+    POLL_JITTER_SECONDS: float = Field(0.0, description="Random delay of up to this many seconds added to each poll")
     CONCURRENCY: int = Field(4, description="Max concurrent HTTP requests")
     JSON_DIR: str = Field('./json', description="Directory for JSON outputs (must remain ./json)")
     TIMEZONE: str = Field('America/New_York', description="Local timezone for daily run")
@@ -13,10 +14,31 @@ class Settings(BaseSettings):
     DAILY_RUN_AT: str = Field('09:00', description="Daily run time HH:MM 24h")
     SNAPSHOT_DIR: str = Field('./json/snapshots', description="Directory to store daily snapshots")
 
+    SCORING_RULES: str = Field('', description="Scoring rules table (.json/.yaml); empty uses the built-in rules")
+
     # New storage policy settings
     WRITE_POLICY: str = Field('replace', description="Write policy: replace | snapshot | both")
     SNAPSHOT_ENABLE: bool = Field(False, description="Hard disable snapshots by default")
     SNAPSHOT_RETENTION_DAYS: int = Field(7, description="Days to keep snapshots (only if enabled)")
+    GENERATION_RETENTION: int = Field(5, description="Published output generations to keep")
+    STATS_RECONCILE_SECONDS: int = Field(3600, description="Interval for recounting storage stats from disk")
+
+    # Server-sent events
+    SSE_QUEUE_SIZE: int = Field(32, description="Messages buffered per /api/stream client before it is dropped")
+    SSE_HISTORY: int = Field(256, description="Recent messages kept for Last-Event-ID replay")
+    SSE_HEARTBEAT_SECONDS: float = Field(15.0, description="Idle interval between SSE heartbeat comments")
+
+    # Matches that fail to refresh are retried with exponential backoff
+    RETRY_BASE_SECONDS: float = Field(60.0, description="Delay before the first retry of a failed match; doubles per failure")
+    RETRY_MAX_SECONDS: float = Field(3600.0, description="Longest delay between retries of a failed match")
+    RETRY_POLL_SECONDS: float = Field(30.0, description="Interval for retrying failed matches that are due")
+
+    REFRESH_DEBOUNCE_SECONDS: float = Field(2.0, description="Wait before an on-demand refresh starts; requests meanwhile join it")
+
+    # Multiple workers: one lease holder refreshes, the others relay its stream messages
+    LEADER_LEASE_SECONDS: float = Field(30.0, description="Refresher lease lifetime; a dead leader is replaced after this")
+    LEADER_HEARTBEAT_SECONDS: float = Field(10.0, description="Interval for renewing (or trying to take) the refresher lease")
+    NOTIFY_POLL_SECONDS: float = Field(1.0, description="Interval at which workers relay stream messages from other workers")
 
     # pydantic v2 settings config
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8')
@@ -1,9 +1,29 @@
-from typing import Dict, Iterable, List, Tuple
-import json
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
 import os
 
 import numpy as np
-from sklearn.linear_model import LinearRegression
+
+from .identity import player_index
+from .rules import RuleSet, active_ruleset
+from .state import get_cost_model_sums, record_cost_observations
+from .storage import write_json
+from .table import StatsTable, group_codes, load_stats_table
+
+
+# Costs are capped and rounded to the nearest half point, as on the fantasy game's price list
+MAX_COST = 15
+
+# Fallback coefficients (the original heuristic) until there are enough observations to fit
+DEFAULT_COST_MODEL = (0.62, 4.74)
+
+
+def _fit_from_sums(n: float, sx: float, sy: float, sxx: float, sxy: float) -> Tuple[float, float]:
+    """Closed-form least squares for Cost = a*PPG + b from its sufficient statistics."""
+    denom = n * sxx - sx * sx
+    if n < 2 or abs(denom) < 1e-12:
+        return DEFAULT_COST_MODEL
+    a = (n * sxy - sx * sy) / denom
+    return float(a), float((sy - a * sx) / n)
 
 
 def fit_cost_model(points_cost_rows: List[Tuple[float, float]]) -> Tuple[float, float]:
@@ -12,12 +32,136 @@ def fit_cost_model(points_cost_rows: List[Tuple[float, float]]) -> Tuple[float,
     Returns (a, b).
     """
     if not points_cost_rows:
-        # Default from existing code heuristic
-        return 0.62, 4.74
-    X = np.array([[ppg] for ppg, _ in points_cost_rows])
-    y = np.array([cost for _, cost in points_cost_rows])
-    reg = LinearRegression().fit(X, y)
-    return float(reg.coef_[0]), float(reg.intercept_)
+        return DEFAULT_COST_MODEL
+    x = np.array([ppg for ppg, _ in points_cost_rows], dtype=np.float64)
+    y = np.array([cost for _, cost in points_cost_rows], dtype=np.float64)
+    return _fit_from_sums(len(x), x.sum(), y.sum(), (x * x).sum(), (x * y).sum())
+
+
+def cost_model() -> Tuple[float, float]:
+    """(a, b) from the sufficient statistics in the state DB, seeded from the registry's PPG/Cost
+    pairs on first use. O(1): no observation rows are read."""
+    sums = get_cost_model_sums()
+    if sums is None:
+        from player_info import players
+        record_cost_observations({
+            f"registry:{name}": (float(p['PPG']), float(p['Cost'])) for name, p in players.items()
+            if isinstance(p, dict) and p.get('PPG') is not None and p.get('Cost') is not None
+        })
+        sums = get_cost_model_sums()
+    return _fit_from_sums(*sums)
+
+
+def observe_costs(event: str, entries: Iterable[dict]) -> int:
+    """Record this event's (PPG, listed cost) pairs for registry players as model observations,
+    keyed by event and player so a refresh replaces the previous values. Returns the count."""
+    from player_info import players
+    index = player_index()
+    observations: Dict[str, Tuple[float, float]] = {}
+    for entry in entries:
+        key = index.get(entry.get('name'))
+        if key is not None and players[key].get('Cost') is not None:
+            observations[f"{event}:{key}"] = (float(entry['ppg']), float(players[key]['Cost']))
+    if observations:
+        cost_model()  # make sure the registry seed lands before the first event's observations
+        record_cost_observations(observations)
+    return len(observations)
+
+
+def expected_costs(ppg: np.ndarray, model: Tuple[float, float]) -> np.ndarray:
+    a, b = model
+    return np.minimum(np.round((a * ppg + b) * 2) / 2, MAX_COST)
+
+
+def row_points(table: StatsTable, ruleset: RuleSet) -> Tuple[np.ndarray, np.ndarray]:
+    """Points per player-map: the stored 'score' where a row has one, else the rules score.
+    Returns (points, valid)."""
+    points, valid = ruleset.score_rows(table)
+    points = points.astype(np.float64)
+    scored = table.present('score')
+    points[scored] = table.numeric('score')[scored]
+    return points, valid | scored
+
+
+def event_stats_paths(event_slug: str, json_dir: str = './json') -> List[str]:
+    """Every stage *_stats.json written for an event slug."""
+    if not os.path.isdir(json_dir):
+        return []
+    prefix = f"{event_slug}_"
+    return sorted(
+        os.path.join(json_dir, name) for name in os.listdir(json_dir)
+        if name.startswith(prefix) and name.endswith('_stats.json')
+    )
+
+
+def compute_event_costs(event_stats: Mapping[str, Sequence[str]], json_dir: str = './json') -> List[str]:
+    """
+    Per-player PPG, games, total points and cost for every event in one pass.
+    event_stats maps an event name to its *_stats.json paths; each event gets '{event}_ppg_cost.json'.
+    Returns list of written file paths.
+    """
+    ruleset = active_ruleset()
+    events = [e for e, paths in event_stats.items() if any(os.path.exists(p) for p in paths)]
+    tables: List[StatsTable] = []
+    event_of_row: List[np.ndarray] = []
+    for idx, event in enumerate(events):
+        for path in event_stats[event]:
+            if os.path.exists(path):
+                table = load_stats_table(path)
+                tables.append(table)
+                event_of_row.append(np.full(len(table), idx, dtype=np.int64))
+    if not tables:
+        return []
+    table = StatsTable.concat(tables)
+    event_idx = np.concatenate(event_of_row)
+
+    points, valid = row_points(table, ruleset)
+    name_codes = table.codes('name')
+    keep = valid & table.present('name') & (name_codes != table.pool.lookup(''))
+
+    # One group per (event, player): interned codes are dense, so the pair packs into one int
+    stride = len(table.pool.values) + 1
+    groups, group_keys = group_codes(event_idx[keep] * stride + name_codes[keep])
+    totals = np.bincount(groups, weights=points[keep], minlength=len(group_keys))
+    games = np.bincount(groups, minlength=len(group_keys))
+    ppg = totals / np.maximum(games, 1)
+
+    # Feed this refresh's PPG back into the model, then price everyone with the refit coefficients
+    group_event = (group_keys // stride).tolist()
+    group_name = (group_keys % stride).tolist()
+    for idx, event in enumerate(events):
+        observe_costs(event, (
+            {'name': table.pool.get(code), 'ppg': float(ppg[g])}
+            for g, (e, code) in enumerate(zip(group_event, group_name)) if e == idx
+        ))
+    costs = expected_costs(ppg, cost_model())
+
+    # Org of a player's first row that names one
+    orgs: Dict[int, str] = {}
+    if table.has('org'):
+        org_codes = table.codes('org')[keep]
+        for g, code in zip(groups.tolist(), org_codes.tolist()):
+            if g not in orgs and code != -1:
+                orgs[g] = table.pool.get(code)
+
+    outputs: Dict[str, List[dict]] = {event: [] for event in events}
+    for g, (e, code) in enumerate(zip(group_event, group_name)):
+        total = float(totals[g])
+        entry = {
+            'name': table.pool.get(code),
+            'ppg': float(ppg[g]),
+            'cost': float(costs[g]),
+            'games_played': int(games[g]),
+            'total_points': int(total) if total.is_integer() else total,
+        }
+        if g in orgs:
+            entry['org'] = orgs[g]
+        outputs[events[e]].append(entry)
+
+    written: List[str] = []
+    for event, output in outputs.items():
+        written.extend(write_json(f"{event}_ppg_cost.json", output))
+    return written
 
 
 def compute_ppg_and_costs(event_json_paths: Iterable[str], json_dir: str = './json') -> List[str]:
@@ -26,53 +170,9 @@ def compute_ppg_and_costs(event_json_paths: Iterable[str], json_dir: str = './js
     Writes '{event}_ppg_cost.json' in the same json_dir.
     Returns list of written file paths.
     """
-    written: List[str] = []
+    event_stats: Dict[str, List[str]] = {}
     for path in event_json_paths:
-        if not os.path.exists(path):
-            continue
-        with open(path, encoding='utf-8') as f:
-            data = json.load(f)
-        player_points: Dict[str, float] = {}
-        player_games: Dict[str, int] = {}
-        for entry in data:
-            name = entry.get('name')
-            if not name:
-                continue
-            # PPG base on score per map
-            kp = 0  # not used directly; scores computed externally
-            player_points[name] = player_points.get(name, 0) + entry.get('score', 0) if 'score' in entry else player_points.get(name, 0)
-            player_games[name] = player_games.get(name, 0) + 1
-        # If entries had no 'score', compute via calc_score if fields present
-        if not any('score' in e for e in data):
-            try:
-                from score_calc import calc_score
-                for entry in data:
-                    name = entry.get('name')
-                    if not name:
-                        continue
-                    player_points[name] = player_points.get(name, 0) + calc_score(entry)
-            except Exception:
-                pass
-        player_ppg = {name: (player_points[name] / max(1, player_games.get(name, 1))) for name in player_points}
-        def expected_cost(ppg: float) -> float:
-            a, b = 0.62, 4.74
-            return a * ppg + b
-        output = []
-        for name in player_points:
-            ppg = player_ppg[name]
-            cost = round(expected_cost(ppg) * 2) / 2
-            cost = min(cost, 15)
-            output.append({
-                'name': name,
-                'ppg': ppg,
-                'cost': cost,
-                'games_played': player_games.get(name, 0),
-                'total_points': player_points[name],
-            })
         base = os.path.basename(path)
         event_name = base.replace('_all_stages_stats.json', '').replace('.json', '')
-        out_path = os.path.join(json_dir, f"{event_name}_ppg_cost.json")
-        with open(out_path, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
-        written.append(out_path)
-    return written
+        event_stats.setdefault(event_name, []).append(path)
+    return compute_event_costs(event_stats, json_dir=json_dir)
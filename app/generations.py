@@ -0,0 +1,295 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from .config import settings
+from .storage import SIDECAR_SUFFIXES, compute_content_hash, ensure_sidecars, file_digest
+
+
+# A generation is an immutable copy of every top-level JSON output, published at the end of a
+# refresh cycle. Files are hard-linked from JSON_DIR (copied if linking fails) into
+# JSON_DIR/generations/<id>/ together with a _manifest.json, and JSON_DIR/CURRENT is then
+# atomically replaced to point at the new id. Readers resolve files through a generation id,
+# so they never see stats from one refresh next to points from another. Precompressed sidecars
+# (name.gz / name.br) travel with their file and are listed under 'encodings' in the manifest.
+# Each generation also records a _delta.json: the players whose points or costs changed since
+# the generation it replaced ('base'), which the server pushes to clients on /api/stream, and a
+# memory-mappable columnar snapshot of the roster and points (app/columnar.py).
+
+GENERATIONS_DIR = 'generations'
+CURRENT_POINTER = 'CURRENT'
+MANIFEST_NAME = '_manifest.json'
+DELTA_NAME = '_delta.json'
+
+# Outputs that feed the per-player delta, and the fields kept from each entry
+POINTS_SUFFIX = '_points.json'
+COSTS_SUFFIX = '_ppg_cost.json'
+
+_GENERATION_ID = re.compile(r'^\d{8}T\d{6}-[0-9a-f]{8}$')
+
+# (inode, mtime_ns, size) of the CURRENT pointer -> id, so readers skip re-reading it when
+# unchanged. The pointer is replaced by rename, so a new inode marks a new pointer even when two
+# publishes land within the filesystem's mtime granularity and the ids have equal length.
+_current_cache: Tuple[Optional[Tuple[int, int, int]], Optional[str]] = (None, None)
+
+
+def _generations_root() -> str:
+    return os.path.join(settings.JSON_DIR, GENERATIONS_DIR)
+
+
+def _pointer_path() -> str:
+    return os.path.join(settings.JSON_DIR, CURRENT_POINTER)
+
+
+def generation_dir(gen_id: str) -> str:
+    return os.path.join(_generations_root(), gen_id)
+
+
+def is_generation_id(value: str) -> bool:
+    return bool(_GENERATION_ID.match(value or ''))
+
+
+def current_generation() -> Optional[str]:
+    """Id of the published generation, or None if nothing has been published yet."""
+    global _current_cache
+    try:
+        st = os.stat(_pointer_path())
+    except OSError:
+        return None
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    if _current_cache[0] == key:
+        return _current_cache[1]
+    try:
+        with open(_pointer_path(), 'r', encoding='utf-8') as f:
+            gen_id = f.read().strip()
+    except OSError:
+        return None
+    gen_id = gen_id if is_generation_id(gen_id) else None
+    _current_cache = (key, gen_id)
+    return gen_id
+
+
+@lru_cache(maxsize=32)
+def _load_manifest(gen_id: str) -> Optional[Dict]:
+    # Generations are immutable, so a manifest never needs re-reading once loaded
+    path = os.path.join(_generations_root(), gen_id, MANIFEST_NAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_generation_manifest(gen_id: Optional[str] = None) -> Optional[Dict]:
+    """Manifest of a generation (defaults to the current one)."""
+    gen_id = gen_id or current_generation()
+    if not gen_id or not is_generation_id(gen_id):
+        return None
+    manifest = _load_manifest(gen_id)
+    if manifest is None:
+        _load_manifest.cache_clear()
+    return manifest
+
+
+def list_generations() -> List[str]:
+    """Published generation ids, oldest first."""
+    root = _generations_root()
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root) if is_generation_id(name))
+
+
+def list_generation_files(gen_id: Optional[str] = None) -> List[str]:
+    """File names in a generation. Before the first publish, the top-level JSON_DIR files."""
+    manifest = read_generation_manifest(gen_id)
+    if manifest is not None:
+        return sorted(manifest['files'])
+    if gen_id or current_generation() or not os.path.isdir(settings.JSON_DIR):
+        return []
+    return sorted(
+        name for name in os.listdir(settings.JSON_DIR)
+        if name.endswith('.json') and os.path.isfile(os.path.join(settings.JSON_DIR, name))
+    )
+
+
+def generation_file_path(name: str, gen_id: Optional[str] = None) -> Optional[str]:
+    """Resolve a file name within a generation (defaults to the current one).
+    Only names listed in the manifest resolve, so callers may pass untrusted input."""
+    if gen_id is None:
+        gen_id = current_generation()
+        if gen_id is None:
+            # Nothing published yet; serve the working files
+            if name in list_generation_files():
+                return os.path.join(settings.JSON_DIR, name)
+            return None
+    manifest = read_generation_manifest(gen_id)
+    if manifest is None or name not in manifest['files']:
+        return None
+    return os.path.join(_generations_root(), gen_id, name)
+
+
+def generation_file_info(name: str, gen_id: Optional[str] = None) -> Optional[Dict]:
+    """Path, content hash and available sidecar encodings for a file in a generation."""
+    path = generation_file_path(name, gen_id)
+    if path is None:
+        return None
+    manifest = read_generation_manifest(gen_id)
+    if manifest is not None:
+        entry = manifest['files'][name]
+        return {'path': path, 'hash': entry['hash'], 'encodings': entry.get('encodings', [])}
+    # Working files before the first publish
+    encodings = [
+        enc for enc, suffix in SIDECAR_SUFFIXES.items()
+        if os.path.exists(path + suffix) and os.path.getmtime(path + suffix) >= os.path.getmtime(path)
+    ]
+    return {'path': path, 'hash': file_digest(path), 'encodings': encodings}
+
+
+def _read_json(path: str):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _player_values(name: str, data) -> Dict[str, object]:
+    """Per-player values of one output: points totals, or [ppg, cost] by player name key from a
+    cost file (the key the roster joins on, so a cost file's spelling need not match it)."""
+    if name.endswith(POINTS_SUFFIX):
+        return dict(data) if isinstance(data, dict) else {}
+    from .identity import name_key
+    values = {}
+    for entry in data if isinstance(data, list) else []:
+        if isinstance(entry, dict) and entry.get('name'):
+            values[name_key(entry['name'])] = [entry.get('ppg'), entry.get('cost')]
+    return values
+
+
+def _generation_delta(previous: Optional[Dict], files: Dict[str, Dict], new_dir: str) -> Dict:
+    """Changed per-player points and costs between the previous generation and the outputs about
+    to be published, read from new_dir (the staged copies, not the live files that may have moved
+    on since). Only files whose content hash changed are read. Points are grouped by file prefix
+    and costs by event (players.event_key), since the same player can be in several."""
+    from .players import event_key
+    delta = {'points': {}, 'costs': {}, 'removed': {'points': {}, 'costs': {}}}
+    old_files = previous['files'] if previous else {}
+    old_dir = os.path.join(_generations_root(), previous['generation']) if previous else None
+    names = sorted(n for n in set(files) | set(old_files) if n.endswith((POINTS_SUFFIX, COSTS_SUFFIX)))
+    for name in names:
+        old_hash = old_files.get(name, {}).get('hash')
+        new_hash = files.get(name, {}).get('hash')
+        if old_hash == new_hash:
+            continue
+        if name.endswith(POINTS_SUFFIX):
+            kind, group = 'points', name[:-len(POINTS_SUFFIX)]
+        else:
+            kind, group = 'costs', event_key(name[:-len(COSTS_SUFFIX)])
+        old = _player_values(name, _read_json(os.path.join(old_dir, name))) if old_hash else {}
+        new = _player_values(name, _read_json(os.path.join(new_dir, name))) if new_hash else {}
+        changed = {player: value for player, value in new.items() if old.get(player) != value}
+        removed = [player for player in old if player not in new]
+        if changed:
+            delta[kind].setdefault(group, {}).update(changed)
+        if removed:
+            delta['removed'][kind].setdefault(group, []).extend(removed)
+    return delta
+
+
+def read_generation_delta(gen_id: Optional[str] = None) -> Optional[Dict]:
+    """Per-player changes a generation introduced relative to its base, if recorded."""
+    gen_id = gen_id or current_generation()
+    if not gen_id or not is_generation_id(gen_id):
+        return None
+    return _read_json(os.path.join(_generations_root(), gen_id, DELTA_NAME))
+
+
+def publish_generation() -> Optional[str]:
+    """Publish the current top-level JSON_DIR outputs as a new generation and flip CURRENT to it.
+    Returns the new id, or None if the outputs are identical to the current generation."""
+    if not os.path.isdir(settings.JSON_DIR):
+        return None
+    files: Dict[str, Dict] = {}
+    for name in sorted(os.listdir(settings.JSON_DIR)):
+        path = os.path.join(settings.JSON_DIR, name)
+        if name.endswith('.json') and os.path.isfile(path):
+            files[name] = {
+                'hash': file_digest(path),
+                'bytes': os.path.getsize(path),
+                'encodings': ensure_sidecars(path),
+            }
+    if not files:
+        return None
+
+    current = read_generation_manifest()
+    if current is not None and current['files'] == files:
+        return None
+
+    created = datetime.now()
+    gen_id = f"{created.strftime('%Y%m%dT%H%M%S')}-{compute_content_hash(files)[:8]}"
+    root = _generations_root()
+    final_dir = os.path.join(root, gen_id)
+    if not os.path.isdir(final_dir):
+        os.makedirs(root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=root)
+        try:
+            for name, entry in files.items():
+                for suffix in [''] + [SIDECAR_SUFFIXES[enc] for enc in entry['encodings']]:
+                    src = os.path.join(settings.JSON_DIR, name + suffix)
+                    dst = os.path.join(staging, name + suffix)
+                    try:
+                        os.link(src, dst)
+                    except OSError:
+                        shutil.copyfile(src, dst)
+            # Memory-mappable roster/points snapshot for the server workers (app/columnar.py),
+            # built from the staged links so it matches the files published with it; an
+            # optimization only, so a failure here does not stop the publish
+            from .columnar import write_columnar
+            try:
+                columnar = write_columnar(staging, files, staging)
+            except Exception:
+                columnar = []
+            manifest = {
+                'generation': gen_id,
+                'previous': current['generation'] if current else None,
+                'created_at': created.isoformat(),
+                'files': files,
+                'columnar': columnar,
+            }
+            with open(os.path.join(staging, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            # Computed once here so the server can push changes instead of every client refetching
+            delta = _generation_delta(current, files, staging)
+            delta.update({'generation': gen_id, 'base': manifest['previous']})
+            with open(os.path.join(staging, DELTA_NAME), 'w', encoding='utf-8') as f:
+                json.dump(delta, f, ensure_ascii=False, separators=(',', ':'))
+            os.rename(staging, final_dir)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    # Atomic pointer flip
+    with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', delete=False, dir=settings.JSON_DIR) as f:
+        f.write(gen_id)
+        temp_path = f.name
+    os.replace(temp_path, _pointer_path())
+
+    prune_generations()
+    return gen_id
+
+
+def prune_generations() -> int:
+    """Delete generations beyond GENERATION_RETENTION, never the current one. Returns count deleted."""
+    keep = max(1, settings.GENERATION_RETENTION)
+    current = current_generation()
+    stale = [g for g in list_generations()[:-keep] if g != current]
+    for gen_id in stale:
+        shutil.rmtree(os.path.join(_generations_root(), gen_id), ignore_errors=True)
+    if stale:
+        _load_manifest.cache_clear()
+    return len(stale)
@@ -47,4 +47,10 @@ class HttpClient:
             self._client = None
 
 
+def parse_html(html: str):
+    """BeautifulSoup tree for a fetched page. bs4 is imported on first parse, not with the app."""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, 'html.parser')
+
+
 http = HttpClient(concurrency=settings.CONCURRENCY)
@@ -0,0 +1,97 @@
+import re
+from functools import lru_cache
+from typing import Dict, Generic, Iterable, Optional, TypeVar
+
+# Player identity: vlr, the registry (scripts/player_info.py) and older outputs spell the same
+# player differently ("Shiro (IGL)" vs "Shiro", "PatrickWHO/Deryeon" for a shared roster slot,
+# case differences). Names are reduced to a key once and looked up in a dict; a vlr player id,
+# when the page has one, wins over the name.
+
+_ROLE_SUFFIX = re.compile(r'\s*\(igl\)\s*$', re.IGNORECASE)
+_VLR_PLAYER_HREF = re.compile(r'/player/(\d+)')
+
+T = TypeVar('T')
+
+
+def name_key(name: Optional[str]) -> str:
+    """Comparable form of a player name: case-folded, role suffix and extra whitespace removed."""
+    if not name:
+        return ''
+    return ' '.join(_ROLE_SUFFIX.sub('', name).split()).casefold()
+
+
+def name_aliases(name: str) -> Iterable[str]:
+    """Extra keys a registry name answers to: each part of a slash compound like "yoman/Ash"."""
+    if '/' not in name:
+        return []
+    full = name_key(name)
+    return [k for k in dict.fromkeys(name_key(part) for part in name.split('/')) if k and k != full]
+
+
+def vlr_player_id(href: Optional[str]) -> Optional[str]:
+    """Numeric vlr id from a '/player/<id>/<slug>' link."""
+    match = _VLR_PLAYER_HREF.search(href or '')
+    return match.group(1) if match else None
+
+
+class NameIndex(Generic[T]):
+    """O(1) name -> value resolution over name keys and aliases, with vlr ids taking precedence.
+    A full name always beats an alias; an alias claimed by two values resolves to nothing."""
+
+    def __init__(self) -> None:
+        self._by_key: Dict[str, T] = {}
+        self._by_alias: Dict[str, T] = {}
+        self._ambiguous = set()
+        self._by_id: Dict[str, T] = {}
+
+    def add(self, value: T, name: str, aliases: Iterable[str] = (), vlr_id: Optional[str] = None) -> None:
+        key = name_key(name)
+        if key:
+            self._by_key[key] = value
+        for alias in aliases:
+            if alias in self._ambiguous:
+                continue
+            if alias in self._by_alias and self._by_alias[alias] != value:
+                del self._by_alias[alias]
+                self._ambiguous.add(alias)
+                continue
+            self._by_alias[alias] = value
+        if vlr_id:
+            self._by_id[vlr_id] = value
+
+    def _lookup(self, key: str) -> Optional[T]:
+        value = self._by_key.get(key)
+        return value if value is not None else self._by_alias.get(key)
+
+    def get(self, name: Optional[str], vlr_id: Optional[str] = None) -> Optional[T]:
+        """Value for a vlr id recorded with add(), else for the name. Never changes the index: a
+        name match is not proof the id belongs to that value (a substitute can share a name)."""
+        if vlr_id and vlr_id in self._by_id:
+            return self._by_id[vlr_id]
+        value = self._lookup(name_key(name))
+        if value is None and name and '/' in name:
+            for part in name.split('/'):
+                value = self._lookup(name_key(part))
+                if value is not None:
+                    break
+        return value
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+
+@lru_cache(maxsize=1)
+def player_index() -> NameIndex:
+    """Registry index: any spelling of a player -> their player_info key. Built once per process."""
+    from player_info import players
+    index: NameIndex = NameIndex()
+    for name in players:
+        index.add(name, name, name_aliases(name))
+    return index
+
+
+def registry_entry(name: Optional[str], vlr_id: Optional[str] = None) -> Optional[dict]:
+    """player_info record for a player name as spelled anywhere, or None."""
+    from player_info import players
+    key = player_index().get(name, vlr_id)
+    return players.get(key) if key is not None else None
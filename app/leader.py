@@ -0,0 +1,102 @@
+import asyncio
+import os
+import socket
+from typing import Callable, List, Optional, Tuple
+
+from .state import acquire_lease, add_notifications, get_notifications, last_notification_id, release_lease
+
+
+# With `uvicorn --workers N` every process runs the app's lifespan. Only the holder of the
+# 'refresher' lease scrapes, publishes and runs the daily job; the lease lives in the shared SQLite
+# state DB and is renewed every heartbeat, so a crashed leader is replaced once it expires. A
+# leader that cannot renew stops its tasks at once rather than risk two writers. Stream messages
+# go through the notifications table: every worker relays what the leader (or anyone) appends.
+
+LEASE_NAME = 'refresher'
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{os.urandom(3).hex()}"
+
+_leading = False
+
+# Messages waiting to be appended to the notifications table, and the task appending them
+_outbox: List[Tuple[str, Optional[str]]] = []
+_writer: Optional[asyncio.Task] = None
+
+
+def is_leader() -> bool:
+    return _leading
+
+
+def notify(data: str, event: Optional[str] = None, local: Optional[Callable[[str, Optional[str]], object]] = None) -> None:
+    """Send a stream message to the clients of every worker. `local` publishes to this process's
+    own clients right away; the relay skips messages this worker originated."""
+    global _writer
+    if local is not None:
+        local(data, event)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        add_notifications(WORKER_ID, [(data, event)])  # no event loop to keep responsive
+        return
+    # The SQLite write happens off the event loop; one writer task keeps messages in order and
+    # appends whatever accumulated meanwhile in one transaction
+    _outbox.append((data, event))
+    if _writer is None or _writer.done():
+        _writer = asyncio.create_task(_write_outbox())
+
+
+async def _write_outbox() -> None:
+    while _outbox:
+        batch = _outbox[:]
+        del _outbox[:len(batch)]
+        try:
+            await asyncio.to_thread(add_notifications, WORKER_ID, batch)
+        except Exception:
+            pass  # other workers miss these messages; their clients still get the next ones
+
+
+async def run_leader(start_tasks: Callable[[], List[asyncio.Task]], lease_seconds: float,
+                     heartbeat_seconds: float) -> None:
+    """Hold the refresher lease whenever possible and run start_tasks() while holding it."""
+    global _leading
+    tasks: List[asyncio.Task] = []
+    try:
+        while True:
+            try:
+                held = await asyncio.to_thread(acquire_lease, LEASE_NAME, WORKER_ID, lease_seconds)
+            except Exception:
+                held = False
+            if held and not tasks:
+                _leading = True
+                tasks = start_tasks()
+            elif not held and tasks:
+                _leading = False
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                tasks = []
+            await asyncio.sleep(heartbeat_seconds)
+    finally:
+        _leading = False
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                release_lease(LEASE_NAME, WORKER_ID)
+            except Exception:
+                pass
+
+
+async def relay_notifications(publish: Callable[[str, Optional[str]], object], poll_seconds: float) -> None:
+    """Forward messages other workers appended to this worker's stream clients."""
+    last_id = await asyncio.to_thread(last_notification_id)
+    while True:
+        await asyncio.sleep(poll_seconds)
+        try:
+            rows = await asyncio.to_thread(get_notifications, last_id)
+        except Exception:
+            continue
+        for row_id, origin, event, data in rows:
+            last_id = row_id
+            if origin != WORKER_ID:
+                publish(data, event)
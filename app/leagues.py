@@ -0,0 +1,288 @@
+import json
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .generations import current_generation, read_generation_delta
+from .identity import name_key
+from .state import (
+    get_league_generation,
+    get_league_teams,
+    get_league_teams_for_players,
+    list_leagues,
+    save_league_teams,
+    set_league_totals,
+)
+from .teams import load_points_table, score_teams
+
+
+# Persisted fantasy leagues. Teams and their totals live in SQLite with an inverted index
+# player -> teams; when a generation changes a few players' points, only the teams holding them
+# are rescored. Each league's standings are kept in memory in an order-statistics list, so a
+# total change, a team's rank and the start of a top-N page are all logarithmic.
+
+Entry = Tuple[float, str]  # (-total, team): sorts best first, ties by team id
+
+
+class _RankedList:
+    """Sorted list of entries with logarithmic insert, delete and position lookups. Entries are kept
+    in sorted buckets of up to 2*LOAD; a Fenwick tree over bucket sizes turns a bucket index into
+    the number of entries before it (and a position back into a bucket)."""
+
+    LOAD = 512
+
+    def __init__(self, entries: Iterable[Entry] = ()) -> None:
+        entries = sorted(entries)
+        self._buckets: List[List[Entry]] = [entries[i:i + self.LOAD] for i in range(0, len(entries), self.LOAD)]
+        self._maxes: List[Entry] = [b[-1] for b in self._buckets]
+        self._len = len(entries)
+        self._rebuild()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _rebuild(self) -> None:
+        n = len(self._buckets)
+        tree = [0] * (n + 1)
+        for i, bucket in enumerate(self._buckets, 1):
+            tree[i] += len(bucket)
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _grow(self, i: int, delta: int) -> None:
+        i += 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _before(self, i: int) -> int:
+        """Number of entries in buckets [0, i)."""
+        total = 0
+        while i:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, position: int) -> Tuple[int, int]:
+        """(bucket, offset) of the entry at a position."""
+        i, step = 0, 1 << (len(self._buckets).bit_length())
+        while step:
+            if i + step < len(self._tree) and self._tree[i + step] <= position:
+                i += step
+                position -= self._tree[i]
+            step >>= 1
+        return i, position
+
+    def add(self, entry: Entry) -> None:
+        if not self._buckets:
+            self._buckets, self._maxes, self._len = [[entry]], [entry], 1
+            self._rebuild()
+            return
+        i = min(bisect_left(self._maxes, entry), len(self._buckets) - 1)
+        bucket = self._buckets[i]
+        insort(bucket, entry)
+        self._maxes[i] = bucket[-1]
+        self._len += 1
+        if len(bucket) > 2 * self.LOAD:
+            self._buckets[i:i + 1] = [bucket[:self.LOAD], bucket[self.LOAD:]]
+            self._maxes[i:i + 1] = [bucket[self.LOAD - 1], bucket[-1]]
+            self._rebuild()
+        else:
+            self._grow(i, 1)
+
+    def remove(self, entry: Entry) -> None:
+        i = bisect_left(self._maxes, entry)
+        bucket = self._buckets[i]
+        del bucket[bisect_left(bucket, entry)]
+        self._len -= 1
+        if bucket:
+            self._maxes[i] = bucket[-1]
+            self._grow(i, -1)
+        else:
+            del self._buckets[i], self._maxes[i]
+            self._rebuild()
+
+    def index(self, entry: Entry) -> int:
+        """Number of entries that sort before `entry`."""
+        i = bisect_left(self._maxes, entry)
+        if i == len(self._buckets):
+            return self._len
+        return self._before(i) + bisect_left(self._buckets[i], entry)
+
+    def slice(self, start: int, stop: int) -> List[Entry]:
+        if start >= min(stop, self._len):
+            return []
+        i, offset = self._locate(start)
+        out: List[Entry] = []
+        while i < len(self._buckets) and len(out) < stop - start:
+            out.extend(self._buckets[i][offset:offset + stop - start - len(out)])
+            i, offset = i + 1, 0
+        return out
+
+
+class Leaderboard:
+    """Teams ordered by total (highest first, ties by team id)."""
+
+    def __init__(self, totals: Optional[Dict[str, float]] = None) -> None:
+        self.totals: Dict[str, float] = dict(totals or {})
+        self._order = _RankedList((-t, team) for team, t in self.totals.items())
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def set(self, team: str, total: float) -> None:
+        old = self.totals.get(team)
+        if old == total:
+            return
+        if old is not None:
+            self._order.remove((-old, team))
+        self.totals[team] = total
+        self._order.add((-total, team))
+
+    def rank(self, team: str) -> Optional[int]:
+        """1-based rank; tied teams share the rank of the first of them."""
+        total = self.totals.get(team)
+        if total is None:
+            return None
+        return self._order.index((-total,)) + 1
+
+    def top(self, n: int, offset: int = 0) -> List[Tuple[int, str, float]]:
+        """(rank, team, total) of the n teams after offset."""
+        rows = []
+        for neg_total, team in self._order.slice(offset, offset + n):
+            rows.append((self._order.index((neg_total,)) + 1, team, -neg_total))
+        return rows
+
+
+# league -> (generation the board reflects, league version, board). A board is only updated in
+# place by the write that produced the next version; if any other worker wrote in between, the
+# versions no longer line up and the board is reloaded from the state DB on next use.
+_boards: Dict[str, Tuple[Optional[str], int, Leaderboard]] = {}
+# Submissions score and write in a worker thread while the event loop reads standings
+_boards_lock = threading.RLock()
+
+
+def _number(value: float):
+    return int(value) if float(value).is_integer() else round(value, 2)
+
+
+def _score(rosters: Dict[str, List[str]], gen_id: Optional[str]) -> Dict[str, float]:
+    teams = list(rosters)
+    scored = score_teams(teams, [rosters[t] for t in teams], load_points_table(gen_id), breakdown=False)
+    return {r['team']: r['total'] for r in scored}
+
+
+def _update_board(league: str, totals: Dict[str, float], gen_id: Optional[str], version: int) -> None:
+    with _boards_lock:
+        cached = _boards.get(league)
+        if cached is None:
+            return
+        if cached[1] != version - 1:
+            del _boards[league]
+            return
+        board = cached[2]
+        for team, total in totals.items():
+            board.set(team, total)
+        _boards[league] = (gen_id, version, board)
+
+
+def rescore_league(league: str, gen_id: Optional[str] = None) -> int:
+    """Recompute every team of a league against a generation. Returns the number of teams."""
+    gen_id = gen_id or current_generation()
+    rosters = {team: json.loads(players) for team, players, _ in get_league_teams(league)}
+    totals = _score(rosters, gen_id)
+    version = set_league_totals(league, totals, gen_id)
+    _update_board(league, totals, gen_id, version)
+    return len(totals)
+
+
+def submit_teams(league: str, team_ids: Sequence[str], rosters: Sequence[Sequence[str]]) -> Dict:
+    """Add or replace teams in a league, scored against the current generation."""
+    gen_id = current_generation()
+    totals = _score(dict(zip(team_ids, rosters)), gen_id)
+    version = save_league_teams(league, [
+        (team, json.dumps(list(roster), ensure_ascii=False), {name_key(n) for n in roster}, totals[team])
+        for team, roster in zip(team_ids, rosters)
+    ], gen_id)
+    stored = get_league_generation(league)
+    if stored is not None and stored[0] != gen_id:
+        # The rest of the league was scored against an older generation; bring it level
+        rescore_league(league, gen_id)
+    else:
+        _update_board(league, totals, gen_id, version)
+    return {'league': league, 'teams': len(totals), 'generation': gen_id}
+
+
+def _changed_players(delta: Dict) -> Iterable[str]:
+    # Points changes are grouped by points file; a team's total depends on every file
+    names = [n for group in delta.get('points', {}).values() for n in group]
+    names += [n for group in delta.get('removed', {}).get('points', {}).values() for n in group]
+    return {name_key(n) for n in names}
+
+
+def apply_generation(gen_id: Optional[str] = None) -> Dict[str, int]:
+    """Bring every league to a newly published generation. Leagues one step behind are updated
+    from the generation's delta, touching only teams that hold a changed player; anything else
+    is rescored in full. Returns the number of teams rescored per league."""
+    gen_id = gen_id or current_generation()
+    delta = read_generation_delta(gen_id)
+    changed = _changed_players(delta) if delta else None
+    updated = {}
+    for league, league_gen in list_leagues():
+        if league_gen == gen_id:
+            continue
+        if delta is None or delta.get('base') != league_gen:
+            updated[league] = rescore_league(league, gen_id)
+            continue
+        rosters = {team: json.loads(players) for team, players in get_league_teams_for_players(league, changed)}
+        totals = _score(rosters, gen_id) if rosters else {}
+        version = set_league_totals(league, totals, gen_id)
+        _update_board(league, totals, gen_id, version)
+        updated[league] = len(totals)
+    return updated
+
+
+def leaderboard(league: str) -> Optional[Leaderboard]:
+    stored = get_league_generation(league)
+    if stored is None:
+        return None
+    with _boards_lock:
+        cached = _boards.get(league)
+        if cached is None or cached[1] != stored[1]:
+            board = Leaderboard({team: total for team, _, total in get_league_teams(league)})
+            cached = _boards[league] = (stored[0], stored[1], board)
+        return cached[2]
+
+
+def standings(league: str, top: int = 10, offset: int = 0) -> Optional[Dict]:
+    with _boards_lock:
+        board = leaderboard(league)
+        if board is None:
+            return None
+        return {
+            'league': league,
+            'generation': _boards[league][0],
+            'teams': len(board),
+            'standings': [
+                {'rank': rank, 'team': team, 'total': _number(total)}
+                for rank, team, total in board.top(top, offset)
+            ],
+        }
+
+
+def team_standing(league: str, team: str) -> Optional[Dict]:
+    with _boards_lock:
+        board = leaderboard(league)
+        rank = board.rank(team) if board is not None else None
+        if rank is None:
+            return None
+        return {
+            'league': league,
+            'generation': _boards[league][0],
+            'team': team,
+            'total': _number(board.totals[team]),
+            'rank': rank,
+            'teams': len(board),
+        }
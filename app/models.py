@@ -1,9 +1,19 @@
 from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel
 
-# Import data constants from existing files (keep originals)
-from agents_to_roles import agents_to_roles  # noqa: F401
-from player_info import players  # noqa: F401
+# Data constants from the existing scripts (keep originals). player_info is a large literal,
+# so both are imported on first attribute access (PEP 562) instead of with this module.
+_DATA_MODULES = {'agents_to_roles': 'agents_to_roles', 'players': 'player_info'}
+
+
+def __getattr__(name: str):
+    module = _DATA_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
 
 
 class EventMeta(BaseModel):
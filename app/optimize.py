@@ -0,0 +1,145 @@
+import heapq
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .identity import name_key
+
+
+# Best lineups under the team builder's rules: a budget, a fixed number of players per role
+# (a multi-role player like "DS" fills any one of its roles) and optionally a cap on players per
+# org. An exact backward DP over (role counts, remaining budget) gives, for every prefix of the
+# pool, the best score still reachable; a best-first search guided by that bound then pops
+# complete lineups in descending order, so the top K are found after a few thousand steps.
+# Constraints the DP does not model (org caps, one row per player across events) only make
+# the bound optimistic and are enforced during the search.
+
+DEFAULT_BUDGET = 65
+ROLE_QUOTAS: Dict[str, int] = {'D': 2, 'I': 2, 'S': 2, 'C': 2}
+MAX_LINEUPS = 50
+
+# Costs are half units (see costs.expected_costs); other costs are rounded up to this grid
+COST_SCALES = (1, 2, 4, 10)
+
+
+def _cost_units(costs: Sequence[float], budget: float) -> Tuple[np.ndarray, int]:
+    """Integer costs and budget on the coarsest grid that represents every cost exactly. Costs
+    finer than 0.1 are rounded up (and the budget down), which never admits an over-budget team."""
+    values = np.asarray(costs, dtype=np.float64)
+    for scale in COST_SCALES:
+        scaled = values * scale
+        if np.allclose(scaled, np.round(scaled)):
+            return np.round(scaled).astype(np.int64), int(math.floor(budget * scale + 1e-9))
+    scale = COST_SCALES[-1]
+    return np.ceil(values * scale - 1e-9).astype(np.int64), int(math.floor(budget * scale + 1e-9))
+
+
+class _States:
+    """Role-count vectors (0..quota per role) as mixed-radix integers."""
+
+    def __init__(self, quotas: Dict[str, int]) -> None:
+        self.roles = list(quotas)
+        self.radix = [quotas[r] + 1 for r in self.roles]
+        self.size = int(np.prod(self.radix))
+        self.strides = np.cumprod([1] + self.radix[:-1]).tolist()
+        counts = np.array(np.unravel_index(np.arange(self.size), self.radix[::-1], order='C'))[::-1]
+        self.full = sum((r - 1) * s for r, s in zip(self.radix, self.strides))
+        # Per role: states with room for one more player in it, and the state after adding one
+        self.src = [np.flatnonzero(counts[j] < self.radix[j] - 1) for j in range(len(self.roles))]
+        self.dst = [src + self.strides[j] for j, src in enumerate(self.src)]
+
+    def count(self, state: int, j: int) -> int:
+        return (state // self.strides[j]) % self.radix[j]
+
+
+def _completion_bounds(values: np.ndarray, costs: np.ndarray, options: List[List[int]],
+                       states: _States, budget: int) -> np.ndarray:
+    """best[i, s, b]: highest score players i.. can add from role state s with b budget left
+    (-inf if the quotas cannot be filled)."""
+    n = len(values)
+    best = np.full((n + 1, states.size, budget + 1), -np.inf)
+    best[n, states.full, :] = 0.0
+    for i in range(n - 1, -1, -1):
+        nxt, cur = best[i + 1], best[i]
+        cur[:] = nxt
+        c = costs[i]
+        if c > budget:
+            continue
+        for j in options[i]:
+            src, dst = states.src[j], states.dst[j]
+            cand = values[i] + nxt[dst, :budget + 1 - c]
+            np.maximum(cur[src, c:], cand, out=cand)
+            cur[src, c:] = cand
+    return best
+
+
+def optimize_lineups(players: Sequence[dict], budget: float = DEFAULT_BUDGET, k: int = 1,
+                     quotas: Optional[Dict[str, int]] = None,
+                     max_per_org: Optional[int] = None) -> List[dict]:
+    """Top-k lineups by total PPG from roster rows (name, role, ppg, cost, team, ...). Rows without
+    PPG, cost or a quota role are skipped; a player listed under several events is picked at most
+    once. Each lineup is {ppg, cost, players} with the role each player fills as 'slot'."""
+    quotas = dict(quotas or ROLE_QUOTAS)
+    states = _States(quotas)
+    pool = []
+    for row in players:
+        roles = [j for j, r in enumerate(states.roles) if r in (row.get('role') or '')]
+        if roles and row.get('ppg') is not None and row.get('cost') is not None:
+            pool.append((row, roles))
+    # Strong players first, so the search completes good lineups after few steps
+    pool.sort(key=lambda p: -p[0]['ppg'])
+    if not pool:
+        return []
+    rows = [p[0] for p in pool]
+    options = [p[1] for p in pool]
+    values = np.array([r['ppg'] for r in rows], dtype=np.float64)
+    costs, cap = _cost_units([r['cost'] for r in rows], budget)
+    if cap < 0:
+        return []
+    # No lineup costs more than its priciest possible members, so budget beyond that changes
+    # nothing; clamping keeps the DP table's size bounded by the pool, not by the request
+    slots = sum(quotas.values())
+    cap = min(cap, int(np.sort(costs)[-slots:].sum()))
+    best = _completion_bounds(values, costs, options, states, cap)
+
+    keys = [name_key(r['name']) for r in rows]
+    orgs = [(r.get('team') or '').casefold() for r in rows]
+    n = len(rows)
+    # Heap entries: (-bound, seq, i, state, budget left, value, picks); picks is (index, role) pairs
+    heap = [(-best[0, 0, cap], 0, 0, 0, cap, 0.0, ())]
+    seq = 1
+    found: List[dict] = []
+    seen = set()
+    while heap and len(found) < k:
+        neg_bound, _, i, state, left, value, picks = heapq.heappop(heap)
+        if neg_bound == np.inf:
+            break
+        if state == states.full:
+            members = frozenset(p for p, _ in picks)
+            if members in seen:
+                continue  # same players with multi-role players in different slots
+            seen.add(members)
+            found.append({
+                'ppg': round(value, 2),
+                'cost': float(sum(rows[p]['cost'] for p, _ in picks)),
+                'players': [dict(rows[p], slot=states.roles[j]) for p, j in picks],
+            })
+            continue
+        if i == n:
+            continue
+        children = [(state, left, value, picks)]
+        c = int(costs[i])
+        if c <= left and keys[i] not in {keys[p] for p, _ in picks}:
+            org_ok = max_per_org is None or not orgs[i] or \
+                sum(1 for p, _ in picks if orgs[p] == orgs[i]) < max_per_org
+            if org_ok:
+                for j in options[i]:
+                    if states.count(state, j) < quotas[states.roles[j]]:
+                        children.append((state + states.strides[j], left - c, value + float(values[i]), picks + ((i, j),)))
+        for child_state, child_left, child_value, child_picks in children:
+            bound = child_value + best[i + 1, child_state, child_left]
+            if bound > -np.inf:
+                heapq.heappush(heap, (-bound, seq, i + 1, child_state, child_left, child_value, child_picks))
+                seq += 1
+    return found
@@ -1,67 +1,183 @@
 import asyncio
-import json
 import os
-from typing import List, Tuple
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
 
 from .config import settings, configured_event_urls
 from .vlr_event import discover_matches
-from .vlr_match import fetch_match, content_hash, parse_overview_for_maps, parse_performance_all, parse_maps_with_players
-from .state import get_match_state, upsert_match_state
+from .vlr_match import fetch_match, content_hash, parse_performance_all, parse_match_table
+from .models import MatchMeta
+from .state import clear_match_failure, get_match_state, get_retry_entries, record_match_failure, upsert_match_state
 from .scoring import compute_points
+from .costs import compute_event_costs, event_stats_paths
 from .postprocess import build_player_display
-from .storage import write_json, cleanup_old_snapshots, get_storage_stats
+from .storage import write_json_bytes, cleanup_old_snapshots, get_storage_stats, snapshot_files
+from .generations import publish_generation
+from .leagues import apply_generation
+from .table import StatsTable, load_stats_table
 
 
 from typing import Optional
 
 
-async def refresh_event(event_url: Optional[str] = None) -> Tuple[int, List[str]]:
+def _publish() -> Optional[str]:
+    """Publish the outputs as a generation and move league standings onto it."""
+    gen_id = publish_generation()
+    if gen_id:
+        apply_generation(gen_id)
+    return gen_id
+
+
+# One refresh per event at a time, whoever started it (poller, daily job, /api/refresh)
+_event_locks: Dict[str, asyncio.Lock] = {}
+
+# Held while anything writes the top-level outputs or publishes them. Refreshes fetch and parse
+# their matches concurrently, then write stats -> points -> costs -> display under this lock in
+# one go, so a generation never holds one event's new stats with its old points.
+_outputs_lock = asyncio.Lock()
+
+ProgressCallback = Callable[[Dict], None]
+
+
+def event_lock(event_url: str) -> asyncio.Lock:
+    lock = _event_locks.get(event_url)
+    if lock is None:
+        lock = _event_locks[event_url] = asyncio.Lock()
+    return lock
+
+
+def event_slug(event_url: str) -> str:
+    parts = event_url.split('/')
+    return parts[5] if len(parts) > 5 else 'event'
+
+
+async def refresh_event(event_url: Optional[str] = None, publish: bool = True,
+                        progress: Optional[ProgressCallback] = None) -> Tuple[int, List[str]]:
     """Incremental refresh: discover matches, detect changes, parse and write json for changed ones only.
+    When publish is set, changed outputs are published as a new generation at the end.
+    progress, if given, is called with a dict per match ('match', 'status', 'done', 'total'); status
+    is 'unchanged', 'updated', 'failed' (with 'error' and 'attempts') or 'deferred' (with 'retry_at').
+    A match that fails is queued for retry instead of failing the event; a queued match is skipped
+    here until its backoff has passed. Waits for any refresh of the same event already in progress.
     Returns (num_changed, list_of_written_files)
     """
     event_url = event_url or settings.EVENT_URL
     if not event_url:
         return 0, []
+    async with event_lock(event_url):
+        return await _refresh_event(event_url, publish, progress or (lambda _: None))
+
+
+async def _refresh_event(event_url: str, publish: bool, progress: ProgressCallback) -> Tuple[int, List[str]]:
     matches = await discover_matches(event_url)
+    queued = {row[0]: row[6] for row in get_retry_entries(event_url)}
+    return await _refresh_matches(event_url, matches, queued, publish, progress)
+
+
+async def _fetch_match(m: MatchMeta, slug: str) -> Optional[Tuple[str, StatsTable, str]]:
+    """Fetch and parse one match. Returns (event_prefix, match rows, content digest), or None if
+    the match is unchanged. Nothing is written here."""
+    overview_html, perf_html = await fetch_match(m.url)
+    digest = content_hash(overview_html, perf_html)
+    prev = get_match_state(m.match_id)
+    if prev and prev[3] == digest:
+        return None  # no change
+    # parse minimal *_stats.json rows compatible with existing consumers
+    perf_all = parse_performance_all(perf_html)
+    match_table = parse_match_table(m.url, overview_html, perf_all)
+    # per-event stage stats json path like existing pipeline
+    stage = (m.stage or 'playoffs').replace(' ', '_')
+    return f"{slug}_{stage}", match_table, digest
+
+
+def _write_stage(event_prefix: str, tables: Dict[str, StatsTable]) -> List[str]:
+    """Merge parsed matches (by URL) into a stage file: replace their rows, keep every other match."""
+    stats_filename = f"{event_prefix}_stats.json"
+    stats_path = os.path.join(settings.JSON_DIR, stats_filename)
+    parts = list(tables.values())
+    if os.path.exists(stats_path):
+        existing = load_stats_table(stats_path)
+        keep = ~np.isin(existing.codes('match_url'), [existing.pool.lookup(url) for url in tables])
+        parts.insert(0, existing.take(keep))
+    # Use new storage system; the file is serialized from the columns, no row dicts in between
+    return write_json_bytes(stats_filename, StatsTable.concat(parts).to_json())
+
+
+async def _refresh_matches(event_url: str, matches: List[MatchMeta], queued: Dict[str, float],
+                           publish: bool, progress: ProgressCallback) -> Tuple[int, List[str]]:
+    """Refresh the given matches of one event, then recompute its points if any changed. queued
+    maps the URLs of matches in the retry queue to their next attempt time."""
     # Derive event slug for output filenames (keep ./json schema compatible)
-    parts = event_url.split('/')
-    event_slug = parts[5] if len(parts) > 5 else 'event'
-    changed_prefixes: List[str] = []
+    slug = event_slug(event_url)
+    # event_prefix -> match url -> parsed rows, written together once every match is fetched
+    staged: Dict[str, Dict[str, StatsTable]] = {}
+    digests: List[Tuple[MatchMeta, str]] = []
     written_files: List[str] = []
-    for m in matches:
-        overview_html, perf_html = await fetch_match(m.url)
-        digest = content_hash(overview_html, perf_html)
-        prev = get_match_state(m.match_id)
-        if prev and prev[3] == digest:
-            continue  # no change
-        # parse and write minimal *_stats.json compatible with existing consumers
-        perf_all = parse_performance_all(perf_html)
-        maps = parse_maps_with_players(m.url, overview_html, perf_all)
-        # write per-event stage stats json path like existing pipeline
-        stage = (m.stage or 'playoffs').replace(' ', '_')
-        event_prefix = f"{event_slug}_{stage}"
-        stats_filename = f"{event_prefix}_stats.json"
-        flat: List[dict] = []
-        for mp in maps:
-            for p in mp.players:
-                d = p.dict()
-                d['map_name'] = mp.map_name
-                d['match_url'] = m.url
-                flat.append(d)
-
-        # Use new storage system
-        written = write_json(stats_filename, flat)
-        written_files.extend(written)
-
-        upsert_match_state(m.match_id, m.url, digest, m.status or 'unknown')
-        changed_prefixes.append(event_prefix)
-
-    # recompute points for changed prefixes
-    if changed_prefixes:
-        written_files.extend(compute_points(changed_prefixes, json_dir=settings.JSON_DIR))
+    now = time.time()
+    for done, m in enumerate(matches, 1):
+        report = {'match': m.url, 'done': done, 'total': len(matches)}
+        if queued.get(m.url, 0) > now:
+            progress(dict(report, status='deferred', retry_at=queued[m.url]))
+            continue
+        try:
+            parsed = await _fetch_match(m, slug)
+        except Exception as e:
+            # One bad page or timeout only costs this match; the rest of the event still refreshes
+            error = f"{type(e).__name__}: {e}"
+            attempts, _ = record_match_failure(m.url, event_url, m.match_id, m.stage, m.status, error,
+                                               settings.RETRY_BASE_SECONDS, settings.RETRY_MAX_SECONDS)
+            progress(dict(report, status='failed', error=error, attempts=attempts))
+            continue
+        if m.url in queued:
+            clear_match_failure(m.url)
+        if parsed is None:
+            progress(dict(report, status='unchanged'))
+            continue
+        event_prefix, match_table, digest = parsed
+        staged.setdefault(event_prefix, {})[m.url] = match_table
+        digests.append((m, digest))
+        progress(dict(report, status='updated'))
+
+    if not staged:
+        return 0, written_files
+    async with _outputs_lock:
+        for event_prefix, tables in staged.items():
+            written_files.extend(_write_stage(event_prefix, tables))
+        # A match counts as seen only once its rows are on disk
+        for m, digest in digests:
+            upsert_match_state(m.match_id, m.url, digest, m.status or 'unknown')
+        # recompute points for changed prefixes
+        written_files.extend(compute_points(list(staged), json_dir=settings.JSON_DIR))
+        written_files.extend(compute_event_costs(
+            {slug: event_stats_paths(slug, settings.JSON_DIR)}, json_dir=settings.JSON_DIR))
         written_files.append(build_player_display(json_dir=settings.JSON_DIR))
-
-    return len(changed_prefixes), written_files
+        if publish:
+            _publish()
+
+    return len(digests), written_files
+
+
+async def retry_failed_matches(publish: bool = True,
+                               progress: Optional[ProgressCallback] = None) -> Tuple[int, List[str]]:
+    """Retry the queued matches whose backoff has passed, straight from their stored URLs (no
+    event discovery). Outputs are published once for all events. Returns (num_changed, written)."""
+    events = list(dict.fromkeys(row[1] for row in get_retry_entries(due_before=time.time())))
+    changed, written_files = 0, []
+    for event_url in events:
+        async with event_lock(event_url):
+            # Re-read under the lock: a refresh that just finished may have cleared or re-queued some
+            rows = get_retry_entries(event_url, due_before=time.time())
+            matches = [MatchMeta(match_id=r[2], url=r[0], stage=r[3], status=r[4]) for r in rows]
+            n, written = await _refresh_matches(
+                event_url, matches, {r[0]: r[6] for r in rows}, False, progress or (lambda _: None))
+        changed += n
+        written_files.extend(written)
+    if changed and publish:
+        async with _outputs_lock:
+            _publish()
+    return changed, written_files
 
 
 async def daily_refresh(event_urls: Optional[List[str]] = None) -> bool:
@@ -78,19 +194,17 @@ async def daily_refresh(event_urls: Optional[List[str]] = None) -> bool:
         print(f"Cleaned up {folders_deleted} old snapshot folders, reclaimed {bytes_reclaimed} bytes")
 
     for url in urls:
-        changed, written = await refresh_event(url)
+        changed, written = await refresh_event(url, publish=False)
         any_changes = any_changes or (changed > 0)
         written_any.extend(written)
 
+    # One generation for the whole cycle, so readers never see half of the events updated
+    async with _outputs_lock:
+        _publish()
+
     # Handle snapshots according to policy
     if settings.SNAPSHOT_ENABLE and settings.WRITE_POLICY in ('snapshot', 'both'):
-        from datetime import datetime
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        snapshot_root = os.path.join(settings.SNAPSHOT_DIR, date_str)
-        os.makedirs(snapshot_root, exist_ok=True)
-        files = []
-
-        # Copy points and stats files for event slugs
+        # Link points and stats files for event slugs into today's manifest
         slugs = []
         slug_variants = set()
         for url in urls:
@@ -100,28 +214,19 @@ async def daily_refresh(event_urls: Optional[List[str]] = None) -> bool:
             slug_variants.add(base)
             slug_variants.add(base.replace('-', '_'))
 
+        paths = []
         for name in os.listdir(settings.JSON_DIR):
-            if any(name.startswith(slug) for slug in slug_variants):
-                src = os.path.join(settings.JSON_DIR, name)
-                dst = os.path.join(snapshot_root, name)
-                try:
-                    with open(src, 'rb') as rf, open(dst, 'wb') as wf:
-                        wf.write(rf.read())
-                    files.append(name)
-                except Exception:
-                    pass
-
-        # Write manifest
-        manifest = {
-            'date': date_str,
-            'events': slugs,
-            'files': files,
-            'generated_at': datetime.now().isoformat(),
-        }
-        manifest_path = os.path.join(snapshot_root, '_manifest.json')
-        with open(manifest_path, 'w', encoding='utf-8') as f:
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
-        written_any.append(manifest_path)
+            src = os.path.join(settings.JSON_DIR, name)
+            if (any(name.startswith(slug) for slug in slug_variants)
+                    and name.endswith('.json') and os.path.isfile(src)):
+                paths.append(src)
+        try:
+            manifest_path = snapshot_files(paths, events=slugs)
+        except Exception as e:
+            print(f"Snapshot failed: {e}")
+            manifest_path = None
+        if manifest_path:
+            written_any.append(manifest_path)
 
     # Print storage report
     stats = get_storage_stats()
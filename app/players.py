@@ -0,0 +1,134 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .config import configured_event_urls
+from .generations import generation_file_path, list_generation_files
+from .identity import name_key, registry_entry
+
+
+# The roster the team pages need, joined server-side: per (event, player) the info from
+# <event>_players.json (team, role, rating, agents) and the PPG/cost from <event>_ppg_cost.json.
+# Built once per set of input files and kept sorted by PPG, so a request is a filter + slice.
+
+INFO_SUFFIX = '_players.json'
+COSTS_SUFFIX = '_ppg_cost.json'
+
+# Fields a roster row can carry; `fields=` projects onto a subset
+PLAYER_FIELDS = (
+    'name', 'event', 'role', 'team', 'ppg', 'cost', 'games_played', 'total_points',
+    'r2_0', 'acs', 'kast', 'agents',
+)
+
+
+def event_key(prefix: str) -> str:
+    """Event a file prefix belongs to. The pipeline names files after the vlr slug ('-') and the
+    scripts use '_', so both spellings of an event map to one key."""
+    return prefix.replace('-', '_')
+
+
+def configured_event_prefixes() -> List[str]:
+    """Event keys of the configured events."""
+    keys = []
+    for url in configured_event_urls():
+        parts = url.split('/')
+        keys.append(event_key(parts[5] if len(parts) > 5 else 'event'))
+    return list(dict.fromkeys(keys))
+
+
+def roster_inputs(gen_id: Optional[str], names: Optional[Iterable[str]] = None) -> List[Tuple[str, str, str]]:
+    """(event, kind, file name) of the info and cost files that make up the roster, sorted.
+    All events in the generation (or in `names`) when none are configured."""
+    prefixes = configured_event_prefixes()
+    inputs = []
+    for name in list_generation_files(gen_id) if names is None else names:
+        for kind, suffix in (('info', INFO_SUFFIX), ('costs', COSTS_SUFFIX)):
+            if name.endswith(suffix):
+                event = event_key(name[:-len(suffix)])
+                if not prefixes or event in prefixes:
+                    inputs.append((event, kind, name))
+    return sorted(inputs)
+
+
+def _load(name: str, gen_id: Optional[str], base_dir: Optional[str] = None):
+    path = os.path.join(base_dir, name) if base_dir else generation_file_path(name, gen_id)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, TypeError, ValueError):
+        return None
+
+
+def build_roster(gen_id: Optional[str], inputs: Sequence[Tuple[str, str, str]],
+                 base_dir: Optional[str] = None) -> List[dict]:
+    """Join info and cost outputs per event by player name key. Sorted by PPG (missing last), then name.
+    Files are read from the generation, or from base_dir when given (outputs not yet published)."""
+    rows: Dict[Tuple[str, str], dict] = {}
+
+    def row_for(event: str, name: str) -> dict:
+        key = (event, name_key(name))
+        if key not in rows:
+            rows[key] = {'name': name, 'event': event}
+        return rows[key]
+
+    for event, kind, file_name in inputs:
+        data = _load(file_name, gen_id, base_dir)
+        if kind == 'info' and isinstance(data, dict):
+            for name, info in data.items():
+                if not isinstance(info, dict):
+                    continue
+                row = row_for(event, name)
+                row['name'] = name  # the info file's spelling is the display name
+                for field in ('team', 'role', 'r2_0', 'acs', 'kast', 'agents'):
+                    if field in info:
+                        row[field] = info[field]
+        elif kind == 'costs' and isinstance(data, list):
+            for entry in data:
+                if not isinstance(entry, dict) or not entry.get('name'):
+                    continue
+                row = row_for(event, entry['name'])
+                row['ppg'] = entry.get('ppg')
+                row['cost'] = entry.get('actual_cost', entry.get('cost'))
+                for field in ('games_played', 'total_points'):
+                    if field in entry:
+                        row[field] = entry[field]
+                if 'team' not in row and entry.get('org'):
+                    row['team'] = entry['org']
+
+    roster = []
+    for row in rows.values():
+        if not row.get('role'):
+            info = registry_entry(row['name'])
+            row['role'] = info.get('Role') if info else None
+        roster.append({field: row.get(field) for field in PLAYER_FIELDS})
+    roster.sort(key=lambda r: (r['ppg'] is None, -(r['ppg'] or 0), r['name'].casefold()))
+    return roster
+
+
+def query_roster(roster: List[dict], role: Optional[str] = None, event: Optional[str] = None,
+                 min_cost: Optional[float] = None, max_cost: Optional[float] = None,
+                 names: Optional[Iterable[str]] = None) -> List[dict]:
+    """Rows matching every given filter, in roster order. role matches any letter of a
+    multi-role player ('DI' is both Duelist and Initiator)."""
+    wanted = {name_key(n) for n in names} if names else None
+    event = event_key(event) if event else None
+    out = []
+    for row in roster:
+        if role and not (row['role'] and role.upper() in row['role']):
+            continue
+        if event and row['event'] != event:
+            continue
+        if min_cost is not None and (row['cost'] is None or row['cost'] < min_cost):
+            continue
+        if max_cost is not None and (row['cost'] is None or row['cost'] > max_cost):
+            continue
+        if wanted is not None and name_key(row['name']) not in wanted:
+            continue
+        out.append(row)
+    return out
+
+
+def project(rows: List[dict], fields: Optional[Sequence[str]]) -> List[dict]:
+    if not fields:
+        return rows
+    return [{f: row[f] for f in fields} for row in rows]
@@ -1,46 +1,102 @@
 import json
 import os
+from typing import Dict, List, Tuple
 
-from player_info import players as base_players
-from .storage import write_json
+from .identity import name_key, player_index, registry_entry
+from .storage import file_digest, write_json
 
 
-def build_player_display(json_dir: str = './json') -> str:
-    """Merge player costs with player_info to produce player_display.json in repo root (compat with original).
-    Prefers 'player_costs.json' if present, fallback to first '*_ppg_cost.json'.
-    Returns written file path.
-    """
-    costs_path = 'player_costs.json'
-    costs = None
-    if os.path.exists(costs_path):
-        with open(costs_path, 'r', encoding='utf-8') as f:
-            costs = json.load(f)
-    else:
-        # try any ppg_cost file
-        for name in os.listdir(json_dir):
-            if name.endswith('_ppg_cost.json'):
-                with open(os.path.join(json_dir, name), 'r', encoding='utf-8') as f:
-                    costs = json.load(f)
-                break
-    if costs is None:
-        costs = []
-    players_lower = {k.lower(): v for k, v in base_players.items()}
-    merged = []
-    for p in costs:
-        name = p.get('name')
+DISPLAY_FILENAME = 'player_display.json'
+LEGACY_COSTS_PATH = 'player_costs.json'
+
+# Incremental state for player_display.json: content hash of every cost input, the display
+# entries each input contributes (by player key), and the merged result in output order.
+_display_state: Dict[str, Dict] = {'digests': {}, 'entries': {}, 'merged': {}}
+
+
+def _display_inputs(json_dir: str) -> List[Tuple[str, str]]:
+    """(event, path) of every cost output, lowest priority first: the legacy player_costs.json,
+    then each *_ppg_cost.json by modification time, so the most recently refreshed event wins
+    for a player who appears in several."""
+    inputs: List[Tuple[str, str]] = []
+    if os.path.exists(LEGACY_COSTS_PATH):
+        inputs.append(('', LEGACY_COSTS_PATH))
+    if os.path.isdir(json_dir):
+        paths = [
+            os.path.join(json_dir, name) for name in os.listdir(json_dir)
+            if name.endswith('_ppg_cost.json')
+        ]
+        paths.sort(key=lambda p: (os.path.getmtime(p), p))
+        inputs.extend((os.path.basename(p)[:-len('_ppg_cost.json')], p) for p in paths)
+    return inputs
+
+
+def _display_entries(event: str, path: str) -> Dict[str, dict]:
+    """Display entries from one cost output, keyed by registry name (or name key if unknown)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        costs = json.load(f)
+    index = player_index()
+    entries: Dict[str, dict] = {}
+    for p in costs if isinstance(costs, list) else []:
+        name = p.get('name') if isinstance(p, dict) else None
         if not name:
             continue
-        info = players_lower.get(name.lower())
-        role = info.get('Role') if info and isinstance(info, dict) else None
-        merged.append({
+        info = registry_entry(name)
+        entries[index.get(name) or name_key(name)] = {
             'name': name,
             'ppg': p.get('ppg', 0),
             'cost': p.get('actual_cost', p.get('cost', 0)),
-            'role': role,
+            'role': info.get('Role') if info and isinstance(info, dict) else None,
             'org': p.get('org', ''),
-        })
+            'event': event,
+            'games_played': p.get('games_played', 0),
+        }
+    return entries
+
+
+def build_player_display(json_dir: str = './json') -> str:
+    """Maintain player_display.json in repo root (compat with original) as a keyed merge of every
+    event's cost output plus the role registry. Only players from inputs whose content changed are
+    re-merged, and the file is written once, only when the merged list changed.
+    Returns the display file path.
+    """
+    state = _display_state
+    inputs = _display_inputs(json_dir)
+    digests = {path: file_digest(path) for _, path in inputs}
+
+    touched = set()
+    for path in [p for p in state['entries'] if p not in digests]:
+        touched.update(state['entries'].pop(path))
+        state['digests'].pop(path, None)
+    for event, path in inputs:
+        if state['digests'].get(path) == digests[path] and path in state['entries']:
+            continue
+        try:
+            entries = _display_entries(event, path)
+        except (OSError, ValueError):
+            continue
+        touched.update(state['entries'].get(path, {}))
+        touched.update(entries)
+        state['entries'][path] = entries
+        state['digests'][path] = digests[path]
+
+    if not touched and os.path.exists(DISPLAY_FILENAME):
+        return DISPLAY_FILENAME
+
+    merged = state['merged']
+    # New players are appended in input order, so the output is stable across restarts
+    ordered = dict.fromkeys(k for _, path in inputs for k in state['entries'].get(path, {}) if k in touched)
+    for key in list(ordered) + [k for k in touched if k not in ordered]:
+        winner = None
+        for _, path in inputs:
+            entry = state['entries'].get(path, {}).get(key)
+            if entry is not None:
+                winner = entry
+        if winner is None:
+            merged.pop(key, None)
+        else:
+            merged[key] = winner
 
     # Use new storage system - write to repo root for compatibility
-    out_filename = 'player_display.json'
-    written = write_json(out_filename, merged)
-    return written[0] if written else out_filename
+    written = write_json(DISPLAY_FILENAME, list(merged.values()))
+    return written[0] if written else DISPLAY_FILENAME
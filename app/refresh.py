@@ -0,0 +1,82 @@
+import asyncio
+import json
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+# On-demand refreshes. Requests for an event are coalesced into one job: a job waits
+# `debounce_seconds` before it starts, and every request that arrives meanwhile joins it. A
+# request that arrives while the event's job is already running queues exactly one follow-up
+# job, so changes published mid-run are still picked up. Progress is emitted as 'refresh'
+# stream messages (one per match, plus queued/started/finished).
+
+RunRefresh = Callable[[str, Callable[[Dict], None]], Awaitable[Tuple[int, List[str]]]]
+
+# Finished jobs kept for GET /api/refresh
+HISTORY = 20
+
+
+class RefreshCoordinator:
+    def __init__(self, run: RunRefresh, emit: Callable[[str, Optional[str]], object],
+                 debounce_seconds: float = 2.0) -> None:
+        self.run = run
+        self.emit = emit
+        self.debounce_seconds = debounce_seconds
+        self._queued: Dict[str, Dict] = {}
+        self._running: Dict[str, Dict] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._finished: List[Dict] = []
+
+    def _send(self, job: Dict, **fields) -> None:
+        message = {'job': job['id'], 'event': job['event'], 'state': job['state'], **fields}
+        try:
+            self.emit(json.dumps(message, ensure_ascii=False), 'refresh')
+        except Exception:
+            pass  # progress is best effort; never fail the refresh over it
+
+    def request(self, event_url: str) -> Dict:
+        """Queue a refresh of one event, joining the queued job if there is one."""
+        job = self._queued.get(event_url)
+        if job is not None:
+            job['requests'] += 1
+            return dict(job, coalesced=True)
+        job = {
+            'id': os.urandom(6).hex(),
+            'event': event_url,
+            'state': 'queued',
+            'requests': 1,
+            'requested_at': time.time(),
+        }
+        self._queued[event_url] = job
+        if event_url not in self._workers:
+            self._workers[event_url] = asyncio.create_task(self._work(event_url))
+        self._send(job, after=self._running[event_url]['id'] if event_url in self._running else None)
+        return dict(job, coalesced=False)
+
+    async def _work(self, event_url: str) -> None:
+        try:
+            while event_url in self._queued:
+                await asyncio.sleep(self.debounce_seconds)
+                job = self._queued.pop(event_url)
+                job.update(state='running', started_at=time.time())
+                self._running[event_url] = job
+                self._send(job)
+                try:
+                    changed, _ = await self.run(event_url, lambda p: self._send(job, **p))
+                    job.update(state='finished', changed=changed)
+                except Exception as e:
+                    job.update(state='failed', error=str(e))
+                job['finished_at'] = time.time()
+                del self._running[event_url]
+                self._finished = (self._finished + [job])[-HISTORY:]
+                self._send(job, changed=job.get('changed'), error=job.get('error'))
+        finally:
+            self._workers.pop(event_url, None)
+
+    def status(self) -> Dict:
+        return {
+            'queued': list(self._queued.values()),
+            'running': list(self._running.values()),
+            'finished': list(reversed(self._finished)),
+        }
@@ -0,0 +1,237 @@
+import json
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .table import NUMERIC_COLUMNS, STRING_COLUMNS, StatsTable
+
+
+# Scoring rules as data. Each rule reads one column of a player-map row and adds points:
+#   bands   first matching band wins; a band matches on 'eq' or an inclusive 'min'/'max' range and
+#           scores 'points', plus value // 'per' + 'offset' when 'per' is set
+#   linear  value * 'weight'
+#   flag    'points' when the value is truthy
+#   lookup  'table'[value], 0 for anything not in the table
+# Version 1 reproduces score_calc.calc_score exactly, including its rating tiers that can never
+# fire (>= 1.5 is checked before >= 1.75 and >= 2); compile_rules reports those as warnings.
+DEFAULT_RULES: Dict = {
+    'version': 1,
+    'rules': [
+        {'name': 'kills', 'field': 'kills', 'type': 'bands', 'bands': [
+            {'eq': 0, 'points': -3},
+            {'min': 1, 'max': 4, 'points': -1},
+            {'min': 10, 'per': 5, 'offset': -1},
+        ]},
+        {'name': 'four_kills', 'field': '4K', 'type': 'linear', 'weight': 1},
+        {'name': 'aces', 'field': '5K', 'type': 'linear', 'weight': 3},
+        {'name': 'map_win', 'field': 'won_map', 'type': 'flag', 'points': 1},
+        {'name': 'map_differential', 'field': 'map_differential', 'type': 'bands', 'bands': [
+            {'eq': 13, 'points': 5},
+            {'eq': -13, 'points': -5},
+            {'min': 10, 'points': 2},
+            {'min': 5, 'max': 9, 'points': 1},
+            {'max': -10, 'points': -1},
+        ]},
+        {'name': 'series', 'field': 'series_score', 'type': 'lookup', 'table': {'2-0': 2, '3-0': 4, '3-1': 1}},
+        {'name': 'rating', 'field': 'r2_0', 'type': 'bands', 'bands': [
+            {'min': 1.5, 'points': 1},
+            {'min': 1.75, 'points': 2},
+            {'min': 2, 'points': 3},
+        ]},
+        {'name': 'overall_rank', 'field': 'overall_rank', 'type': 'bands', 'bands': [
+            {'eq': 1, 'points': 3},
+            {'eq': 2, 'points': 2},
+            {'eq': 3, 'points': 1},
+        ]},
+    ],
+}
+
+RULE_TYPES = ('bands', 'linear', 'flag', 'lookup')
+
+
+def _band_interval(band: Dict) -> Tuple[float, float]:
+    if 'eq' in band:
+        return float(band['eq']), float(band['eq'])
+    return float(band.get('min', -np.inf)), float(band.get('max', np.inf))
+
+
+def _is_integral(value) -> bool:
+    return float(value).is_integer()
+
+
+class RuleSet:
+    """A compiled scoring table. score() evaluates every rule over whole columns in one pass."""
+
+    def __init__(self, spec: Dict) -> None:
+        if not isinstance(spec, dict) or not isinstance(spec.get('rules'), list):
+            raise ValueError("scoring rules must be a mapping with a 'rules' list")
+        self.spec = spec
+        self.version = spec.get('version')
+        self.rules: List[Dict] = []
+        self.warnings: List[str] = []
+        self.field_types: Dict[str, str] = {}
+        integral = True
+        for i, rule in enumerate(spec['rules']):
+            kind = rule.get('type')
+            field = rule.get('field')
+            name = rule.get('name') or f"rule {i}"
+            if kind not in RULE_TYPES:
+                raise ValueError(f"{name}: unknown rule type {kind!r}")
+            if not field:
+                raise ValueError(f"{name}: missing 'field'")
+            column_kind = 'lookup' if kind == 'lookup' else 'flag' if kind == 'flag' else 'number'
+            if self.field_types.setdefault(field, column_kind) != column_kind:
+                raise ValueError(f"{name}: field {field!r} is used as both {self.field_types[field]} and {column_kind}")
+
+            if kind == 'bands':
+                bands = rule.get('bands') or []
+                intervals = [_band_interval(b) for b in bands]
+                for j, (lo, hi) in enumerate(intervals):
+                    if any(plo <= lo and phi >= hi for plo, phi in intervals[:j]):
+                        self.warnings.append(f"{name}: band {j} ({bands[j]}) is unreachable")
+                    band = bands[j]
+                    integral &= _is_integral(band.get('points', 0)) and _is_integral(band.get('offset', 0))
+                    if 'per' in band and float(band['per']) <= 0:
+                        raise ValueError(f"{name}: band {j} 'per' must be positive")
+                self.rules.append({'type': kind, 'field': field, 'bands': bands, 'intervals': intervals})
+            elif kind == 'linear':
+                integral &= _is_integral(rule.get('weight', 1))
+                self.rules.append({'type': kind, 'field': field, 'weight': float(rule.get('weight', 1))})
+            elif kind == 'flag':
+                integral &= _is_integral(rule.get('points', 1))
+                self.rules.append({'type': kind, 'field': field, 'points': float(rule.get('points', 1))})
+            else:
+                table = rule.get('table') or {}
+                integral &= all(_is_integral(v) for v in table.values())
+                # Code 0 is "not in table"; code k is the k-th table key
+                codes = {key: k for k, key in enumerate(table, start=1)}
+                points = np.array([0.0] + [float(v) for v in table.values()])
+                self.rules.append({'type': kind, 'field': field, 'codes': codes, 'points': points})
+        # Whole-number tables score as int64 so totals stay ints in the JSON outputs
+        self.dtype = np.int64 if integral else np.float64
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.field_types)
+
+    def _extract_table(self, table: StatsTable) -> Optional[Tuple[Dict[str, np.ndarray], np.ndarray]]:
+        """Columns straight from a StatsTable, or None if a rule reads a field the table cannot type."""
+        columns: Dict[str, np.ndarray] = {}
+        for field, kind in self.field_types.items():
+            if kind == 'lookup' and field in STRING_COLUMNS:
+                codes = next(r['codes'] for r in self.rules if r['type'] == 'lookup' and r['field'] == field)
+                # One entry per interned string, plus a trailing 0 that NULL_CODE (-1) lands on
+                lut = np.array([codes.get(v, 0) for v in table.pool.values] + [0], dtype=np.int64)
+                columns[field] = lut[table.codes(field)]
+            elif kind != 'lookup' and (field in NUMERIC_COLUMNS or not table.has_key(field)):
+                values = table.numeric(field) if field in NUMERIC_COLUMNS else np.zeros(len(table))
+                columns[field] = values != 0 if kind == 'flag' else values
+            else:
+                return None
+        return columns, ~table.invalid
+
+    def extract(self, rows: Sequence[dict]) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """Pull this table's columns out of player-map rows or a StatsTable (missing/None count as 0
+        like calc_score). Returns (columns, valid) where valid is False for rows with unusable values."""
+        if isinstance(rows, StatsTable):
+            extracted = self._extract_table(rows)
+            if extracted is not None:
+                return extracted
+            rows = rows.to_rows()
+        n = len(rows)
+        columns: Dict[str, np.ndarray] = {}
+        lookups = {r['field']: r['codes'] for r in self.rules if r['type'] == 'lookup'}
+        for field, kind in self.field_types.items():
+            # Lookup codes run to the table's size, so a big table must not wrap a narrow int
+            dtype = np.int32 if kind == 'lookup' else bool if kind == 'flag' else np.float64
+            columns[field] = np.zeros(n, dtype=dtype)
+        valid = np.ones(n, dtype=bool)
+        items = list(self.field_types.items())
+        for i, row in enumerate(rows):
+            try:
+                for field, kind in items:
+                    if kind == 'number':
+                        columns[field][i] = float(row.get(field, 0) or 0)
+                    elif kind == 'flag':
+                        columns[field][i] = bool(row.get(field, False))
+                    else:
+                        columns[field][i] = lookups[field].get(row.get(field, ''), 0)
+            except (TypeError, ValueError):
+                valid[i] = False
+        return columns, valid
+
+    def _lookup_codes(self, rule: Dict, column: np.ndarray) -> np.ndarray:
+        if column.dtype.kind in 'iub':
+            return column
+        # Raw values: map each distinct value once
+        uniques, inverse = np.unique(column.astype(str), return_inverse=True)
+        lookup = np.array([rule['codes'].get(u, 0) for u in uniques], dtype=np.int64)
+        return lookup[inverse]
+
+    def score(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Points per player-map for whole columns."""
+        n = len(next(iter(columns.values()))) if columns else 0
+        score = np.zeros(n, dtype=np.float64)
+        for rule in self.rules:
+            column = np.asarray(columns[rule['field']])
+            if rule['type'] == 'bands':
+                values = column.astype(np.float64, copy=False)
+                conditions = []
+                choices = []
+                for band, (lo, hi) in zip(rule['bands'], rule['intervals']):
+                    conditions.append((values >= lo) & (values <= hi))
+                    points = float(band.get('points', 0))
+                    if 'per' in band:
+                        choices.append(np.floor_divide(values, float(band['per'])) + float(band.get('offset', 0)) + points)
+                    else:
+                        choices.append(points)
+                score += np.select(conditions, choices, 0.0)
+            elif rule['type'] == 'linear':
+                score += column.astype(np.float64, copy=False) * rule['weight']
+            elif rule['type'] == 'flag':
+                score += column.astype(bool, copy=False) * rule['points']
+            else:
+                score += rule['points'][self._lookup_codes(rule, column)]
+        return score.astype(self.dtype) if self.dtype is np.int64 else score
+
+    def score_rows(self, rows: Sequence[dict]) -> Tuple[np.ndarray, np.ndarray]:
+        columns, valid = self.extract(rows)
+        return self.score(columns), valid
+
+
+def load_rules(path: str) -> Dict:
+    """Read a rules table from .json or .yaml/.yml."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:  # pragma: no cover
+                raise RuntimeError('PyYAML is required for YAML rules files (pip install pyyaml)')
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def compile_rules(spec: Dict) -> RuleSet:
+    return RuleSet(spec)
+
+
+@lru_cache(maxsize=8)
+def _compiled_from_path(path: str, mtime: float) -> RuleSet:
+    return compile_rules(load_rules(path))
+
+
+_default_ruleset: Optional[RuleSet] = None
+
+
+def active_ruleset() -> RuleSet:
+    """The rules in effect: SCORING_RULES if configured, else the built-in table."""
+    global _default_ruleset
+    from .config import settings
+    path = settings.SCORING_RULES
+    if path:
+        return _compiled_from_path(os.path.abspath(path), os.path.getmtime(path))
+    if _default_ruleset is None:
+        _default_ruleset = compile_rules(DEFAULT_RULES)
+    return _default_ruleset
@@ -1,38 +1,225 @@
 import asyncio
-from datetime import datetime, time, timedelta
-from typing import Awaitable, Callable
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
 try:
     from zoneinfo import ZoneInfo  # Python 3.9+
 except Exception:  # pragma: no cover
     ZoneInfo = None  # type: ignore
 
+from .state import get_job_states, record_job_end, record_job_skipped, record_job_start, set_job_next_run
+
+
+# Background jobs on wall-clock schedules. A trigger maps "the last scheduled time" to the next
+# one, so a fixed-rate job fires at start + k*period however long each run takes (no drift), and
+# cron-style jobs fire at matching local minutes. Every run is recorded in the state DB; on startup
+# a job with catch_up set runs once right away if its last recorded schedule has a slot that was
+# missed while the process was down. A firing that finds the job already at max_concurrency is
+# recorded as skipped rather than piling up.
+
+
+def _zone(tz_name: Optional[str]):
+    if ZoneInfo is None or not tz_name:
+        # Fallback: assume local time
+        return None
+    return ZoneInfo(tz_name)
+
 
 def seconds_until(time_str: str, tz_name: str) -> float:
     """Return seconds from now until the next occurrence of HH:MM in tz.
     time_str: 'HH:MM' 24h.
     tz_name: IANA tz name.
     """
-    if ZoneInfo is None:
-        # Fallback: assume local time
-        tz = None
-    else:
-        tz = ZoneInfo(tz_name)
-    now = datetime.now(tz)
-    hh, mm = [int(x) for x in time_str.split(":", 1)]
-    target_today = now.replace(hour=hh, minute=mm, second=0, microsecond=0)
-    if target_today <= now:
-        target_today = target_today + timedelta(days=1)
-    delta = target_today - now
-    return max(0.0, delta.total_seconds())
-
-
-async def run_daily(task: Callable[[], Awaitable[bool]], time_str: str, tz_name: str) -> None:
-    """Run task once per day at specified local time. Sleeps until next run, executes, repeats."""
-    while True:
-        delay = seconds_until(time_str, tz_name)
-        await asyncio.sleep(delay)
+    return max(0.0, Cron.daily(time_str, tz_name).next_after(time.time()) - time.time())
+
+
+class FixedRate:
+    """Every `seconds`, anchored on the first scheduled time. immediate: first run at start."""
+
+    def __init__(self, seconds: float, immediate: bool = True) -> None:
+        self.seconds = float(seconds)
+        self.immediate = immediate
+
+    def first(self, now: float) -> float:
+        return now if self.immediate else now + self.seconds
+
+    def next_after(self, scheduled: float) -> float:
+        return scheduled + self.seconds
+
+    def __repr__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+def _cron_field(spec: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in spec.split(','):
+        part, _, step = part.partition('/')
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(x) for x in part.split('-', 1))
+        else:
+            start = end = int(part)
+        if start < low or end > high or start > end:
+            raise ValueError(f"cron field {spec!r} out of range {low}-{high}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return values
+
+
+class Cron:
+    """Five-field cron expression (minute hour day-of-month month day-of-week) in a timezone.
+    Supports '*', lists, ranges and steps; day-of-week 0 and 7 are Sunday. As in cron, when both
+    day fields are restricted a day matching either one fires."""
+
+    def __init__(self, expr: str, tz_name: Optional[str] = None) -> None:
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        self.tz = _zone(tz_name)
+        self.minutes = sorted(_cron_field(fields[0], 0, 59))
+        self.hours = sorted(_cron_field(fields[1], 0, 23))
+        self.days = _cron_field(fields[2], 1, 31)
+        self.months = _cron_field(fields[3], 1, 12)
+        self.weekdays = {d % 7 for d in _cron_field(fields[4], 0, 7)}
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    @classmethod
+    def daily(cls, time_str: str, tz_name: Optional[str] = None) -> 'Cron':
+        hh, mm = [int(x) for x in time_str.split(':', 1)]
+        return cls(f"{mm} {hh} * * *", tz_name)
+
+    def first(self, now: float) -> float:
+        return self.next_after(now)
+
+    def _day_matches(self, day: datetime) -> bool:
+        if day.month not in self.months:
+            return False
+        dom = day.day in self.days
+        dow = (day.isoweekday() % 7) in self.weekdays
+        if self._any_day or self._any_weekday:
+            return dom and dow
+        return dom or dow
+
+    def next_after(self, scheduled: float) -> float:
+        now = datetime.fromtimestamp(scheduled, self.tz)
+        day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        for _ in range(366 * 5):
+            if self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate > now:
+                            return candidate.timestamp()
+            day = (day + timedelta(days=1)).replace(hour=0, minute=0)
+        raise ValueError(f"cron expression never fires: {self.expr!r}")
+
+    def __repr__(self) -> str:
+        return f"cron {self.expr!r}"
+
+
+class Job:
+    def __init__(self, name: str, trigger, func: Callable[[], Awaitable[Any]], max_concurrency: int = 1,
+                 jitter_seconds: float = 0.0, catch_up: bool = False) -> None:
+        self.name = name
+        self.trigger = trigger
+        self.func = func
+        self.max_concurrency = max_concurrency
+        self.jitter_seconds = jitter_seconds
+        self.catch_up = catch_up
+        self.running = 0
+        self.next_run: Optional[float] = None
+
+
+class Scheduler:
+    def __init__(self) -> None:
+        self.jobs: Dict[str, Job] = {}
+
+    def add(self, name: str, trigger, func: Callable[[], Awaitable[Any]], **options) -> Job:
+        job = self.jobs[name] = Job(name, trigger, func, **options)
+        return job
+
+    async def _execute(self, job: Job, run_id: int) -> None:
+        status, error = 'ok', None
+        try:
+            await job.func()
+        except asyncio.CancelledError:
+            status = 'cancelled'
+            raise
+        except Exception as e:
+            status, error = 'failed', f"{type(e).__name__}: {e}"
+        finally:
+            job.running -= 1
+            await asyncio.to_thread(record_job_end, run_id, status, error)
+
+    def _fire(self, job: Job, scheduled: float, tasks: Set[asyncio.Task]) -> None:
+        if job.running >= job.max_concurrency:
+            record_job_skipped(job.name, scheduled, f"{job.running} run(s) still in progress")
+            return
+        # Recorded before the task exists, so a run cancelled at any point still gets its end row
+        run_id = record_job_start(job.name, scheduled)
+        job.running += 1
+        task = asyncio.create_task(self._execute(job, run_id))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    async def _loop(self, job: Job) -> None:
+        tasks: Set[asyncio.Task] = set()
+        now = time.time()
+        state = (await asyncio.to_thread(get_job_states)).get(job.name, {})
+        last = state.get('last_scheduled')
+        scheduled = job.trigger.first(now)
+        if job.catch_up and last is not None and job.trigger.next_after(last) < now:
+            # Missed at least one slot while down: run once now, then resume the schedule
+            self._fire(job, now, tasks)
         try:
-            await task()
-        except Exception:
-            # swallow and continue
-            pass
+            while True:
+                job.next_run = scheduled
+                await asyncio.to_thread(set_job_next_run, job.name, scheduled)
+                delay = scheduled - time.time()
+                if job.jitter_seconds:
+                    delay += random.uniform(0, job.jitter_seconds)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._fire(job, scheduled, tasks)
+                following = job.trigger.next_after(scheduled)
+                now = time.time()
+                if following <= now:
+                    # Fell behind (suspend, overlong sleep): skip the missed slots, keep the phase
+                    while following <= now:
+                        following = job.trigger.next_after(following)
+                scheduled = following
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self) -> None:
+        """Run every job until cancelled."""
+        await asyncio.gather(*(self._loop(job) for job in self.jobs.values()))
+
+    def status(self) -> Dict[str, Dict]:
+        """Per job: trigger, next and last run times (ISO, UTC offset included) and last outcome."""
+        states = get_job_states()
+        out = {}
+        for name, job in self.jobs.items():
+            state = states.get(name, {})
+            next_run = job.next_run or state.get('next_run')
+            out[name] = {
+                'trigger': repr(job.trigger),
+                'running': job.running,
+                'next_run': iso_time(next_run),
+                'last_run': iso_time(state.get('last_started')),
+                'last_finished': iso_time(state.get('last_finished')),
+                'last_status': state.get('last_status'),
+                'last_error': state.get('last_error'),
+            }
+        return out
+
+
+def iso_time(ts: Optional[float]) -> Optional[str]:
+    """Epoch seconds as local ISO time with UTC offset (None stays None)."""
+    return datetime.fromtimestamp(ts).astimezone().isoformat(timespec='seconds') if ts else None
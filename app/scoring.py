@@ -1,15 +1,53 @@
-from typing import Iterable, List
-import json
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
 from score_calc import calc_score as _calc_score
+from .rules import RuleSet, active_ruleset, compile_rules
 from .storage import write_json
+from .table import StatsTable, group_codes, load_stats_table
 
 
 def calc_score(player: dict) -> int:
     return _calc_score(player)
 
 
+def stats_columns(rows: Sequence[dict], ruleset: Optional[RuleSet] = None) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """Extract the scoring columns from player-map rows with calc_score's defaults applied.
+    Returns (columns, valid) where valid is False for rows calc_score would fail on."""
+    return (ruleset or active_ruleset()).extract(rows)
+
+
+def score_columns(columns: Dict[str, np.ndarray], ruleset: Optional[RuleSet] = None) -> np.ndarray:
+    """Vectorized scoring over whole columns with the active rules (calc_score by default).
+    Lookup columns such as series_score may be codes from stats_columns or raw strings."""
+    return (ruleset or active_ruleset()).score(columns)
+
+
+def score_rows(rows: Sequence[dict], ruleset: Optional[RuleSet] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Score player-map rows in one vectorized pass. Returns (points, valid)."""
+    return (ruleset or active_ruleset()).score_rows(rows)
+
+
+def _player_totals(stats, ruleset: RuleSet) -> Dict[str, float]:
+    """Total points per player name, in first-seen order. stats is a StatsTable or a list of rows."""
+    table = stats if isinstance(stats, StatsTable) else StatsTable.from_rows(r for r in stats if isinstance(r, dict))
+    points, valid = ruleset.score_rows(table)
+    # Keep going on bad records: unnamed or unscorable rows are dropped
+    name_codes = table.codes('name')
+    keep = valid & table.present('name') & (name_codes != table.pool.lookup(''))
+    groups, group_names = group_codes(name_codes[keep])
+    totals = np.bincount(groups, weights=points[keep], minlength=len(group_names)).astype(ruleset.dtype)
+    return {table.pool.get(code): total for code, total in zip(group_names.tolist(), totals.tolist())}
+
+
+def event_totals(stats_path: str, ruleset: Optional[RuleSet] = None) -> Dict[str, float]:
+    """Total points per player of one *_stats.json, exactly as compute_points writes them."""
+    return _player_totals(load_stats_table(stats_path), ruleset or active_ruleset())
+
+
 def compute_points(changed_event_prefixes: Iterable[str], json_dir: str = './json') -> List[str]:
     """
     Recompute *_points.json for impacted events only.
@@ -17,27 +55,63 @@ def compute_points(changed_event_prefixes: Iterable[str], json_dir: str = './jso
     Returns list of updated points file paths.
     """
     updated: List[str] = []
+    ruleset = active_ruleset()
     prefixes = list(dict.fromkeys(changed_event_prefixes))
     for prefix in prefixes:
         stats_path = os.path.join(json_dir, f"{prefix}_stats.json")
         points_filename = f"{prefix}_points.json"
         if not os.path.exists(stats_path):
             continue
-        with open(stats_path, 'r', encoding='utf-8') as f:
-            stats = json.load(f)
-        player_points = {}
-        for player in stats:
-            name = player.get('name')
-            if not name:
-                continue
-            try:
-                player_points[name] = player_points.get(name, 0) + _calc_score(player)
-            except Exception:
-                # Keep going on bad records
-                continue
+
+        player_points = event_totals(stats_path, ruleset)
 
         # Use new storage system
         written = write_json(points_filename, player_points)
         updated.extend(written)
 
     return updated
+
+
+def _rescore_file(args: Tuple[str, Dict, Dict]) -> Tuple[str, Dict[str, float], Dict[str, float]]:
+    """Worker: per-player totals for one stats file under the current and the proposed rules."""
+    path, current_spec, new_spec = args
+    stats = load_stats_table(path)
+    current = _player_totals(stats, compile_rules(current_spec))
+    new = _player_totals(stats, compile_rules(new_spec))
+    return path, current, new
+
+
+def rescore_events(new_spec: Dict, json_dir: str = './json', workers: Optional[int] = None) -> Dict:
+    """What-if rescoring: score every stored *_stats.json under new_spec and the active rules,
+    one process per file, and return a per-event diff report. Nothing is written."""
+    current = active_ruleset()
+    proposed = compile_rules(new_spec)  # fail fast on a bad table before starting workers
+    paths = sorted(
+        os.path.join(json_dir, name) for name in os.listdir(json_dir)
+        if name.endswith('_stats.json')
+    ) if os.path.isdir(json_dir) else []
+
+    events: Dict[str, Dict] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [(path, current.spec, proposed.spec) for path in paths]
+        for path, before, after in pool.map(_rescore_file, jobs):
+            changes = []
+            for name in dict.fromkeys(list(before) + list(after)):
+                old, new = before.get(name, 0), after.get(name, 0)
+                if old != new:
+                    changes.append({'name': name, 'current': old, 'new': new, 'delta': new - old})
+            changes.sort(key=lambda c: (-abs(c['delta']), c['name']))
+            events[os.path.basename(path)[:-len('_stats.json')]] = {
+                'players': len(after),
+                'players_changed': len(changes),
+                'total_current': sum(before.values()),
+                'total_new': sum(after.values()),
+                'changes': changes,
+            }
+
+    return {
+        'current_version': current.version,
+        'new_version': proposed.version,
+        'warnings': {'current': current.warnings, 'new': proposed.warnings},
+        'events': events,
+    }
@@ -0,0 +1,113 @@
+import heapq
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .identity import name_aliases, name_key, player_index
+
+
+# Autocomplete over the roster. Every player row is indexed under its search terms (name key,
+# each word of it, slash-compound parts, the registry spelling and the org), by every prefix of
+# every term and by the trigrams of every term. A query is one dict lookup for prefix hits, and a
+# trigram vote for typo-tolerant matches when prefixes run short; hits are ranked by PPG through
+# the roster's sort order. Updating to a new roster only re-indexes rows whose terms changed.
+
+RowId = Tuple[str, str]  # (event, player name key)
+
+MIN_FUZZY_QUERY = 3
+FUZZY_MIN_SHARE = 0.6
+
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def row_terms(row: dict) -> Tuple[str, ...]:
+    """Normalized strings a roster row can be found by."""
+    name = row.get('name') or ''
+    key = name_key(name)
+    terms = [key, *key.split(), *name_aliases(name)]
+    registry_name = player_index().get(name)
+    if registry_name:
+        terms.extend([name_key(registry_name), *name_aliases(registry_name)])
+    if row.get('team'):
+        terms.append(name_key(row['team']))
+    return tuple(t for t in dict.fromkeys(terms) if t)
+
+
+class SearchIndex:
+    """Prefix and trigram postings over roster rows, kept in step with a roster by update()."""
+
+    def __init__(self) -> None:
+        self.version: Optional[str] = None
+        self._rows: Dict[RowId, dict] = {}
+        self._terms: Dict[RowId, Tuple[str, ...]] = {}
+        self._rank: Dict[RowId, int] = {}
+        self._prefixes: Dict[str, Set[RowId]] = {}
+        self._grams: Dict[str, Set[RowId]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _postings(self, terms: Iterable[str]):
+        for term in terms:
+            for i in range(1, len(term) + 1):
+                yield self._prefixes, term[:i]
+            for gram in _trigrams(term):
+                yield self._grams, gram
+
+    def _add(self, row_id: RowId, terms: Tuple[str, ...]) -> None:
+        self._terms[row_id] = terms
+        for postings, token in self._postings(terms):
+            postings.setdefault(token, set()).add(row_id)
+
+    def _remove(self, row_id: RowId) -> None:
+        for postings, token in self._postings(self._terms.pop(row_id, ())):
+            ids = postings.get(token)
+            if ids is not None:
+                ids.discard(row_id)
+                if not ids:
+                    del postings[token]
+
+    def update(self, roster: List[dict], version: Optional[str] = None) -> int:
+        """Follow a new roster (sorted best first). Returns the number of rows (re)indexed."""
+        rows = {(row['event'], name_key(row['name'])): row for row in roster}
+        changed = 0
+        for row_id in [r for r in self._rows if r not in rows]:
+            self._remove(row_id)
+            del self._rows[row_id]
+            changed += 1
+        for row_id, row in rows.items():
+            terms = row_terms(row)
+            if self._terms.get(row_id) != terms:
+                self._remove(row_id)
+                self._add(row_id, terms)
+                changed += 1
+            self._rows[row_id] = row
+        self._rank = {row_id: i for i, row_id in enumerate(rows)}
+        self.version = version
+        return changed
+
+    def _best(self, ids: Iterable[RowId], limit: int) -> List[RowId]:
+        return heapq.nsmallest(limit, ids, key=self._rank.__getitem__)
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """Rows matching a query, best PPG first: prefix matches of any term, then (for queries of
+        MIN_FUZZY_QUERY+ characters) rows sharing most of the query's trigrams."""
+        q = name_key(query)
+        if not q or limit <= 0:
+            return []
+        hits = self._best(self._prefixes.get(q, ()), limit)
+        results = [dict(self._rows[r], match='prefix') for r in hits]
+        if len(results) >= limit or len(q) < MIN_FUZZY_QUERY:
+            return results
+        grams = _trigrams(q)
+        votes: Dict[RowId, int] = {}
+        for gram in grams:
+            for row_id in self._grams.get(gram, ()):
+                votes[row_id] = votes.get(row_id, 0) + 1
+        taken = set(hits)
+        needed = FUZZY_MIN_SHARE * len(grams)
+        fuzzy = [r for r, v in votes.items() if v >= needed and r not in taken]
+        fuzzy.sort(key=lambda r: (-votes[r], self._rank[r]))
+        results.extend(dict(self._rows[r], match='fuzzy') for r in fuzzy[:limit - len(results)])
+        return results
@@ -1,105 +1,537 @@
 import asyncio
-import json
-import os
+import math
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from fastapi import FastAPI, Response
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
+from .broadcast import Hub
+from .columnar import load_columnar
 from .config import settings, configured_event_urls
-from .pipeline import refresh_event, daily_refresh
-from .scheduler import run_daily
-from .storage import get_storage_stats
+from .generations import (
+    current_generation,
+    generation_file_info,
+    generation_file_path,
+    is_generation_id,
+    list_generation_files,
+    read_generation_delta,
+    read_generation_manifest,
+)
+from .leader import WORKER_ID, is_leader, notify, relay_notifications, run_leader
+from .leagues import standings, submit_teams, team_standing
+from .optimize import DEFAULT_BUDGET, MAX_LINEUPS, ROLE_QUOTAS, optimize_lineups
+from .pipeline import daily_refresh, event_slug, refresh_event, retry_failed_matches
+from .players import PLAYER_FIELDS, build_roster, project, query_roster, roster_inputs
+from .refresh import RefreshCoordinator
+from .scheduler import Cron, FixedRate, Scheduler, iso_time
+from .search import SearchIndex
+from .state import enqueue_refresh_request, get_retry_entries, get_retry_stats, take_refresh_requests
+from .storage import (
+    SIDECAR_SUFFIXES,
+    compress_bytes,
+    compute_content_hash,
+    get_storage_stats,
+    json_dumps,
+    json_loads,
+    list_snapshot_dates,
+    list_snapshot_files,
+    read_snapshot_manifest,
+    reconcile_storage_stats,
+    sidecar_encodings,
+)
+from .teams import load_points_table, parse_teams, score_teams, team_format
 
 
-class Broadcaster:
-    def __init__(self) -> None:
-        self._queue: asyncio.Queue[str] = asyncio.Queue()
+broadcaster = Hub(
+    queue_size=settings.SSE_QUEUE_SIZE,
+    history=settings.SSE_HISTORY,
+    heartbeat_seconds=settings.SSE_HEARTBEAT_SECONDS,
+)
 
-    async def publish(self, message: str) -> None:
-        await self._queue.put(message)
 
-    async def events(self) -> AsyncGenerator[str, None]:
-        while True:
-            msg = await self._queue.get()
-            yield msg
+# Deltas above this size are not worth pushing; clients refetch instead
+MAX_DELTA_BYTES = 64 * 1024
 
 
-broadcaster = Broadcaster()
+def announce_generation(before: Optional[str]) -> None:
+    """Tell stream clients about a newly published generation. Sends the per-player 'delta' the
+    pipeline recorded when it chains from `before`, otherwise a plain 'points-updated' refetch."""
+    gen_id = current_generation()
+    if gen_id is None or gen_id == before:
+        return
+    delta = read_generation_delta(gen_id)
+    if delta is not None and delta.get('base') == before:
+        body = json_dumps(delta)
+        if len(body) <= MAX_DELTA_BYTES:
+            notify(body.decode('utf-8'), 'delta', local=broadcaster.publish)
+            return
+    notify('points-updated', local=broadcaster.publish)
 
 
-async def poller_task() -> None:
+async def poll_job() -> None:
+    before = current_generation()
+    changed, written = await refresh_event()
+    if changed:
+        announce_generation(before)
+
+
+async def _run_refresh(event_url: str, progress) -> Tuple[int, List[str]]:
+    before = current_generation()
+    changed, written = await refresh_event(event_url, progress=progress)
+    if changed:
+        announce_generation(before)
+    return changed, written
+
+
+refresher = RefreshCoordinator(
+    _run_refresh,
+    lambda data, event: notify(data, event, local=broadcaster.publish),
+    debounce_seconds=settings.REFRESH_DEBOUNCE_SECONDS,
+)
+
+
+async def drain_refresh_requests() -> None:
+    """Leader side of /api/refresh calls that landed on other workers."""
     while True:
         try:
-            changed, written = await refresh_event()
-            if changed:
-                await broadcaster.publish('points-updated')
+            for event_url in await asyncio.to_thread(take_refresh_requests):
+                refresher.request(event_url)
         except Exception:
-            # ignore errors, continue polling
             pass
-        await asyncio.sleep(settings.POLL_SECONDS)
+        await asyncio.sleep(settings.NOTIFY_POLL_SECONDS)
+
+
+async def daily_job() -> None:
+    before = current_generation()
+    changed = await daily_refresh(configured_event_urls())
+    if changed:
+        announce_generation(before)
+        notify('daily-snapshot', local=broadcaster.publish)
+
+
+async def retry_job() -> None:
+    before = current_generation()
+    changed, written = await retry_failed_matches()
+    if changed:
+        announce_generation(before)
+
+
+async def reconcile_job() -> None:
+    await asyncio.to_thread(reconcile_storage_stats)
+
+
+scheduler = Scheduler()
+scheduler.add('poll', FixedRate(settings.POLL_SECONDS), poll_job, jitter_seconds=settings.POLL_JITTER_SECONDS)
+if settings.DAILY_RUN:
+    # A daily run missed while no worker was up runs as soon as one is
+    scheduler.add('daily', Cron.daily(settings.DAILY_RUN_AT, settings.TIMEZONE), daily_job, catch_up=True)
+scheduler.add('retry', FixedRate(settings.RETRY_POLL_SECONDS, immediate=False), retry_job)
+# Storage counters are maintained on every write; this only corrects drift
+scheduler.add('reconcile', FixedRate(settings.STATS_RECONCILE_SECONDS, immediate=False), reconcile_job)
+
+
+def start_refresh_tasks() -> List[asyncio.Task]:
+    """Scraping, publishing and storage upkeep; run only by the worker holding the leader lease."""
+    return [asyncio.create_task(scheduler.run()), asyncio.create_task(drain_refresh_requests())]
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-    poll_task = asyncio.create_task(poller_task())
-    daily_task = None
-    if settings.DAILY_RUN:
-        async def daily_job():
-            changed = await daily_refresh(configured_event_urls())
-            if changed:
-                await broadcaster.publish('points-updated')
-                await broadcaster.publish('daily-snapshot')
-            return changed
-        daily_task = asyncio.create_task(run_daily(daily_job, settings.DAILY_RUN_AT, settings.TIMEZONE))
+    # Every worker serves and relays stream messages; one of them (the lease holder) refreshes
+    leader_task = asyncio.create_task(
+        run_leader(start_refresh_tasks, settings.LEADER_LEASE_SECONDS, settings.LEADER_HEARTBEAT_SECONDS))
+    relay_task = asyncio.create_task(relay_notifications(broadcaster.publish, settings.NOTIFY_POLL_SECONDS))
     try:
         yield
     finally:
-        poll_task.cancel()
-        if daily_task:
-            daily_task.cancel()
-        try:
-            await poll_task
-        except Exception:
-            pass
+        for task in (leader_task, relay_task):
+            task.cancel()
+        for task in (leader_task, relay_task):
+            try:
+                await task
+            except BaseException:
+                pass
 
 
 app = FastAPI(lifespan=lifespan)
 
 # Serve only specific static roots to avoid shadowing /api/*
 app.mount('/templates', StaticFiles(directory='templates', html=False), name='templates')
-app.mount('/json', StaticFiles(directory='json', html=False), name='json')
 
 
-@app.get('/api/points')
-async def api_points(event: Optional[str] = None):
-    # mirrors JSON files; simplest is to return combined latest *_points.json for event slug
-    event = event or ''
-    files: List[str] = []
-    for name in os.listdir(settings.JSON_DIR):
-        if name.endswith('_points.json') and (not event or name.startswith(event)):
-            files.append(os.path.join(settings.JSON_DIR, name))
+def _resolve_generation(generation: Optional[str]) -> Optional[str]:
+    """Pinned generation from the request, or the current one."""
+    if generation is None:
+        return current_generation()
+    if not is_generation_id(generation):
+        raise HTTPException(status_code=400, detail='invalid generation id')
+    return generation
+
+
+def _accepted_encodings(request: Request) -> set:
+    """Content codings the client accepts (q > 0)."""
+    accepted = set()
+    for part in request.headers.get('accept-encoding', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _pick_encoding(request: Request, available) -> Optional[str]:
+    accepted = _accepted_encodings(request)
+    for encoding in SIDECAR_SUFFIXES:
+        if encoding in available and (encoding in accepted or '*' in accepted):
+            return encoding
+    return None
+
+
+def _etag(digest: str, encoding: Optional[str]) -> str:
+    # Strong validators must differ per representation, so the coding is part of the tag
+    return f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(',')]
+    return '*' in tags or etag in tags
+
+
+def _validator_headers(etag: str, gen_id: Optional[str]) -> Dict[str, str]:
+    # no-cache: browsers may store the response but must revalidate, which is a cheap 304
+    return {
+        'ETag': etag,
+        'Cache-Control': 'no-cache',
+        'Vary': 'Accept-Encoding',
+        'X-Generation': gen_id or '',
+    }
+
+
+@app.get('/json/{name}')
+async def json_file(name: str, request: Request, generation: Optional[str] = None):
+    gen_id = _resolve_generation(generation)
+    info = generation_file_info(name, gen_id)
+    if info is None:
+        raise HTTPException(status_code=404)
+    encoding = _pick_encoding(request, info['encodings'])
+    headers = _validator_headers(_etag(info['hash'], encoding), gen_id)
+    if _not_modified(request, headers['ETag']):
+        return Response(status_code=304, headers=headers)
+    path = info['path']
+    if encoding:
+        path += SIDECAR_SUFFIXES[encoding]
+        headers['Content-Encoding'] = encoding
+    return FileResponse(path, media_type='application/json', headers=headers)
+
+
+# /api/points responses held in memory as ready-to-send bytes. Bodies are keyed by a digest of
+# the input points files' content hashes, so a new generation only costs a rebuild when the
+# pipeline actually published different points; (generation, event) -> digest is resolved from
+# the manifest without touching the files. Both maps are bounded LRUs since 'event' is free-form.
+POINTS_CACHE_SIZE = 64
+_points_bodies: 'OrderedDict[str, Dict]' = OrderedDict()
+_points_digests: 'OrderedDict[Tuple[Optional[str], str], str]' = OrderedDict()
+
+
+def _cache_put(cache: OrderedDict, key, value) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > POINTS_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def _points_files(gen_id: Optional[str], event: str) -> List[str]:
+    return [
+        name for name in list_generation_files(gen_id)
+        if name.endswith('_points.json') and (not event or name.startswith(event))
+    ]
+
+
+def _points_digest(gen_id: Optional[str], files: List[str]) -> str:
+    """Digest of the merged response, derived from the input files' content hashes."""
+    manifest = read_generation_manifest(gen_id)
+    if manifest is not None:
+        hashes = [[name, manifest['files'][name]['hash']] for name in files]
+    else:
+        hashes = [[name, generation_file_info(name)['hash']] for name in files]
+    return compute_content_hash(hashes)
+
+
+def _encoded_entry(body: bytes, digest: str) -> Dict:
+    """A response body plus its precompressed variants and their ETags."""
+    entry = {'body': {None: body}, 'etag': {None: _etag(digest, None)}}
+    for encoding in sidecar_encodings():
+        entry['body'][encoding] = compress_bytes(body, encoding)
+        entry['etag'][encoding] = _etag(digest, encoding)
+    return entry
+
+
+def _send_entry(request: Request, entry: Dict, gen_id: Optional[str]) -> Response:
+    encoding = _pick_encoding(request, entry['body'])
+    headers = _validator_headers(entry['etag'][encoding], gen_id)
+    if _not_modified(request, headers['ETag']):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return Response(entry['body'][encoding], media_type='application/json', headers=headers)
+
+
+def _build_points_entry(gen_id: Optional[str], files: List[str], digest: str) -> Dict:
     merged = {}
-    for path in files:
+    for name in files:
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                merged.update(json.load(f))
+            with open(generation_file_path(name, gen_id), 'rb') as f:
+                merged.update(json_loads(f.read()))
         except Exception:
             continue
-    return merged
+    return _encoded_entry(json_dumps(merged), digest)
+
+
+@app.get('/api/points')
+async def api_points(request: Request, event: Optional[str] = None, generation: Optional[str] = None):
+    # combined *_points.json for event slug, all read from one generation
+    event = event or ''
+    gen_id = _resolve_generation(generation)
+    key = (gen_id, event)
+    digest = _points_digests.get(key)
+    if digest is None:
+        files = _points_files(gen_id, event)
+        digest = _points_digest(gen_id, files)
+        if gen_id is not None:
+            # Only published generations are immutable; working files are re-hashed every time
+            _cache_put(_points_digests, key, digest)
+    entry = _points_bodies.get(digest)
+    if entry is None:
+        headers = _validator_headers(_etag(digest, _pick_encoding(request, sidecar_encodings())), gen_id)
+        if _not_modified(request, headers['ETag']):
+            # Client is current; answer from the manifest without reading any points file
+            return Response(status_code=304, headers=headers)
+        entry = _build_points_entry(gen_id, _points_files(gen_id, event), digest)
+        _cache_put(_points_bodies, digest, entry)
+    return _send_entry(request, entry, gen_id)
+
+
+# /api/players: the joined roster (app/players.py) is materialized once per digest of its input
+# files and kept sorted; each distinct query's page is then cached as encoded bytes like /api/points.
+_rosters: 'OrderedDict[str, List[dict]]' = OrderedDict()
+_players_bodies: 'OrderedDict[Tuple[str, Tuple], Dict]' = OrderedDict()
+_roster_digests: 'OrderedDict[Optional[str], str]' = OrderedDict()
+MAX_PLAYERS_LIMIT = 1000
+
+
+def _roster(gen_id: Optional[str]) -> Tuple[str, List[dict]]:
+    digest = _roster_digests.get(gen_id)
+    inputs = None
+    if digest is None:
+        inputs = roster_inputs(gen_id)
+        digest = _points_digest(gen_id, [name for _, _, name in inputs])
+        if gen_id is not None:
+            _cache_put(_roster_digests, gen_id, digest)
+    roster = _rosters.get(digest)
+    if roster is None:
+        mapped = load_columnar(gen_id)
+        if mapped is not None:
+            # Published by the leader already joined; no JSON to parse in this worker
+            roster = mapped.roster_rows()
+        else:
+            roster = build_roster(gen_id, inputs if inputs is not None else roster_inputs(gen_id))
+        _cache_put(_rosters, digest, roster)
+    return digest, roster
+
+
+def _split_param(value: Optional[str]) -> Tuple[str, ...]:
+    return tuple(v.strip() for v in (value or '').split(',') if v.strip())
+
+
+# Autocomplete index over the current roster; follows roster changes incrementally
+_search_index = SearchIndex()
+MAX_SEARCH_LIMIT = 50
+
+
+@app.get('/api/players/search')
+async def api_players_search(q: str = '', limit: int = 10, fields: Optional[str] = None,
+                             generation: Optional[str] = None):
+    gen_id = _resolve_generation(generation)
+    field_list = _split_param(fields)
+    unknown = [f for f in field_list if f not in PLAYER_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown fields: {', '.join(unknown)}")
+    digest, roster = _roster(gen_id)
+    if _search_index.version != digest:
+        _search_index.update(roster, digest)
+    results = _search_index.search(q, min(max(limit, 0), MAX_SEARCH_LIMIT))
+    if field_list:
+        results = [dict({f: r[f] for f in field_list}, match=r['match']) for r in results]
+    return Response(json_dumps({'generation': gen_id, 'q': q, 'players': results}),
+                    media_type='application/json', headers={'X-Generation': gen_id or ''})
+
+
+@app.get('/api/players')
+async def api_players(request: Request, role: Optional[str] = None, event: Optional[str] = None,
+                      min_cost: Optional[float] = None, max_cost: Optional[float] = None,
+                      names: Optional[str] = None, fields: Optional[str] = None,
+                      offset: int = 0, limit: int = MAX_PLAYERS_LIMIT, generation: Optional[str] = None):
+    # Roster for the configured events, sorted by PPG; one request replaces the page's per-file fetches
+    gen_id = _resolve_generation(generation)
+    field_list = _split_param(fields)
+    unknown = [f for f in field_list if f not in PLAYER_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown fields: {', '.join(unknown)}")
+    offset = max(offset, 0)
+    limit = min(max(limit, 0), MAX_PLAYERS_LIMIT)
+    query = (role or '', event or '', min_cost, max_cost, _split_param(names), field_list, offset, limit)
+
+    digest, roster = _roster(gen_id)
+    key = (digest, query)
+    entry = _players_bodies.get(key)
+    if entry is None:
+        rows = query_roster(roster, role=role, event=event, min_cost=min_cost, max_cost=max_cost,
+                            names=query[4])
+        body = json_dumps({
+            'generation': gen_id,
+            'total': len(rows),
+            'offset': offset,
+            'limit': limit,
+            'players': project(rows[offset:offset + limit], field_list),
+        })
+        entry = _encoded_entry(body, compute_content_hash([digest, gen_id, list(query)]))
+        _cache_put(_players_bodies, key, entry)
+    return _send_entry(request, entry, gen_id)
+
+
+_optimize_bodies: 'OrderedDict[Tuple[str, Tuple], Dict]' = OrderedDict()
+
+
+@app.get('/api/optimize')
+async def api_optimize(request: Request, budget: float = DEFAULT_BUDGET, k: int = 1,
+                       max_per_org: Optional[int] = None, event: Optional[str] = None,
+                       generation: Optional[str] = None):
+    # Top-k lineups by PPG over the /api/players roster under budget, role quotas and org caps
+    if not math.isfinite(budget) or budget < 0:
+        raise HTTPException(status_code=400, detail='budget must be a non-negative number')
+    if not 1 <= k <= MAX_LINEUPS:
+        raise HTTPException(status_code=400, detail=f'k must be between 1 and {MAX_LINEUPS}')
+    gen_id = _resolve_generation(generation)
+    query = (budget, k, max_per_org, event or '')
+    digest, roster = _roster(gen_id)
+    key = (digest, query)
+    entry = _optimize_bodies.get(key)
+    if entry is None:
+        pool = query_roster(roster, event=event)
+        lineups = optimize_lineups(pool, budget=budget, k=k, max_per_org=max_per_org)
+        body = json_dumps({'generation': gen_id, 'budget': budget, 'quotas': ROLE_QUOTAS, 'lineups': lineups})
+        entry = _encoded_entry(body, compute_content_hash([digest, gen_id, list(query)]))
+        _cache_put(_optimize_bodies, key, entry)
+    return _send_entry(request, entry, gen_id)
+
+
+@app.post('/api/teams/score')
+async def api_teams_score(request: Request, format: Optional[str] = None, breakdown: bool = True,
+                          generation: Optional[str] = None):
+    # Body is NDJSON ({"team", "players"} per line) or CSV (team,player1,...); answers NDJSON in input order
+    gen_id = _resolve_generation(generation)
+    fmt = format or team_format(request.headers.get('content-type'))
+    try:
+        team_ids, rosters = parse_teams(await request.body(), fmt)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    table = load_points_table(gen_id)
+    body = b'\n'.join(json_dumps(r) for r in score_teams(team_ids, rosters, table, breakdown=breakdown))
+    return Response(body + b'\n' if body else body, media_type='application/x-ndjson',
+                    headers={'X-Generation': gen_id or ''})
+
+
+@app.post('/api/leagues/{league_id}/teams')
+async def api_league_teams(league_id: str, request: Request, format: Optional[str] = None):
+    # Add or replace league teams; same NDJSON/CSV bodies as /api/teams/score
+    fmt = format or team_format(request.headers.get('content-type'))
+    try:
+        team_ids, rosters = parse_teams(await request.body(), fmt)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Scoring, the state DB writes and a possible full rescore all block; keep them off the loop
+    return await asyncio.to_thread(submit_teams, league_id, team_ids, rosters)
+
+
+@app.get('/api/leagues/{league_id}/standings')
+async def api_league_standings(league_id: str, top: int = 10, offset: int = 0):
+    result = standings(league_id, top=min(max(top, 0), MAX_PLAYERS_LIMIT), offset=max(offset, 0))
+    if result is None:
+        raise HTTPException(status_code=404)
+    return result
+
+
+@app.get('/api/leagues/{league_id}/teams/{team}')
+async def api_league_team(league_id: str, team: str):
+    result = team_standing(league_id, team)
+    if result is None:
+        raise HTTPException(status_code=404)
+    return result
+
+
+def _resolve_events(event: Optional[str]) -> List[str]:
+    """Configured event URLs matching an event URL or slug (all of them when event is empty)."""
+    urls = configured_event_urls()
+    if not event:
+        return urls
+    return [u for u in urls if event in (u, event_slug(u), event_slug(u).replace('-', '_'))]
+
+
+@app.post('/api/refresh', status_code=202)
+async def api_refresh(event: Optional[str] = None):
+    # Only configured events can be refreshed; progress arrives as 'refresh' events on /api/stream
+    urls = _resolve_events(event)
+    if not urls:
+        raise HTTPException(status_code=404, detail='no configured event matches')
+    if is_leader():
+        return {'leader': True, 'jobs': [refresher.request(u) for u in urls]}
+    for url in urls:
+        await asyncio.to_thread(enqueue_refresh_request, url)
+    return {'leader': False, 'queued': urls}
+
+
+@app.get('/api/refresh')
+async def api_refresh_status():
+    failed = [
+        {'match': url, 'event': event, 'attempts': attempts, 'next_retry': iso_time(next_attempt), 'error': error}
+        for url, event, _, _, _, attempts, next_attempt, error in await asyncio.to_thread(get_retry_entries)
+    ]
+    return dict(refresher.status(), leader=is_leader(), failed_matches=failed)
 
 
 @app.get('/api/status')
 async def api_status():
     stats = get_storage_stats()
+    jobs = await asyncio.to_thread(scheduler.status)
+    retries = await asyncio.to_thread(get_retry_stats)
     return {
         'poll_seconds': settings.POLL_SECONDS,
         'write_policy': stats['write_policy'],
         'json_dir_file_count': stats['json_dir_file_count'],
         'json_dir_bytes': stats['json_dir_bytes'],
-        'last_daily_run': 'N/A',  # TODO: track this in state
+        'generation': current_generation(),
+        'worker': WORKER_ID,
+        'leader': is_leader(),
+        'last_daily_run': (jobs.get('daily') or {}).get('last_run') or 'N/A',
+        'jobs': jobs,
+        'match_failures': {
+            'queued': retries['queued'],
+            'failures': retries['failures'],
+            'oldest_failure': iso_time(retries['oldest_failure']),
+            'next_retry': iso_time(retries['next_attempt']),
+        },
         'files_written': 0,  # TODO: track this in state
         'snapshots_enabled': stats['snapshots_enabled'],
         'snapshot_dir_bytes': stats['snapshot_dir_bytes'],
@@ -108,34 +540,21 @@ async def api_status():
 
 
 @app.get('/api/stream')
-async def api_stream():
-    async def event_gen():
-        async for msg in broadcaster.events():
-            yield f"data: {msg}\n\n"
-    return StreamingResponse(event_gen(), media_type='text/event-stream')
+async def api_stream(request: Request):
+    # Browsers send Last-Event-ID on reconnect; missed messages are replayed from the hub's buffer
+    stream = broadcaster.stream(request.headers.get('last-event-id'))
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return StreamingResponse(stream, media_type='text/event-stream', headers=headers)
 
 
 @app.get('/api/snapshots/latest')
 async def snapshots_latest():
-    root = settings.SNAPSHOT_DIR
-    if not os.path.isdir(root):
-        return {'latest': None}
-    dates = sorted([d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d))])
+    dates = list_snapshot_dates()
     latest = dates[-1] if dates else None
-    meta = None
-    if latest and os.path.exists(os.path.join(root, latest, '_manifest.json')):
-        try:
-            with open(os.path.join(root, latest, '_manifest.json'), 'r', encoding='utf-8') as f:
-                meta = json.load(f)
-        except Exception:
-            meta = None
+    meta = read_snapshot_manifest(latest) if latest else None
     return {'latest': latest, 'manifest': meta}
 
 
 @app.get('/api/snapshots/{date}')
 async def snapshots_by_date(date: str):
-    root = os.path.join(settings.SNAPSHOT_DIR, date)
-    if not os.path.isdir(root):
-        return {'date': date, 'files': []}
-    files = [f for f in os.listdir(root) if f.endswith('.json')]
-    return {'date': date, 'files': files}
+    return {'date': date, 'files': list_snapshot_files(date)}
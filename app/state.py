@@ -1,15 +1,34 @@
 import sqlite3
+import threading
 import time
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 
 DB_PATH = 'data/state.sqlite'
 
 
+# Path whose schema and migrations this process has already applied; after that, every call is
+# just a connect
+_schema_ready: Optional[str] = None
+_schema_lock = threading.Lock()
+
+
 def _ensure_db() -> sqlite3.Connection:
-    import os
-    os.makedirs('data', exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    global _schema_ready
+    if _schema_ready == DB_PATH:
+        return sqlite3.connect(DB_PATH)
+    with _schema_lock:
+        import os
+        os.makedirs('data', exist_ok=True)
+        conn = sqlite3.connect(DB_PATH)
+        if _schema_ready != DB_PATH:
+            _create_schema(conn)
+            conn.commit()
+            _schema_ready = DB_PATH
+        return conn
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS matches (
@@ -43,8 +62,160 @@ def _ensure_db() -> sqlite3.Connection:
         )
         """
     )
-    conn.commit()
-    return conn
+    # Version 1: file_hashes holds the sha256 of the file bytes (it used to hold a canonical-JSON
+    # hash, which is not a blob address); older rows are dropped and recomputed from disk
+    if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+        conn.execute("DELETE FROM file_hashes")
+        conn.execute("PRAGMA user_version = 1")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS storage_counters (
+            scope TEXT PRIMARY KEY,
+            file_count INTEGER,
+            total_bytes INTEGER,
+            updated_at INTEGER
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cost_model (
+            model TEXT PRIMARY KEY,
+            n INTEGER,
+            sum_x REAL,
+            sum_y REAL,
+            sum_xx REAL,
+            sum_xy REAL,
+            updated_at INTEGER
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cost_observations (
+            model TEXT,
+            obs_key TEXT,
+            ppg REAL,
+            cost REAL,
+            updated_at INTEGER,
+            PRIMARY KEY(model, obs_key)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS leagues (
+            league TEXT PRIMARY KEY,
+            generation TEXT,
+            updated_at INTEGER,
+            version INTEGER DEFAULT 0
+        )
+        """
+    )
+    # Bumped on every change to a league's teams or totals, so other workers see their board is stale
+    if 'version' not in {row[1] for row in conn.execute("PRAGMA table_info(leagues)")}:
+        conn.execute("ALTER TABLE leagues ADD COLUMN version INTEGER DEFAULT 0")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS league_teams (
+            league TEXT,
+            team TEXT,
+            players TEXT,
+            total REAL,
+            updated_at INTEGER,
+            PRIMARY KEY(league, team)
+        )
+        """
+    )
+    # Inverted index player -> league teams, so a points change finds the teams it affects
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS league_members (
+            player_key TEXT,
+            league TEXT,
+            team TEXT,
+            PRIMARY KEY(player_key, league, team)
+        )
+        """
+    )
+    # Single-writer lease between server processes (see app/leader.py)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS leases (
+            name TEXT PRIMARY KEY,
+            holder TEXT,
+            expires_at REAL,
+            renewed_at REAL
+        )
+        """
+    )
+    # Cross-process SSE channel: the leader appends, every worker relays to its own clients
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            origin TEXT,
+            event TEXT,
+            data TEXT,
+            created_at REAL
+        )
+        """
+    )
+    # /api/refresh requests received by workers that are not the leader
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS refresh_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_url TEXT,
+            requested_at REAL
+        )
+        """
+    )
+    # Matches whose last refresh failed, retried with exponential backoff (see app/pipeline.py)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS retry_queue (
+            match_url TEXT PRIMARY KEY,
+            event_url TEXT,
+            match_id TEXT,
+            stage TEXT,
+            status TEXT,
+            attempts INTEGER,
+            first_failed_at REAL,
+            last_failed_at REAL,
+            next_attempt_at REAL,
+            last_error TEXT
+        )
+        """
+    )
+    # Scheduler: latest state per job and the history of runs (see app/scheduler.py)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job TEXT PRIMARY KEY,
+            last_scheduled REAL,
+            last_started REAL,
+            last_finished REAL,
+            last_status TEXT,
+            last_error TEXT,
+            next_run REAL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS job_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job TEXT,
+            scheduled_for REAL,
+            started_at REAL,
+            finished_at REAL,
+            status TEXT,
+            error TEXT
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS job_runs_job ON job_runs(job, id)")
 
 
 def get_match_state(match_id: str) -> Optional[Tuple[str, str, str, str, int, int]]:
@@ -135,3 +306,491 @@ def upsert_file_hash(file_path: str, content_hash: str, modified_time: float) ->
     )
     conn.commit()
     conn.close()
+
+
+def get_storage_counters() -> Dict[str, Tuple[int, int]]:
+    """Return scope -> (file_count, total_bytes) for every tracked storage scope."""
+    conn = _ensure_db()
+    cur = conn.execute("SELECT scope, file_count, total_bytes FROM storage_counters")
+    rows = {scope: (files, size) for scope, files, size in cur.fetchall()}
+    conn.close()
+    return rows
+
+
+def adjust_storage_counter(scope: str, files_delta: int, bytes_delta: int) -> None:
+    """Apply a delta to a scope's counters. No-op until the scope has been reconciled once."""
+    if not files_delta and not bytes_delta:
+        return
+    now = int(time.time())
+    conn = _ensure_db()
+    conn.execute(
+        """
+        UPDATE storage_counters
+        SET file_count=file_count+?, total_bytes=total_bytes+?, updated_at=?
+        WHERE scope=?
+        """,
+        (files_delta, bytes_delta, now, scope),
+    )
+    conn.commit()
+    conn.close()
+
+
+def set_storage_counter(scope: str, file_count: int, total_bytes: int) -> None:
+    """Overwrite a scope's counters with measured values."""
+    now = int(time.time())
+    conn = _ensure_db()
+    conn.execute(
+        """
+        INSERT INTO storage_counters(scope, file_count, total_bytes, updated_at)
+        VALUES(?,?,?,?)
+        ON CONFLICT(scope) DO UPDATE SET
+          file_count=excluded.file_count,
+          total_bytes=excluded.total_bytes,
+          updated_at=excluded.updated_at
+        """,
+        (scope, file_count, total_bytes, now),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_cost_model_sums(model: str = 'default') -> Optional[Tuple[int, float, float, float, float]]:
+    """Sufficient statistics (n, sum_x, sum_y, sum_xx, sum_xy) of a cost model, None if never seeded."""
+    conn = _ensure_db()
+    cur = conn.execute(
+        "SELECT n, sum_x, sum_y, sum_xx, sum_xy FROM cost_model WHERE model=?",
+        (model,),
+    )
+    row = cur.fetchone()
+    conn.close()
+    return row
+
+
+def record_cost_observations(observations: Dict[str, Tuple[float, float]], model: str = 'default') -> None:
+    """Upsert keyed (ppg, cost) observations and fold them into the model's sums in one transaction.
+    Re-recording a key replaces its previous observation instead of counting it twice."""
+    now = int(time.time())
+    conn = _ensure_db()
+    dn = dx = dy = dxx = dxy = 0.0
+    for key, (x, y) in observations.items():
+        old = conn.execute(
+            "SELECT ppg, cost FROM cost_observations WHERE model=? AND obs_key=?",
+            (model, key),
+        ).fetchone()
+        if old is not None:
+            if old == (x, y):
+                continue
+            ox, oy = old
+            dn -= 1
+            dx -= ox
+            dy -= oy
+            dxx -= ox * ox
+            dxy -= ox * oy
+        dn += 1
+        dx += x
+        dy += y
+        dxx += x * x
+        dxy += x * y
+        conn.execute(
+            """
+            INSERT INTO cost_observations(model, obs_key, ppg, cost, updated_at)
+            VALUES(?,?,?,?,?)
+            ON CONFLICT(model, obs_key) DO UPDATE SET
+              ppg=excluded.ppg,
+              cost=excluded.cost,
+              updated_at=excluded.updated_at
+            """,
+            (model, key, x, y, now),
+        )
+    conn.execute(
+        """
+        INSERT INTO cost_model(model, n, sum_x, sum_y, sum_xx, sum_xy, updated_at)
+        VALUES(?,?,?,?,?,?,?)
+        ON CONFLICT(model) DO UPDATE SET
+          n=n+excluded.n,
+          sum_x=sum_x+excluded.sum_x,
+          sum_y=sum_y+excluded.sum_y,
+          sum_xx=sum_xx+excluded.sum_xx,
+          sum_xy=sum_xy+excluded.sum_xy,
+          updated_at=excluded.updated_at
+        """,
+        (model, int(dn), dx, dy, dxx, dxy, now),
+    )
+    conn.commit()
+    conn.close()
+
+
+def list_leagues() -> List[Tuple[str, Optional[str]]]:
+    """(league, generation its totals were computed against) for every league."""
+    conn = _ensure_db()
+    rows = conn.execute("SELECT league, generation FROM leagues ORDER BY league").fetchall()
+    conn.close()
+    return rows
+
+
+def get_league_generation(league: str) -> Optional[Tuple[Optional[str], int]]:
+    """(generation its totals were computed against, version) of a league."""
+    conn = _ensure_db()
+    row = conn.execute("SELECT generation, version FROM leagues WHERE league=?", (league,)).fetchone()
+    conn.close()
+    return row
+
+
+def get_league_teams(league: str) -> List[Tuple[str, str, float]]:
+    """(team, players JSON, total) of every team in a league."""
+    conn = _ensure_db()
+    rows = conn.execute(
+        "SELECT team, players, total FROM league_teams WHERE league=?",
+        (league,),
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def get_league_teams_for_players(league: str, player_keys: Iterable[str]) -> List[Tuple[str, str]]:
+    """(team, players JSON) of the league teams that contain any of the players."""
+    conn = _ensure_db()
+    conn.execute("CREATE TEMP TABLE changed_players (player_key TEXT PRIMARY KEY)")
+    conn.executemany("INSERT OR IGNORE INTO changed_players VALUES(?)", ((k,) for k in player_keys))
+    rows = conn.execute(
+        """
+        SELECT t.team, t.players FROM league_teams t
+        WHERE t.league=? AND t.team IN (
+            SELECT m.team FROM league_members m JOIN changed_players c ON c.player_key = m.player_key
+            WHERE m.league=?
+        )
+        """,
+        (league, league),
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def _league_version(conn: sqlite3.Connection, league: str) -> int:
+    return conn.execute("SELECT version FROM leagues WHERE league=?", (league,)).fetchone()[0]
+
+
+def save_league_teams(league: str, teams: Sequence[Tuple[str, str, Sequence[str], float]],
+                      generation: Optional[str]) -> int:
+    """Insert or replace (team, players JSON, player keys, total) entries and their index rows.
+    Returns the league's new version."""
+    now = int(time.time())
+    conn = _ensure_db()
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(
+        """
+        INSERT INTO leagues(league, generation, updated_at, version) VALUES(?,?,?,1)
+        ON CONFLICT(league) DO UPDATE SET version=version+1
+        """,
+        (league, generation, now),
+    )
+    conn.executemany("DELETE FROM league_members WHERE league=? AND team=?", ((league, t[0]) for t in teams))
+    conn.executemany(
+        """
+        INSERT INTO league_teams(league, team, players, total, updated_at) VALUES(?,?,?,?,?)
+        ON CONFLICT(league, team) DO UPDATE SET
+          players=excluded.players,
+          total=excluded.total,
+          updated_at=excluded.updated_at
+        """,
+        ((league, team, players, total, now) for team, players, _, total in teams),
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO league_members(player_key, league, team) VALUES(?,?,?)",
+        ((key, league, team) for team, _, keys, _ in teams for key in keys),
+    )
+    version = _league_version(conn, league)
+    conn.commit()
+    conn.close()
+    return version
+
+
+def set_league_totals(league: str, totals: Dict[str, float], generation: Optional[str]) -> int:
+    """Store recomputed team totals and mark the league as current with a generation. Returns
+    the league's new version."""
+    now = int(time.time())
+    conn = _ensure_db()
+    conn.execute("BEGIN IMMEDIATE")
+    conn.executemany(
+        "UPDATE league_teams SET total=?, updated_at=? WHERE league=? AND team=?",
+        ((total, now, league, team) for team, total in totals.items()),
+    )
+    conn.execute(
+        """
+        INSERT INTO leagues(league, generation, updated_at, version) VALUES(?,?,?,1)
+        ON CONFLICT(league) DO UPDATE SET
+          generation=excluded.generation,
+          updated_at=excluded.updated_at,
+          version=version+1
+        """,
+        (league, generation, now),
+    )
+    version = _league_version(conn, league)
+    conn.commit()
+    conn.close()
+    return version
+
+
+def acquire_lease(name: str, holder: str, ttl: float) -> bool:
+    """Take or renew a lease. True if `holder` owns it for the next `ttl` seconds."""
+    now = time.time()
+    conn = _ensure_db()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            """
+            INSERT INTO leases(name, holder, expires_at, renewed_at) VALUES(?,?,?,?)
+            ON CONFLICT(name) DO UPDATE SET
+              holder=excluded.holder,
+              expires_at=excluded.expires_at,
+              renewed_at=excluded.renewed_at
+            WHERE leases.holder=excluded.holder OR leases.expires_at < ?
+            """,
+            (name, holder, now + ttl, now, now),
+        )
+        row = conn.execute("SELECT holder FROM leases WHERE name=?", (name,)).fetchone()
+        conn.commit()
+    finally:
+        conn.close()
+    return row is not None and row[0] == holder
+
+
+def release_lease(name: str, holder: str) -> None:
+    conn = _ensure_db()
+    conn.execute("DELETE FROM leases WHERE name=? AND holder=?", (name, holder))
+    conn.commit()
+    conn.close()
+
+
+def get_lease(name: str) -> Optional[Tuple[str, float, float]]:
+    """(holder, expires_at, renewed_at) of a lease, expired or not."""
+    conn = _ensure_db()
+    row = conn.execute("SELECT holder, expires_at, renewed_at FROM leases WHERE name=?", (name,)).fetchone()
+    conn.close()
+    return row
+
+
+def add_notifications(origin: str, messages: Sequence[Tuple[str, Optional[str]]], keep_seconds: float = 3600) -> None:
+    """Append (data, event) messages, in order, for every worker's stream clients; drops messages
+    older than keep_seconds."""
+    now = time.time()
+    conn = _ensure_db()
+    conn.executemany(
+        "INSERT INTO notifications(origin, event, data, created_at) VALUES(?,?,?,?)",
+        ((origin, event, data, now) for data, event in messages),
+    )
+    conn.execute("DELETE FROM notifications WHERE created_at < ?", (now - keep_seconds,))
+    conn.commit()
+    conn.close()
+
+
+def get_notifications(after_id: int, limit: int = 100) -> List[Tuple[int, str, Optional[str], str]]:
+    """(id, origin, event, data) of messages after an id, oldest first."""
+    conn = _ensure_db()
+    rows = conn.execute(
+        "SELECT id, origin, event, data FROM notifications WHERE id > ? ORDER BY id LIMIT ?",
+        (after_id, limit),
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def last_notification_id() -> int:
+    conn = _ensure_db()
+    row = conn.execute("SELECT MAX(id) FROM notifications").fetchone()
+    conn.close()
+    return row[0] or 0
+
+
+def enqueue_refresh_request(event_url: str) -> int:
+    conn = _ensure_db()
+    cur = conn.execute(
+        "INSERT INTO refresh_requests(event_url, requested_at) VALUES(?,?)",
+        (event_url, time.time()),
+    )
+    conn.commit()
+    conn.close()
+    return cur.lastrowid
+
+
+def take_refresh_requests() -> List[str]:
+    """Remove and return queued refresh requests (distinct event URLs, oldest first)."""
+    conn = _ensure_db()
+    conn.execute("BEGIN IMMEDIATE")
+    rows = conn.execute("SELECT id, event_url FROM refresh_requests ORDER BY id").fetchall()
+    if rows:
+        conn.execute("DELETE FROM refresh_requests WHERE id <= ?", (rows[-1][0],))
+    conn.commit()
+    conn.close()
+    return list(dict.fromkeys(url for _, url in rows))
+
+
+RetryEntry = Tuple[str, str, str, Optional[str], Optional[str], int, float, Optional[str]]
+
+
+def record_match_failure(match_url: str, event_url: str, match_id: str, stage: Optional[str],
+                         status: Optional[str], error: str, base_seconds: float, max_seconds: float) -> Tuple[int, float]:
+    """Queue (or re-queue) a failed match; the next attempt waits base * 2^(attempts-1), capped at
+    max_seconds. Returns (attempts, next_attempt_at)."""
+    now = time.time()
+    conn = _ensure_db()
+    conn.execute("BEGIN IMMEDIATE")
+    row = conn.execute("SELECT attempts FROM retry_queue WHERE match_url=?", (match_url,)).fetchone()
+    attempts = (row[0] if row else 0) + 1
+    next_attempt = now + min(max_seconds, base_seconds * 2 ** (attempts - 1))
+    conn.execute(
+        """
+        INSERT INTO retry_queue(match_url, event_url, match_id, stage, status, attempts,
+                                first_failed_at, last_failed_at, next_attempt_at, last_error)
+        VALUES(?,?,?,?,?,?,?,?,?,?)
+        ON CONFLICT(match_url) DO UPDATE SET
+          event_url=excluded.event_url,
+          match_id=excluded.match_id,
+          stage=excluded.stage,
+          status=excluded.status,
+          attempts=excluded.attempts,
+          last_failed_at=excluded.last_failed_at,
+          next_attempt_at=excluded.next_attempt_at,
+          last_error=excluded.last_error
+        """,
+        (match_url, event_url, match_id, stage, status, attempts, now, now, next_attempt, error),
+    )
+    conn.commit()
+    conn.close()
+    return attempts, next_attempt
+
+
+def clear_match_failure(match_url: str) -> None:
+    conn = _ensure_db()
+    conn.execute("DELETE FROM retry_queue WHERE match_url=?", (match_url,))
+    conn.commit()
+    conn.close()
+
+
+def get_retry_entries(event_url: Optional[str] = None, due_before: Optional[float] = None) -> List[RetryEntry]:
+    """(match_url, event_url, match_id, stage, status, attempts, next_attempt_at, last_error) of
+    queued matches, optionally only one event's and/or only those due by `due_before`."""
+    sql = "SELECT match_url, event_url, match_id, stage, status, attempts, next_attempt_at, last_error FROM retry_queue"
+    clauses, params = [], []
+    if event_url is not None:
+        clauses.append("event_url=?")
+        params.append(event_url)
+    if due_before is not None:
+        clauses.append("next_attempt_at <= ?")
+        params.append(due_before)
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    conn = _ensure_db()
+    rows = conn.execute(sql + " ORDER BY next_attempt_at", params).fetchall()
+    conn.close()
+    return rows
+
+
+def get_retry_stats() -> Dict[str, Optional[float]]:
+    conn = _ensure_db()
+    queued, failures, oldest, next_attempt = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(attempts), 0), MIN(first_failed_at), MIN(next_attempt_at) FROM retry_queue"
+    ).fetchone()
+    conn.close()
+    return {'queued': queued, 'failures': failures, 'oldest_failure': oldest, 'next_attempt': next_attempt}
+
+
+# Runs kept per job in job_runs
+JOB_HISTORY = 200
+
+
+def _prune_job_runs(conn: sqlite3.Connection, job: str) -> None:
+    # Ids are shared by all jobs, so keep this job's newest rows rather than an id window
+    conn.execute(
+        "DELETE FROM job_runs WHERE job=? AND id NOT IN (SELECT id FROM job_runs WHERE job=? ORDER BY id DESC LIMIT ?)",
+        (job, job, JOB_HISTORY),
+    )
+
+
+def record_job_start(job: str, scheduled_for: float) -> int:
+    now = time.time()
+    conn = _ensure_db()
+    cur = conn.execute(
+        "INSERT INTO job_runs(job, scheduled_for, started_at, status) VALUES(?,?,?,?)",
+        (job, scheduled_for, now, 'running'),
+    )
+    conn.execute(
+        """
+        INSERT INTO jobs(job, last_scheduled, last_started, last_status) VALUES(?,?,?,?)
+        ON CONFLICT(job) DO UPDATE SET
+          last_scheduled=excluded.last_scheduled,
+          last_started=excluded.last_started,
+          last_status=excluded.last_status
+        """,
+        (job, scheduled_for, now, 'running'),
+    )
+    _prune_job_runs(conn, job)
+    conn.commit()
+    conn.close()
+    return cur.lastrowid
+
+
+def record_job_end(run_id: int, status: str, error: Optional[str] = None) -> None:
+    now = time.time()
+    conn = _ensure_db()
+    conn.execute(
+        "UPDATE job_runs SET finished_at=?, status=?, error=? WHERE id=?",
+        (now, status, error, run_id),
+    )
+    conn.execute(
+        """
+        UPDATE jobs SET last_finished=?, last_status=?, last_error=?
+        WHERE job=(SELECT job FROM job_runs WHERE id=?)
+        """,
+        (now, status, error, run_id),
+    )
+    conn.commit()
+    conn.close()
+
+
+def record_job_skipped(job: str, scheduled_for: float, reason: str) -> None:
+    """History row for a firing that did not run; the job's last run stays as it was."""
+    now = time.time()
+    conn = _ensure_db()
+    conn.execute(
+        "INSERT INTO job_runs(job, scheduled_for, started_at, finished_at, status, error) VALUES(?,?,?,?,?,?)",
+        (job, scheduled_for, now, now, 'skipped', reason),
+    )
+    _prune_job_runs(conn, job)
+    conn.commit()
+    conn.close()
+
+
+def set_job_next_run(job: str, next_run: float) -> None:
+    conn = _ensure_db()
+    conn.execute(
+        """
+        INSERT INTO jobs(job, next_run) VALUES(?,?)
+        ON CONFLICT(job) DO UPDATE SET next_run=excluded.next_run
+        """,
+        (job, next_run),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_job_states() -> Dict[str, Dict]:
+    conn = _ensure_db()
+    cur = conn.execute(
+        "SELECT job, last_scheduled, last_started, last_finished, last_status, last_error, next_run FROM jobs"
+    )
+    columns = [c[0] for c in cur.description]
+    rows = {row[0]: dict(zip(columns, row)) for row in cur.fetchall()}
+    conn.close()
+    return rows
+
+
+def get_job_runs(job: str, limit: int = 20) -> List[Tuple]:
+    """(scheduled_for, started_at, finished_at, status, error) of a job's latest runs, newest first."""
+    conn = _ensure_db()
+    rows = conn.execute(
+        "SELECT scheduled_for, started_at, finished_at, status, error FROM job_runs WHERE job=? ORDER BY id DESC LIMIT ?",
+        (job, limit),
+    ).fetchall()
+    conn.close()
+    return rows
@@ -1,13 +1,36 @@
+import gzip
 import hashlib
 import json
 import os
 import shutil
 import tempfile
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 
+try:
+    import brotli  # optional; gzip sidecars are always written
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import orjson  # optional; faster (de)serialization for API responses
+except ImportError:  # pragma: no cover
+    orjson = None
+
 from .config import settings
-from .state import get_file_hash, upsert_file_hash
+from .state import (
+    adjust_storage_counter,
+    get_file_hash,
+    get_storage_counters,
+    set_storage_counter,
+    upsert_file_hash,
+)
+
+# Storage counter scopes kept in the state DB
+JSON_SCOPE = 'json_dir'
+SNAPSHOT_SCOPE = 'snapshots'
 
 
 def compute_content_hash(data: dict) -> str:
@@ -17,12 +40,111 @@ def compute_content_hash(data: dict) -> str:
     return hashlib.sha256(json_str.encode('utf-8')).hexdigest()
 
 
+def _counter_scope(file_path: str) -> Optional[str]:
+    """Which storage counter a file belongs to, if any.
+    json_dir covers top-level *.json in JSON_DIR; snapshots covers everything under SNAPSHOT_DIR."""
+    path = os.path.abspath(file_path)
+    snapshot_root = os.path.abspath(settings.SNAPSHOT_DIR)
+    if path.startswith(snapshot_root + os.sep):
+        return SNAPSHOT_SCOPE
+    if path.endswith('.json') and os.path.dirname(path) == os.path.abspath(settings.JSON_DIR):
+        return JSON_SCOPE
+    return None
+
+
+def _replace_counted(temp_path: str, file_path: str) -> None:
+    """os.replace that keeps the storage counters in step with the change."""
+    old_size = os.path.getsize(file_path) if os.path.exists(file_path) else None
+    os.replace(temp_path, file_path)
+    scope = _counter_scope(file_path)
+    if scope:
+        new_size = os.path.getsize(file_path)
+        if old_size is None:
+            adjust_storage_counter(scope, 1, new_size)
+        else:
+            adjust_storage_counter(scope, 0, new_size - old_size)
+
+
+# Content-Encoding -> sidecar suffix, in server preference order
+SIDECAR_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def sidecar_encodings() -> List[str]:
+    """Encodings this install can produce sidecars for, preferred first."""
+    return [enc for enc in SIDECAR_SUFFIXES if enc != 'br' or brotli is not None]
+
+
+def json_dumps(data) -> bytes:
+    """Compact UTF-8 JSON for API responses (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def json_loads(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def compress_bytes(raw: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(raw)
+    # mtime=0 keeps the output (and anything hashed from it) deterministic
+    return gzip.compress(raw, compresslevel=9, mtime=0)
+
+
+def ensure_sidecars(file_path: str) -> List[str]:
+    """Write compressed sidecars (file.json.gz, file.json.br) next to a JSON file when missing or stale.
+    Returns the encodings available for the file."""
+    src_mtime = os.path.getmtime(file_path)
+    raw = None
+    encodings = []
+    for encoding in sidecar_encodings():
+        sidecar = file_path + SIDECAR_SUFFIXES[encoding]
+        if not os.path.exists(sidecar) or os.path.getmtime(sidecar) < src_mtime:
+            if raw is None:
+                with open(file_path, 'rb') as f:
+                    raw = f.read()
+            with tempfile.NamedTemporaryFile(delete=False, dir=os.path.dirname(file_path) or '.') as f:
+                f.write(compress_bytes(raw, encoding))
+                temp_path = f.name
+            os.replace(temp_path, sidecar)
+        encodings.append(encoding)
+    return encodings
+
+
+def _json_file_bytes(data: dict) -> bytes:
+    """The bytes a JSON output file holds."""
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _bytes_digest(raw: bytes) -> str:
+    """Address of stored bytes: the sha256 of exactly what is on disk (see file_digest)."""
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _write_temp_bytes(dirname: str, raw: bytes) -> str:
+    """Write raw to a temp file in dirname and return its path."""
+    with tempfile.NamedTemporaryFile(delete=False, dir=dirname or '.') as f:
+        f.write(raw)
+        return f.name
+
+
+def _write_temp_json(dirname: str, data: dict) -> str:
+    """Serialize data to a temp file in dirname and return its path."""
+    return _write_temp_bytes(dirname, _json_file_bytes(data))
+
+
 def atomic_write_json(file_path: str, data: dict) -> bool:
     """Write JSON data atomically using temp file then replace.
     Returns True if file was written, False if skipped due to no change."""
+    return atomic_write_bytes(file_path, _json_file_bytes(data))
+
 
-    # Compute content hash
-    content_hash = compute_content_hash(data)
+def atomic_write_bytes(file_path: str, raw: bytes) -> bool:
+    """atomic_write_json for content already serialized."""
+
+    # Hash the bytes that would be written, so the stored hash is also the file's blob address
+    content_hash = _bytes_digest(raw)
 
     # Check if we need to write
     stored = get_file_hash(file_path)
@@ -35,18 +157,14 @@ def atomic_write_json(file_path: str, data: dict) -> bool:
         os.makedirs(dirname, exist_ok=True)
 
     # Write to temp file first
-    temp_dir = os.path.dirname(file_path) if os.path.dirname(file_path) else '.'
-    with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', delete=False, dir=temp_dir) as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-        temp_path = f.name
+    temp_path = _write_temp_bytes(dirname, raw)
 
     try:
         # Atomic replace
-        os.replace(temp_path, file_path)
+        _replace_counted(temp_path, file_path)
 
         # Update stored hash
         upsert_file_hash(file_path, content_hash, os.path.getmtime(file_path))
-        return True
     except Exception:
         # Clean up temp file on error
         try:
@@ -55,10 +173,23 @@ def atomic_write_json(file_path: str, data: dict) -> bool:
             pass
         raise
 
+    # Precompressed copies for the server to negotiate; a failure here must not fail the write
+    if _counter_scope(file_path) == JSON_SCOPE:
+        try:
+            ensure_sidecars(file_path)
+        except Exception:
+            pass
+    return True
+
 
 def write_json(file_path: str, data: dict, policy: str = None) -> List[str]:
     """Write JSON data according to the specified policy.
     Returns list of written file paths."""
+    return write_json_bytes(file_path, _json_file_bytes(data), policy)
+
+
+def write_json_bytes(file_path: str, raw: bytes, policy: str = None) -> List[str]:
+    """write_json for content already serialized (e.g. StatsTable.to_json())."""
 
     policy = policy or settings.WRITE_POLICY
     written_files = []
@@ -66,28 +197,242 @@ def write_json(file_path: str, data: dict, policy: str = None) -> List[str]:
     # Handle special case for files that should be written to repo root
     if os.path.basename(file_path) == 'player_display.json':
         # Write to repo root for compatibility
-        if atomic_write_json(file_path, data):
+        if atomic_write_bytes(file_path, raw):
             written_files.append(file_path)
         return written_files
 
     # Always write to main JSON_DIR if policy is replace or both
+    main_path = os.path.join(settings.JSON_DIR, os.path.basename(file_path))
     if policy in ('replace', 'both'):
-        main_path = os.path.join(settings.JSON_DIR, os.path.basename(file_path))
-        if atomic_write_json(main_path, data):
+        if atomic_write_bytes(main_path, raw):
             written_files.append(main_path)
 
-    # Write to snapshot if policy is snapshot or both, and snapshots are enabled
+    # Record in today's snapshot if policy is snapshot or both, and snapshots are enabled.
+    # Under 'both' the blob is linked from the file we just wrote instead of written again.
     if policy in ('snapshot', 'both') and settings.SNAPSHOT_ENABLE:
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        snapshot_dir = os.path.join(settings.SNAPSHOT_DIR, date_str)
-        snapshot_path = os.path.join(snapshot_dir, os.path.basename(file_path))
-
-        if atomic_write_json(snapshot_path, data):
-            written_files.append(snapshot_path)
+        with _blob_lock:
+            if policy == 'both':
+                digest = store_blob(main_path)
+            else:
+                digest = _store_blob_bytes(raw)
+            manifest_path = record_snapshot({os.path.basename(file_path): digest})
+        if manifest_path:
+            written_files.append(manifest_path)
 
     return written_files
 
 
+# --- Content-addressed snapshot store ---
+#
+# Snapshot days no longer hold copies of the files. Each SNAPSHOT_DIR/<date>/_manifest.json
+# maps file names to content hashes, and the bytes live once in SNAPSHOT_DIR/objects/<hh>/<hash>.
+# A file that did not change between days costs one manifest entry and no copy.
+
+MANIFEST_NAME = '_manifest.json'
+OBJECTS_DIR = 'objects'
+
+# A blob is only referenced once the manifest naming it is written. The garbage sweep holds
+# _blob_lock, as does every store -> record sequence in this process, and it leaves alone any
+# object (or another process's temp file) created or reused within BLOB_GRACE_SECONDS.
+BLOB_GRACE_SECONDS = 600
+_blob_lock = threading.RLock()
+
+
+def _touch(path: str) -> None:
+    # Reusing a blob marks it recent, so a sweep in another process does not delete it before
+    # the manifest that now references it is written. Setting the times to their own values
+    # bumps only ctime: the blob may be a hard link of a live output, whose mtime must not move.
+    try:
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    except OSError:
+        pass
+
+
+def _blob_path(digest: str) -> str:
+    return os.path.join(settings.SNAPSHOT_DIR, OBJECTS_DIR, digest[:2], digest)
+
+
+def file_digest(file_path: str) -> str:
+    """Content hash for a file. Reuses the stored hash when the file is untouched since we wrote it."""
+    stored = get_file_hash(file_path)
+    if stored and stored[2] == os.path.getmtime(file_path):
+        return stored[0]
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            h.update(chunk)
+    return h.hexdigest()  # == _bytes_digest of the contents
+
+
+def store_blob(file_path: str) -> str:
+    """Add a file to the object store and return its content hash.
+    Existing blobs are reused; new ones are hard-linked from the source, or copied if linking fails.
+    Linking is safe because writers always replace files rather than modifying them in place."""
+    digest = file_digest(file_path)
+    blob = _blob_path(digest)
+    if os.path.exists(blob):
+        _touch(blob)
+        return digest
+    os.makedirs(os.path.dirname(blob), exist_ok=True)
+    temp_path = f"{blob}.{os.getpid()}.tmp"
+    try:
+        try:
+            os.link(file_path, temp_path)
+        except OSError:
+            shutil.copyfile(file_path, temp_path)
+        _replace_counted(temp_path, blob)
+    except Exception:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    return digest
+
+
+def _store_blob_bytes(raw: bytes) -> str:
+    """Add content to the object store without a source file. Returns its content hash, which
+    is the same address store_blob gives a file holding these bytes."""
+    digest = _bytes_digest(raw)
+    blob = _blob_path(digest)
+    if os.path.exists(blob):
+        _touch(blob)
+    else:
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        _replace_counted(_write_temp_bytes(os.path.dirname(blob), raw), blob)
+    return digest
+
+
+def read_snapshot_manifest(date_str: str) -> Optional[Dict]:
+    path = os.path.join(settings.SNAPSHOT_DIR, date_str, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def record_snapshot(entries: Dict[str, str], date_str: Optional[str] = None,
+                    events: Optional[List[str]] = None) -> Optional[str]:
+    """Merge name -> content hash entries into a day's manifest.
+    Returns the manifest path, or None if the manifest already had these entries."""
+    date_str = date_str or datetime.now().strftime('%Y-%m-%d')
+    manifest = read_snapshot_manifest(date_str) or {
+        'date': date_str,
+        'events': [],
+        'files': [],
+        'objects': {},
+    }
+    objects = manifest.setdefault('objects', {})
+    new_events = [e for e in (events or []) if e not in manifest['events']]
+    if not new_events and all(objects.get(name) == digest for name, digest in entries.items()):
+        return None
+
+    objects.update(entries)
+    manifest['events'] = manifest['events'] + new_events
+    manifest['files'] = sorted(objects)
+    manifest['generated_at'] = datetime.now().isoformat()
+
+    snapshot_root = os.path.join(settings.SNAPSHOT_DIR, date_str)
+    os.makedirs(snapshot_root, exist_ok=True)
+    manifest_path = os.path.join(snapshot_root, MANIFEST_NAME)
+    _replace_counted(_write_temp_json(snapshot_root, manifest), manifest_path)
+    return manifest_path
+
+
+def snapshot_files(file_paths: List[str], events: Optional[List[str]] = None) -> Optional[str]:
+    """Snapshot existing files into today's manifest. Returns the manifest path if it changed."""
+    with _blob_lock:
+        entries = {os.path.basename(path): store_blob(path) for path in file_paths}
+        return record_snapshot(entries, events=events)
+
+
+def list_snapshot_dates() -> List[str]:
+    """Dates that have a snapshot folder, oldest first."""
+    root = settings.SNAPSHOT_DIR
+    if not os.path.isdir(root):
+        return []
+    dates = []
+    for name in os.listdir(root):
+        try:
+            datetime.strptime(name, '%Y-%m-%d')
+        except ValueError:
+            continue
+        if os.path.isdir(os.path.join(root, name)):
+            dates.append(name)
+    return sorted(dates)
+
+
+def list_snapshot_files(date_str: str) -> List[str]:
+    """File names captured in a day's snapshot (manifest entries plus any legacy copies)."""
+    root = os.path.join(settings.SNAPSHOT_DIR, date_str)
+    if not os.path.isdir(root):
+        return []
+    manifest = read_snapshot_manifest(date_str) or {}
+    files = set(manifest.get('objects', {}))
+    files.update(f for f in os.listdir(root) if f.endswith('.json') and f != MANIFEST_NAME)
+    return sorted(files)
+
+
+def snapshot_file_path(date_str: str, name: str) -> Optional[str]:
+    """Resolve a snapshotted file to the path holding its bytes."""
+    manifest = read_snapshot_manifest(date_str) or {}
+    digest = manifest.get('objects', {}).get(name)
+    if digest:
+        blob = _blob_path(digest)
+        return blob if os.path.exists(blob) else None
+    legacy = os.path.join(settings.SNAPSHOT_DIR, date_str, name)
+    return legacy if os.path.exists(legacy) else None
+
+
+def _collect_garbage_blobs() -> Tuple[int, int]:
+    """Delete blobs no remaining manifest points at, except recent ones that a snapshot may be
+    about to reference. Returns (blobs_deleted, bytes_reclaimed)."""
+    with _blob_lock:
+        return _sweep_blobs()
+
+
+def _sweep_blobs() -> Tuple[int, int]:
+    objects_root = os.path.join(settings.SNAPSHOT_DIR, OBJECTS_DIR)
+    if not os.path.isdir(objects_root):
+        return 0, 0
+    # Anything stored or reused after this may not be in a manifest yet. ctime covers blobs
+    # hard-linked from an older file, whose mtime is the source's.
+    cutoff = time.time() - BLOB_GRACE_SECONDS
+    referenced = set()
+    for date_str in list_snapshot_dates():
+        manifest = read_snapshot_manifest(date_str) or {}
+        referenced.update(manifest.get('objects', {}).values())
+
+    deleted = 0
+    reclaimed = 0
+    for bucket in os.scandir(objects_root):
+        if not bucket.is_dir():
+            continue
+        for entry in os.scandir(bucket.path):
+            if entry.name in referenced:
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            if max(st.st_mtime, st.st_ctime) > cutoff:
+                continue
+            size = st.st_size
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                continue
+            deleted += 1
+            reclaimed += size
+        # Empty buckets stay: another process may be about to store into one
+    adjust_storage_counter(SNAPSHOT_SCOPE, -deleted, -reclaimed)
+    return deleted, reclaimed
+
+
 def cleanup_old_snapshots() -> Tuple[int, int]:
     """Delete snapshot folders older than retention period.
     Returns (folders_deleted, bytes_reclaimed)."""
@@ -102,57 +447,85 @@ def cleanup_old_snapshots() -> Tuple[int, int]:
     if not os.path.exists(settings.SNAPSHOT_DIR):
         return 0, 0
 
-    for folder_name in os.listdir(settings.SNAPSHOT_DIR):
+    for folder_name in list_snapshot_dates():
         folder_path = os.path.join(settings.SNAPSHOT_DIR, folder_name)
-        if not os.path.isdir(folder_path):
-            continue
-
-        try:
-            folder_date = datetime.strptime(folder_name, '%Y-%m-%d')
-            if folder_date < cutoff_date:
-                # Calculate size before deletion
-                folder_size = sum(
-                    os.path.getsize(os.path.join(dirpath, filename))
-                    for dirpath, dirnames, filenames in os.walk(folder_path)
-                    for filename in filenames
-                )
-
-                shutil.rmtree(folder_path)
-                folders_deleted += 1
-                bytes_reclaimed += folder_size
-        except ValueError:
-            # Skip folders that don't match date format
-            continue
+        if datetime.strptime(folder_name, '%Y-%m-%d') < cutoff_date:
+            # Calculate size before deletion (manifest only, unless it is a legacy full copy)
+            folder_files = [
+                os.path.join(dirpath, filename)
+                for dirpath, dirnames, filenames in os.walk(folder_path)
+                for filename in filenames
+            ]
+            folder_size = sum(os.path.getsize(path) for path in folder_files)
+
+            shutil.rmtree(folder_path)
+            adjust_storage_counter(SNAPSHOT_SCOPE, -len(folder_files), -folder_size)
+            folders_deleted += 1
+            bytes_reclaimed += folder_size
+
+    # Blobs only referenced by the deleted days are now garbage
+    _, blob_bytes = _collect_garbage_blobs()
+    bytes_reclaimed += blob_bytes
 
     return folders_deleted, bytes_reclaimed
 
 
-def get_storage_stats() -> Dict:
-    """Get current storage statistics."""
-    stats = {
-        'write_policy': settings.WRITE_POLICY,
-        'snapshots_enabled': settings.SNAPSHOT_ENABLE,
-        'snapshot_retention_days': settings.SNAPSHOT_RETENTION_DAYS,
-    }
+def _measure_storage() -> Dict[str, Tuple[int, int]]:
+    """Walk JSON_DIR and SNAPSHOT_DIR and return scope -> (file_count, total_bytes)."""
+    measured = {}
 
     # JSON_DIR stats
     if os.path.exists(settings.JSON_DIR):
-        json_files = [f for f in os.listdir(settings.JSON_DIR) if f.endswith('.json')]
-        stats['json_dir_file_count'] = len(json_files)
-        stats['json_dir_bytes'] = sum(
-            os.path.getsize(os.path.join(settings.JSON_DIR, f)) for f in json_files
+        json_files = [
+            f for f in os.listdir(settings.JSON_DIR)
+            if f.endswith('.json') and os.path.isfile(os.path.join(settings.JSON_DIR, f))
+        ]
+        measured[JSON_SCOPE] = (
+            len(json_files),
+            sum(os.path.getsize(os.path.join(settings.JSON_DIR, f)) for f in json_files),
         )
     else:
-        stats['json_dir_file_count'] = 0
-        stats['json_dir_bytes'] = 0
+        measured[JSON_SCOPE] = (0, 0)
 
     # Snapshot stats
-    if settings.SNAPSHOT_ENABLE and os.path.exists(settings.SNAPSHOT_DIR):
-        snapshot_bytes = 0
+    snapshot_files_count = 0
+    snapshot_bytes = 0
+    if os.path.exists(settings.SNAPSHOT_DIR):
         for root, dirs, files in os.walk(settings.SNAPSHOT_DIR):
+            snapshot_files_count += len(files)
             snapshot_bytes += sum(os.path.getsize(os.path.join(root, f)) for f in files)
-        stats['snapshot_dir_bytes'] = snapshot_bytes
-    else:
-        stats['snapshot_dir_bytes'] = 0
+    measured[SNAPSHOT_SCOPE] = (snapshot_files_count, snapshot_bytes)
+
+    return measured
+
+
+def reconcile_storage_stats() -> Dict[str, Tuple[int, int]]:
+    """Recount storage from disk and overwrite the persisted counters.
+    Returns scope -> (file_drift, byte_drift) that was corrected."""
+    counters = get_storage_counters()
+    drift = {}
+    for scope, (files, size) in _measure_storage().items():
+        old_files, old_size = counters.get(scope, (0, 0))
+        drift[scope] = (files - old_files, size - old_size)
+        set_storage_counter(scope, files, size)
+    return drift
+
 
-    return stats
+def get_storage_stats() -> Dict:
+    """Get current storage statistics from the persisted counters (O(1), no directory walk).
+    The first call on a fresh state DB reconciles from disk to seed the counters."""
+    counters = get_storage_counters()
+    if JSON_SCOPE not in counters or SNAPSHOT_SCOPE not in counters:
+        reconcile_storage_stats()
+        counters = get_storage_counters()
+
+    json_files, json_bytes = counters[JSON_SCOPE]
+    _, snapshot_bytes = counters[SNAPSHOT_SCOPE]
+    return {
+        'write_policy': settings.WRITE_POLICY,
+        'snapshots_enabled': settings.SNAPSHOT_ENABLE,
+        'snapshot_retention_days': settings.SNAPSHOT_RETENTION_DAYS,
+        'json_dir_file_count': json_files,
+        'json_dir_bytes': json_bytes,
+        'snapshot_dir_bytes': snapshot_bytes if settings.SNAPSHOT_ENABLE else 0,
+    }
@@ -0,0 +1,332 @@
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Player-map stats as typed numpy columns instead of a list of dicts. Strings (player, org, map,
+# match url, series score) are interned in a pool owned by the table and stored as int32 codes;
+# tables derived from one another share it, and concat re-codes through a lookup array only when
+# pools differ. A row costs ~70 bytes instead of the ~1.5KB of a dict with repeated keys;
+# row()/iteration give the dict view old consumers expect, and to_json() writes the stats file
+# straight from the columns.
+
+STRING_COLUMNS = ('name', 'org', 'map_name', 'match_url', 'series_score')
+
+# Numeric columns and their storage type. Integers use the dtype minimum as a null marker,
+# floats use NaN, won_map is int8 with -1 for unknown.
+NUMERIC_COLUMNS: Dict[str, np.dtype] = {
+    'kills': np.dtype(np.int16),
+    'deaths': np.dtype(np.int16),
+    'assists': np.dtype(np.int16),
+    # The app's parser writes PlayerMapStats field names; the scripts write '2K'..'5K', which are
+    # the keys calc_score reads. Both are kept as written, each in its own column.
+    'two_k': np.dtype(np.int16),
+    'three_k': np.dtype(np.int16),
+    'four_k': np.dtype(np.int16),
+    'five_k': np.dtype(np.int16),
+    '2K': np.dtype(np.int16),
+    '3K': np.dtype(np.int16),
+    '4K': np.dtype(np.int16),
+    '5K': np.dtype(np.int16),
+    'r2_0': np.dtype(np.float64),
+    'won_map': np.dtype(np.int8),
+    'map_differential': np.dtype(np.int16),
+    'overall_rank': np.dtype(np.int16),
+    'score': np.dtype(np.float64),
+}
+
+NULL_CODE = -1
+# Code of a string the pool has never seen: matches no stored code, not even NULL_CODE
+MISSING_CODE = -2
+
+
+def _null(dtype: np.dtype):
+    if dtype == np.int8:
+        return -1
+    if dtype.kind == 'f':
+        return np.nan
+    return np.iinfo(dtype).min
+
+
+class StringPool:
+    """Append-only string interning: value <-> dense int code."""
+
+    def __init__(self) -> None:
+        self.values: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return NULL_CODE
+        code = self._index.get(value)
+        if code is None:
+            code = len(self.values)
+            self._index[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: Optional[str]) -> int:
+        """Code of a value without interning it (MISSING_CODE if the pool has not seen it)."""
+        if value is None:
+            return NULL_CODE
+        return self._index.get(value, MISSING_CODE)
+
+    def get(self, code: int) -> Optional[str]:
+        return None if code == NULL_CODE else self.values[code]
+
+    def recode(self, codes: np.ndarray, target: 'StringPool') -> np.ndarray:
+        """Codes of this pool as codes of `target`, interning what target lacks."""
+        # One entry per string of this pool, plus a trailing NULL_CODE that NULL_CODE (-1) lands on
+        lut = np.array([target.code(v) for v in self.values] + [NULL_CODE], dtype=np.int32)
+        return lut[codes]
+
+
+class StatsTable:
+    """Columnar player-map stats. Only columns present in the source rows are stored."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], extras: Optional[Dict[int, dict]] = None,
+                 invalid: Optional[np.ndarray] = None, pool: Optional[StringPool] = None) -> None:
+        self.columns = columns
+        self.pool = pool if pool is not None else StringPool()
+        # Per-row values that do not fit a column (unknown keys, unparseable numbers), by row index
+        self.extras = extras or {}
+        lengths = {len(c) for c in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError('StatsTable columns must have equal length')
+        self._len = lengths.pop() if lengths else 0
+        self.invalid = invalid if invalid is not None else np.zeros(self._len, dtype=bool)
+
+    # --- construction ---
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> 'StatsTable':
+        pool = StringPool()
+        staging: Dict[str, list] = {}
+        extras: Dict[int, dict] = {}
+        invalid: List[int] = []
+        n = 0
+        for i, row in enumerate(rows):
+            n = i + 1
+            for key, value in row.items():
+                if key in STRING_COLUMNS:
+                    if value is not None and not isinstance(value, str):
+                        extras.setdefault(i, {})[key] = value
+                        value = None
+                    if key not in staging:
+                        staging[key] = [NULL_CODE] * i
+                    staging[key].append(pool.code(value))
+                elif key in NUMERIC_COLUMNS:
+                    dtype = NUMERIC_COLUMNS[key]
+                    try:
+                        if value is None:
+                            value = _null(dtype)
+                        elif key == 'won_map':
+                            value = int(bool(value))
+                        elif dtype.kind == 'i':
+                            value = int(value)
+                            if not np.iinfo(dtype).min < value <= np.iinfo(dtype).max:
+                                raise ValueError(value)
+                        else:
+                            value = float(value)
+                    except (TypeError, ValueError, OverflowError):
+                        extras.setdefault(i, {})[key] = value
+                        invalid.append(i)
+                        value = _null(dtype)
+                    if key not in staging:
+                        staging[key] = [_null(dtype)] * i
+                    staging[key].append(value)
+                else:
+                    extras.setdefault(i, {})[key] = value
+            # Pad columns this row did not mention
+            for key, values in staging.items():
+                if len(values) < n:
+                    values.append(NULL_CODE if key in STRING_COLUMNS else _null(NUMERIC_COLUMNS[key]))
+        columns = {
+            key: np.array(values, dtype=np.int32 if key in STRING_COLUMNS else NUMERIC_COLUMNS[key])
+            for key, values in staging.items()
+        }
+        mask = np.zeros(n, dtype=bool)
+        mask[invalid] = True
+        if not columns and n:
+            columns['name'] = np.full(n, NULL_CODE, dtype=np.int32)
+        return cls(columns, extras, mask, pool)
+
+    @classmethod
+    def concat(cls, tables: Sequence['StatsTable']) -> 'StatsTable':
+        tables = [t for t in tables if len(t)]
+        if not tables:
+            return cls({})
+        keys = list(dict.fromkeys(k for t in tables for k in t.columns))
+        pools = {id(t.pool): t.pool for t in tables}
+        pool = tables[0].pool if len(pools) == 1 else StringPool()
+        columns = {}
+        for key in keys:
+            dtype = np.dtype(np.int32) if key in STRING_COLUMNS else NUMERIC_COLUMNS[key]
+            fill = NULL_CODE if key in STRING_COLUMNS else _null(dtype)
+            parts = []
+            for t in tables:
+                if key not in t.columns:
+                    parts.append(np.full(len(t), fill, dtype=dtype))
+                elif key in STRING_COLUMNS and t.pool is not pool:
+                    parts.append(t.pool.recode(t.columns[key], pool))
+                else:
+                    parts.append(t.columns[key])
+            columns[key] = np.concatenate(parts)
+        extras = {}
+        offset = 0
+        for t in tables:
+            extras.update({offset + i: e for i, e in t.extras.items()})
+            offset += len(t)
+        return cls(columns, extras, np.concatenate([t.invalid for t in tables]), pool)
+
+    def take(self, mask_or_index: np.ndarray) -> 'StatsTable':
+        """Rows selected by a boolean mask or index array."""
+        index = np.arange(self._len)[mask_or_index]
+        remap = {int(old): new for new, old in enumerate(index) if int(old) in self.extras}
+        return StatsTable(
+            {key: col[index] for key, col in self.columns.items()},
+            {new: self.extras[old] for old, new in remap.items()},
+            self.invalid[index],
+            self.pool,
+        )
+
+    # --- column access ---
+
+    def __len__(self) -> int:
+        return self._len
+
+    def has(self, key: str) -> bool:
+        return key in self.columns
+
+    def has_key(self, key: str) -> bool:
+        """True if any row carries the key, as a column or among the extras."""
+        return key in self.columns or any(key in extra for extra in self.extras.values())
+
+    def codes(self, key: str) -> np.ndarray:
+        """Interned codes of a string column (NULL_CODE for missing)."""
+        if key not in self.columns:
+            return np.full(self._len, NULL_CODE, dtype=np.int32)
+        return self.columns[key]
+
+    def strings(self, key: str) -> List[Optional[str]]:
+        return [self.pool.get(c) for c in self.codes(key).tolist()]
+
+    def numeric(self, key: str, fill: float = 0.0) -> np.ndarray:
+        """A numeric column as float64 with nulls replaced by fill."""
+        if key not in self.columns:
+            return np.full(self._len, fill, dtype=np.float64)
+        col = self.columns[key]
+        dtype = NUMERIC_COLUMNS[key]
+        values = col.astype(np.float64)
+        if dtype.kind == 'f':
+            values[np.isnan(values)] = fill
+        else:
+            values[col == _null(dtype)] = fill
+        return values
+
+    def present(self, key: str) -> np.ndarray:
+        """True where a column holds a value (not null)."""
+        if key not in self.columns:
+            return np.zeros(self._len, dtype=bool)
+        col = self.columns[key]
+        if key in STRING_COLUMNS:
+            return col != NULL_CODE
+        dtype = NUMERIC_COLUMNS[key]
+        return ~np.isnan(col) if dtype.kind == 'f' else col != _null(dtype)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(col.nbytes for col in self.columns.values()) + self.invalid.nbytes
+
+    # --- dict view ---
+
+    def row(self, i: int) -> dict:
+        out = {}
+        for key, col in self.columns.items():
+            value = col[i].item()
+            if key in STRING_COLUMNS:
+                value = self.pool.get(value)
+            else:
+                dtype = NUMERIC_COLUMNS[key]
+                if (dtype.kind == 'f' and value != value) or (dtype.kind != 'f' and value == _null(dtype)):
+                    value = None
+                elif key == 'won_map':
+                    value = bool(value)
+            out[key] = value
+        if i in self.extras:
+            out.update(self.extras[i])
+        return out
+
+    def __getitem__(self, i: int) -> dict:
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError(i)
+        return self.row(i)
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(self._len):
+            yield self.row(i)
+
+    def to_rows(self) -> List[dict]:
+        return list(self)
+
+    def _json_cells(self, key: str) -> List[str]:
+        """'    "key": value' for every row, as json.dumps(indent=2) would lay out a row dict."""
+        prefix = f"    {json.dumps(key, ensure_ascii=False)}: "
+        col = self.columns[key]
+        if key in STRING_COLUMNS:
+            # Encode each distinct string once; the trailing entry is what NULL_CODE (-1) picks
+            lut = [prefix + json.dumps(v, ensure_ascii=False) for v in self.pool.values] + [prefix + 'null']
+            return [lut[c] for c in col.tolist()]
+        dtype = NUMERIC_COLUMNS[key]
+        if key == 'won_map':
+            words = {1: 'true', 0: 'false', -1: 'null'}
+            return [prefix + words[1 if v > 0 else v] for v in col.tolist()]
+        if dtype.kind == 'f':
+            return [prefix + ('null' if v != v else json.dumps(v)) for v in col.tolist()]
+        null = _null(dtype)
+        return [prefix + ('null' if v == null else str(v)) for v in col.tolist()]
+
+    def to_json(self) -> bytes:
+        """The rows as a JSON list, byte-for-byte what json.dumps(self.to_rows(), indent=2,
+        ensure_ascii=False) gives, built column by column instead of through row dicts."""
+        if not self._len:
+            return b'[]'
+        cells = [self._json_cells(key) for key in self.columns]
+        rows = []
+        for i, row_cells in enumerate(zip(*cells)):
+            if i in self.extras:
+                # Rare rows with values outside the columns go through the dict view
+                text = json.dumps(self.row(i), indent=2, ensure_ascii=False)
+                rows.append('\n'.join('  ' + line for line in text.split('\n')))
+            else:
+                rows.append('  {\n' + ',\n'.join(row_cells) + '\n  }')
+        return ('[\n' + ',\n'.join(rows) + '\n]').encode('utf-8')
+
+
+@lru_cache(maxsize=64)
+def _load_cached(path: str, mtime_ns: int, size: int) -> StatsTable:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return StatsTable.from_rows(r for r in data if isinstance(r, dict))
+
+
+def load_stats_table(path: str) -> StatsTable:
+    """Load a *_stats.json as a StatsTable, reusing the parsed table while the file is unchanged.
+    Callers must treat the result as read-only."""
+    st = os.stat(path)
+    return _load_cached(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+def group_codes(codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Dense group ids in first-seen order for an array of interned codes.
+    Returns (group_of_row, code_of_group)."""
+    uniques, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rank[inverse], uniques[order]
@@ -0,0 +1,191 @@
+import csv
+import io
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .columnar import load_columnar
+from .generations import current_generation, generation_file_info, generation_file_path, list_generation_files
+from .identity import name_key
+from .storage import json_loads
+
+
+# Bulk fantasy-team scoring. A league submits rosters as NDJSON ({"team": id, "players": [...]})
+# or CSV (team,player1,player2,...); every player name is resolved to a row of the points table
+# once per batch, and team totals are a single gather + row sum over an (n_teams, roster) code
+# matrix, so scoring cost is dominated by parsing the input, not by the lookups.
+
+POINTS_SUFFIX = '_points.json'
+
+
+class PointsTable:
+    """Player total points over arrays sorted by name key, so lookups are a binary search and the
+    arrays can be memory-mapped (app/columnar.py). values[len(names)] is a zero slot for unknown
+    players."""
+
+    def __init__(self, names: np.ndarray, keys: np.ndarray, values: np.ndarray) -> None:
+        self.names = names
+        self.keys = keys
+        self.values = values
+        self.unknown = len(names)
+
+    @classmethod
+    def from_points(cls, points: Dict[str, float]) -> 'PointsTable':
+        names = list(points)
+        keys = [name_key(n) for n in names]
+        order = sorted(range(len(names)), key=lambda i: (keys[i], i))
+        values = np.zeros(len(names) + 1, dtype=np.float64)
+        values[:-1] = [float(points[names[i]] or 0) for i in order]
+        return cls(np.array([names[i] for i in order], dtype=str),
+                   np.array([keys[i] for i in order], dtype=str), values)
+
+    def index(self, name: str) -> int:
+        key = name_key(name)
+        lo = int(np.searchsorted(self.keys, key, side='left'))
+        hi = int(np.searchsorted(self.keys, key, side='right'))
+        if lo == hi:
+            return self.unknown
+        # Several spellings can share a key; the exact one wins, else the first published
+        for i in range(lo, hi):
+            if self.names[i] == name:
+                return i
+        return lo
+
+
+def merge_points(paths: Iterable[str]) -> Dict[str, float]:
+    """Union of *_points.json files; later files win, as in /api/points."""
+    merged: Dict[str, float] = {}
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                merged.update(json_loads(f.read()))
+        except (OSError, TypeError, ValueError):
+            continue
+    return merged
+
+
+def _points_inputs(gen_id: Optional[str]) -> Tuple[Tuple[str, str], ...]:
+    inputs = []
+    for name in list_generation_files(gen_id):
+        if name.endswith(POINTS_SUFFIX):
+            info = generation_file_info(name, gen_id)
+            if info is not None:
+                inputs.append((name, info['hash']))
+    return tuple(inputs)
+
+
+@lru_cache(maxsize=8)
+def _points_table(gen_id: Optional[str], inputs: Tuple[Tuple[str, str], ...]) -> PointsTable:
+    mapped = load_columnar(gen_id or current_generation())
+    if mapped is not None:
+        return mapped.points_table()
+    return PointsTable.from_points(merge_points(generation_file_path(name, gen_id) for name, _ in inputs))
+
+
+def load_points_table(gen_id: Optional[str] = None) -> PointsTable:
+    """Merged *_points.json of a generation (the /api/points view), rebuilt only when they change.
+    Published generations map their columnar snapshot instead of parsing JSON."""
+    return _points_table(gen_id, _points_inputs(gen_id))
+
+
+def _text_lines(data) -> Iterator[str]:
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode('utf-8-sig')
+    if isinstance(data, str):
+        data = io.StringIO(data)
+    for line in data:
+        yield line.decode('utf-8') if isinstance(line, bytes) else line
+
+
+def parse_teams(data, fmt: str = 'ndjson') -> Tuple[List[str], List[List[str]]]:
+    """(team ids, rosters) from NDJSON or CSV text, bytes or lines. A team without an id is named by
+    its line number. Raises ValueError with the line number on a malformed record."""
+    team_ids: List[str] = []
+    rosters: List[List[str]] = []
+    if fmt == 'csv':
+        for lineno, row in enumerate(csv.reader(_text_lines(data)), 1):
+            cells = [c.strip() for c in row]
+            if not any(cells) or (lineno == 1 and cells[0].lower() == 'team'):
+                continue
+            team_ids.append(cells[0] or str(lineno))
+            rosters.append([c for c in cells[1:] if c])
+        return team_ids, rosters
+    if fmt != 'ndjson':
+        raise ValueError(f"unknown team format {fmt!r}")
+    for lineno, line in enumerate(_text_lines(data), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json_loads(line)
+        except ValueError:
+            raise ValueError(f"line {lineno}: invalid JSON")
+        players = record.get('players') if isinstance(record, dict) else None
+        if not isinstance(players, list) or not all(isinstance(p, str) for p in players):
+            raise ValueError(f"line {lineno}: expected {{\"team\": ..., \"players\": [names]}}")
+        team_ids.append(str(record.get('team', lineno)))
+        rosters.append(players)
+    return team_ids, rosters
+
+
+def _number(value: float):
+    return int(value) if value.is_integer() else round(value, 2)
+
+
+class _CodeMemo(dict):
+    """name -> table index, resolving each distinct spelling once (leagues reuse a few hundred names)."""
+
+    def __init__(self, table: PointsTable) -> None:
+        super().__init__()
+        self.table = table
+
+    def __missing__(self, name: str) -> int:
+        code = self[name] = self.table.index(name)
+        return code
+
+
+def score_teams(team_ids: Sequence[str], rosters: Sequence[Sequence[str]], table: PointsTable,
+                breakdown: bool = True) -> Iterator[dict]:
+    """Score every roster against the points table. Yields {team, total[, players, unknown]} in input
+    order; players is [[name, points], ...] as submitted, unknown lists names not in the table."""
+    n = len(rosters)
+    lengths = np.fromiter(map(len, rosters), dtype=np.int64, count=n)
+    width = int(lengths.max()) if n else 0
+    flat = [name for roster in rosters for name in roster]
+    flat_codes = np.fromiter(map(_CodeMemo(table).__getitem__, flat), dtype=np.int32, count=len(flat))
+    # (n_teams, width) code matrix, short rosters padded with the zero slot; row-major fill keeps order
+    filled = np.arange(width) < lengths[:, None]
+    codes = np.full((n, width), table.unknown, dtype=np.int32)
+    codes[filled] = flat_codes
+    points = table.values[codes]
+    totals = points.sum(axis=1)
+    integral = bool(np.all(table.values == np.round(table.values)))
+
+    if not breakdown:
+        if integral:
+            yield from ({'team': t, 'total': v} for t, v in zip(team_ids, totals.astype(np.int64).tolist()))
+        else:
+            yield from ({'team': t, 'total': _number(v)} for t, v in zip(team_ids, totals.tolist()))
+        return
+    has_unknown = set(np.flatnonzero(((codes == table.unknown) & filled).any(axis=1)).tolist())
+    if integral:
+        point_rows, totals = points.astype(np.int64).tolist(), totals.astype(np.int64).tolist()
+    else:
+        point_rows = [[_number(p) for p in row] for row in points.tolist()]
+        totals = [_number(v) for v in totals.tolist()]
+    for i, (team, roster) in enumerate(zip(team_ids, rosters)):
+        record = {'team': team, 'total': totals[i], 'players': [list(pair) for pair in zip(roster, point_rows[i])]}
+        if i in has_unknown:
+            record['unknown'] = [name for name in roster if table.index(name) == table.unknown]
+        yield record
+
+
+def team_format(path_or_type: Optional[str], default: str = 'ndjson') -> str:
+    """'csv' or 'ndjson' from a file name or content type."""
+    value = (path_or_type or '').lower()
+    if value.endswith('.csv') or 'csv' in value:
+        return 'csv'
+    if value.endswith(('.ndjson', '.jsonl')) or 'ndjson' in value or 'jsonl' in value:
+        return 'ndjson'
+    return default
@@ -1,9 +1,7 @@
 from typing import Dict, List
 import re
 
-from bs4 import BeautifulSoup
-
-from .http import http
+from .http import http, parse_html
 from .models import MatchMeta
 
 
@@ -16,7 +14,7 @@ async def get_stage_matchlist_urls(event_url: str) -> Dict[str, str]:
         print(f'Failed to fetch {event_url} (status {resp.status_code})')
         return {}
 
-    soup = BeautifulSoup(resp.text, 'html.parser')
+    soup = parse_html(resp.text)
 
     # Find the Matches tab link
     matches_tab = None
@@ -35,7 +33,7 @@ async def get_stage_matchlist_urls(event_url: str) -> Dict[str, str]:
         print(f'Failed to fetch {matches_url} (status {resp2.status_code})')
         return {}
 
-    soup2 = BeautifulSoup(resp2.text, 'html.parser')
+    soup2 = parse_html(resp2.text)
 
     # Find all stage links in the stage dropdown
     stage_urls = {}
@@ -67,7 +65,7 @@ async def extract_list_match_urls(stage_url: str) -> List[str]:
         print(f'Failed to fetch {stage_url} (status {resp.status_code})')
         return []
 
-    soup = BeautifulSoup(resp.text, 'html.parser')
+    soup = parse_html(resp.text)
     match_urls = set()
 
     for a in soup.find_all('a', class_='wf-module-item'):
@@ -1,11 +1,11 @@
 import hashlib
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from bs4 import BeautifulSoup
-
-from .http import http
+from .http import http, parse_html
+from .identity import NameIndex, vlr_player_id
 from .models import MapStats, PlayerMapStats
+from .table import StatsTable
 
 
 async def fetch_match(match_url: str) -> Tuple[str, str]:
@@ -25,7 +25,7 @@ def content_hash(*html_parts: str) -> str:
 
 
 def parse_overview_for_maps(match_url: str, overview_html: str) -> List[Tuple[int, str]]:
-    soup = BeautifulSoup(overview_html, 'html.parser')
+    soup = parse_html(overview_html)
     map_blocks = soup.find_all('div', class_='vm-stats-game')
     maps = []
     for block in map_blocks:
@@ -41,9 +41,9 @@ def parse_overview_for_maps(match_url: str, overview_html: str) -> List[Tuple[in
 
 def parse_performance_all(perf_html_all: str) -> Dict[str, Dict[str, int]]:
     """Parse performance(all) multikills per player.
-    Returns dict name -> { '2K': int, '3K': int, '4K': int, '5K': int, 'r2_0': float? }
+    Returns dict name -> { '2K': int, '3K': int, '4K': int, '5K': int, 'r2_0': float?, 'vlr_id': str? }
     """
-    soup = BeautifulSoup(perf_html_all, 'html.parser')
+    soup = parse_html(perf_html_all)
     # Find all advanced stats tables; infer structure like original scripts
     result: Dict[str, Dict[str, int]] = {}
     for table in soup.find_all('table', class_='mod-adv-stats'):
@@ -62,6 +62,9 @@ def parse_performance_all(perf_html_all: str) -> Dict[str, Dict[str, int]]:
                 except Exception:
                     return 0
             result.setdefault(name, {})
+            vlr_id = _row_player_id(row)
+            if vlr_id:
+                result[name]['vlr_id'] = vlr_id
             result[name]['2K'] = safe_int(2)
             result[name]['3K'] = safe_int(3)
             result[name]['4K'] = safe_int(4)
@@ -86,15 +89,23 @@ def parse_performance_all(perf_html_all: str) -> Dict[str, Dict[str, int]]:
     return result
 
 
-def parse_maps_with_players(match_url: str, overview_html: str, perf_all: Dict[str, Dict[str, int]]) -> List[MapStats]:
-    soup = BeautifulSoup(overview_html, 'html.parser')
+def _row_player_id(row) -> Optional[str]:
+    link = row.find('a', href=True)
+    return vlr_player_id(link['href']) if link else None
+
+
+def _iter_player_rows(overview_html: str, perf_all: Dict[str, Dict[str, int]]) -> Iterator[Tuple[int, Optional[str], dict]]:
+    """Yield (map_num, map_name, row) for every player row of every map block in the overview."""
+    soup = parse_html(overview_html)
+    # Overview and performance tabs spell names independently; join on vlr id, then name key
+    perf_index: NameIndex = NameIndex()
+    for perf_name, perf in perf_all.items():
+        perf_index.add(perf_name, perf_name, vlr_id=perf.get('vlr_id'))
     map_blocks = [b for b in soup.find_all('div', class_='vm-stats-game') if b.get('data-game-id') != 'all']
-    results: List[MapStats] = []
     for idx, block in enumerate(map_blocks, start=1):
         map_name_div = block.find('div', class_='map')
         map_name = map_name_div.text.strip().split('\n')[0].strip() if map_name_div else None
         kda_tables = block.find_all('table')
-        players: List[PlayerMapStats] = []
         for t_idx, kda_table in enumerate(kda_tables):
             kda_tbodies = kda_table.find_all('tbody')
             for tbody in kda_tbodies:
@@ -111,21 +122,54 @@ def parse_maps_with_players(match_url: str, overview_html: str, perf_all: Dict[s
                             return int(row.find('td', class_=span_class).find('span', class_='mod-both').text.strip())
                         except Exception:
                             return 0
-                    kills = num('mod-vlr-kills')
-                    assists = num('mod-vlr-assists')
-                    deaths = num('mod-vlr-deaths')
-                    pm = PlayerMapStats(
-                        name=name,
-                        kills=kills,
-                        deaths=deaths,
-                        assists=assists,
-                        two_k=perf_all.get(name, {}).get('2K', 0),
-                        three_k=perf_all.get(name, {}).get('3K', 0),
-                        four_k=perf_all.get(name, {}).get('4K', 0),
-                        five_k=perf_all.get(name, {}).get('5K', 0),
-                        r2_0=perf_all.get(name, {}).get('r2_0'),
-                    )
-                    players.append(pm)
-        # match_id not parsed here; callers should set
-        results.append(MapStats(match_id='', map_num=idx, map_name=map_name, players=players))
+                    perf_name = perf_index.get(name, _row_player_id(row))
+                    perf = perf_all.get(perf_name, {}) if perf_name is not None else {}
+                    yield idx, map_name, {
+                        'name': name,
+                        'kills': num('mod-vlr-kills'),
+                        'deaths': num('mod-vlr-deaths'),
+                        'assists': num('mod-vlr-assists'),
+                        'two_k': perf.get('2K', 0),
+                        'three_k': perf.get('3K', 0),
+                        'four_k': perf.get('4K', 0),
+                        'five_k': perf.get('5K', 0),
+                        'r2_0': perf.get('r2_0'),
+                    }
+
+
+def parse_maps_with_players(match_url: str, overview_html: str, perf_all: Dict[str, Dict[str, int]]) -> List[MapStats]:
+    results: List[MapStats] = []
+    by_map: Dict[int, MapStats] = {}
+    for map_num, map_name, row in _iter_player_rows(overview_html, perf_all):
+        if map_num not in by_map:
+            # match_id not parsed here; callers should set
+            by_map[map_num] = MapStats(match_id='', map_num=map_num, map_name=map_name, players=[])
+            results.append(by_map[map_num])
+        by_map[map_num].players.append(PlayerMapStats(
+            name=row['name'],
+            kills=row['kills'],
+            deaths=row['deaths'],
+            assists=row['assists'],
+            two_k=row['two_k'],
+            three_k=row['three_k'],
+            four_k=row['four_k'],
+            five_k=row['five_k'],
+            r2_0=row['r2_0'],
+        ))
     return results
+
+
+# PlayerMapStats fields, in order, so *_stats.json rows keep the keys and layout they had when
+# they were dumped from the models; fields the page parse does not fill stay null
+ROW_FIELDS = tuple(PlayerMapStats.model_fields)
+
+
+def parse_match_table(match_url: str, overview_html: str, perf_all: Dict[str, Dict[str, int]]) -> StatsTable:
+    """Parse a match straight into a StatsTable (one row per player-map), skipping the pydantic models."""
+    rows = []
+    for _, map_name, parsed in _iter_player_rows(overview_html, perf_all):
+        row = {key: parsed.get(key) for key in ROW_FIELDS}
+        row['map_name'] = map_name
+        row['match_url'] = match_url
+        rows.append(row)
+    return StatsTable.from_rows(rows)
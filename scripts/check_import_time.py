@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the app's entry points.
+Imports each module in a fresh interpreter with `python -X importtime`, fails if its cumulative
+import time exceeds the budget or if it pulled in a dependency that should load lazily.
+Run from the project root with: python scripts/check_import_time.py [--scale 2.0]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module -> (budget in ms, modules that must not be imported with it)
+BUDGETS = {
+    'app.cli': (30, ('pydantic', 'uvicorn', 'numpy', 'bs4', 'httpx', 'player_info')),
+    'app.models': (300, ('player_info', 'agents_to_roles')),
+    'app.costs': (600, ('sklearn', 'bs4', 'player_info')),
+    'app.server': (1500, ('uvicorn', 'bs4', 'sklearn', 'player_info')),
+}
+
+
+def measure(module):
+    """(cumulative import ms, set of top-level modules loaded) for one cold import."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([ROOT, os.path.join(ROOT, 'scripts'), env.get('PYTHONPATH', '')])
+    code = f"import sys, {module}; print(','.join(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"{module}: import failed\n{proc.stderr[-2000:]}")
+    cumulative_us = 0
+    for line in proc.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        parts = [p.strip() for p in line[len('import time:'):].split('|')]
+        if parts[2] == module:
+            cumulative_us = int(parts[1])
+    loaded = set(proc.stdout.strip().split(','))
+    return cumulative_us / 1000, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every budget (slow machines/CI)')
+    args = parser.parse_args()
+
+    failures = []
+    for module, (budget_ms, forbidden) in BUDGETS.items():
+        ms, loaded = measure(module)
+        leaked = sorted(set(forbidden) & loaded)
+        limit = budget_ms * args.scale
+        ok = ms <= limit and not leaked
+        print(f"{'✓' if ok else '✗'} {module}: {ms:.1f}ms (budget {limit:.0f}ms)"
+              + (f", eagerly imports {', '.join(leaked)}" if leaked else ''))
+        if not ok:
+            failures.append(module)
+    if failures:
+        raise SystemExit(f"Import budget exceeded: {', '.join(failures)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,196 +1,17 @@
-import numpy as np
-from sklearn.linear_model import LinearRegression
+import os
+import sys
 
-data = [
-    [13, 3, 3, 19, 9.5, 10],
-    [10, 3, 4, 17, 8.5, 7],
-    [6, 3, 1, 10, 5, 7],
-    [6, 3, 0, 9, 4.5, 5.5],
-    [5, 3, 0, 8, 4, 6.5],
-    [24, 10, 8, 42, 10.5, 12],
-    [13, 10, 2, 25, 6.3, 7],
-    [13, 10, 1, 24, 6.0, 7.5],
-    [10, 10, 2, 22, 5.5, 7],
-    [10, 10, 0, 20, 5.0, 6.5],
-    [29, 8, 3, 40, 13.3, 14],
-    [24, 8, 5, 37, 12.3, 11.5],
-    [19, 8, 4, 31, 10.3, 9.5],
-    [11, 8, 2, 21, 7.0, 8.5],
-    [11, 8, 0, 19, 6.3, 8],
-    [15, 5, 2, 22, 7.3, 8],
-    [13, 5, 3, 21, 7.0, 8],
-    [11, 5, 4, 20, 6.7, 8],
-    [10, 5, 1, 16, 5.3, 7],
-    [7, 5, 0, 12, 4.0, 10.5],
-    [22, 16, 1, 39, 9.8, 15],
-    [20, 16, 2, 38, 9.5, 9],
-    [14, 16, 4, 34, 8.5, 11.5],
-    [15, 16, 3, 34, 8.5, 8.5],
-    [12, 16, 5, 33, 8.3, 9],
-    [30, 13, 7, 50, 10.0, 8.5],
-    [31, 13, 5, 49, 9.8, 9],
-    [31, 13, 4, 48, 9.6, 9],
-    [31, 13, 0, 44, 8.8, 11.5],
-    [25, 13, 0, 38, 7.6, 8.5],
-    [17, 7, 1, 25, 8.3, 13.5],
-    [12, 7, 2, 21, 7.0, 11.5],
-    [10, 7, 3, 20, 6.7, 11.5],
-    [12, 7, 1, 20, 6.7, 12.5],
-    [7, 7, 0, 14, 4.7, 9],
-    [39, 13, 9, 61, 15.25, 12],
-    [31, 13, 5, 49, 12.25, 9.5],
-    [21, 13, 3, 37, 9.25, 8.5],
-    [19, 13, 3, 35, 8.75, 8],
-    [20, 13, 0, 33, 8.25, 8.5],
-    [28, 10, 6, 44, 11.0, 14],
-    [31, 10, 0, 41, 10.3, 12.5],
-    [21, 10, 1, 32, 8.0, 11.5],
-    [14, 10, 3, 27, 6.8, 8.5],
-    [15, 10, 0, 25, 6.3, 8.5],
-    [26, 6, 3, 35, 8.8, 13.5],
-    [16, 6, 2, 24, 6.0, 8.5],
-    [15, 6, 3, 24, 6.0, 9],
-    [12, 6, 0, 18, 4.5, 8.5],
-    [6, 6, 0, 12, 3.0, 7.5],
-    [12, 3, 1, 16, 8, 6.5],
-    [8, 3, 2, 13, 6.5, 11],
-    [6, 3, 0, 9, 4.5, 7],
-    [5, 3, 0, 8, 4, 8],
-    [3, 3, 0, 6, 3, 7],
-    [9, 0, 0, 9, 4.5, 10.5],
-    [6, 0, 0, 6, 3.0, 6],
-    [6, 0, 0, 6, 3.0, 6.5],
-    [4, 0, 0, 4, 2.0, 5.5],
-    [3, 0, 0, 3, 1.5, 5.5],
-    [17, 1, 2, 20, 10, 10.5],
-    [8, 1, 0, 9, 4.5, 6.5],
-    [7, 1, 0, 8, 4, 6],
-    [7, 1, 0, 8, 4, 6.5],
-    [4, 1, 0, 5, 2.5, 5],
-    [28, 7, 6, 41, 10.25, 9.5],
-    [26, 7, 1, 34, 8.5, 8.5],
-    [21, 7, 2, 30, 7.5, 12],
-    [17, 7, 3, 27, 6.75, 8],
-    [14, 7, 0, 21, 5.25, 8],
-    [27, 10, 7, 44, 11.0, 13.5],
-    [22, 10, 3, 35, 8.8, 12.5],
-    [16, 10, 4, 30, 7.5, 10.5],
-    [12, 10, 4, 26, 6.5, 7.5],
-    [12, 10, 0, 22, 5.5, 8],
-    [28, 12, 2, 42, 10.5, 13],
-    [20, 12, 5, 37, 9.3, 10.5],
-    [11, 12, 3, 26, 6.5, 9],
-    [11, 12, 0, 23, 5.8, 8.5],
-    [8, 12, 1, 21, 5.3, 8],
-    [20, 4, 2, 26, 8.7, 9],
-    [18, 4, 3, 25, 8.3, 11],
-    [13, 4, 2, 19, 6.3, 8],
-    [11, 4, 0, 15, 5, 7.5],
-    [8, 4, 0, 12, 4, 7],
-    [19, 6, 3, 28, 9.3, 8.5],
-    [19, 6, 0, 25, 8.3, 11.5],
-    [16, 6, 3, 25, 8.3, 9],
-    [14, 6, 0, 20, 6.7, 8],
-    [12, 6, 0, 18, 6, 8.5],
-    [11, 0, 2, 13, 6.5, 9],
-    [10, 0, 0, 10, 5, 7],
-    [7, 0, 0, 7, 3.5, 7],
-    [6, 0, 0, 6, 3, 5.5],
-    [6, 0, 0, 6, 3, 6],
-    [24, 12, 4, 40, 10, 10.5],
-    [16, 12, 6, 34, 8.5, 7.5],
-    [15, 12, 1, 28, 7, 8.5],
-    [12, 12, 1, 25, 6.25, 7],
-    [4, 12, 0, 16, 4, 7],
-    [15, 2, 1, 18, 9, 8.5],
-    [11, 2, 0, 13, 6.5, 8.5],
-    [9, 2, 0, 11, 5.5, 10],
-    [8, 2, 0, 10, 5, 7],
-    [5, 2, 0, 7, 3.5, 6],
-    [13, 9, 3, 25, 8.3, 13],
-    [10, 9, 3, 22, 7.3, 11],
-    [9, 9, 3, 21, 7.0, 11],
-    [8, 9, 0, 17, 5.7, 11],
-    [7, 9, 1, 17, 5.7, 8.5],
-    [43, 18, 14, 75, 12.5, 12],
-    [34, 18, 3, 55, 9.2, 12],
-    [28, 18, 5, 51, 8.5, 9.5],
-    [28, 18, 1, 47, 7.8, 9],
-    [19, 18, 2, 39, 6.5, 8.5],
-    [19, 15, 6, 40, 13.3, 15],
-    [12, 15, 6, 33, 11.0, 11],
-    [13, 15, 3, 31, 10.3, 10.5],
-    [13, 15, 2, 30, 10.0, 10.5],
-    [7, 15, 0, 22, 7.3, 11],
-    [19, 8, 5, 32, 10.7, 11.5],
-    [20, 8, 1, 29, 9.7, 9.5],
-    [17, 8, 2, 27, 9.0, 12],
-    [9, 8, 0, 17, 5.7, 8.5],
-    [6, 8, 0, 14, 4.7, 7],
-    [6, 6, 2, 14, 4.7, 5.5],
-    [6, -2, 1, 5, 2.5, 5.5],
-    [5, -2, 0, 3, 1.5, 5.5],
-    [4, -2, 0, 2, 1.0, 8.5],
-    [0, -2, 0, -2, -1.0, 5],
-    [18, 6, 2, 26, 8.7, 7.5],
-    [19, 6, 0, 25, 8.3, 13.5],
-    [9, 6, 3, 18, 6.0, 7.5],
-    [9, 6, 0, 15, 5.0, 7.5],
-    [6, 6, 0, 12, 4.0, 6.5],
-    [10, 5, 1, 16, 5.3, 10],
-    [8, 5, 3, 16, 5.3, 7],
-    [10, 5, 0, 15, 5.0, 7.5],
-    [8, 5, 0, 13, 4.3, 7],
-    [8, 5, 0, 13, 4.3, 8],
-    [13, 6, 3, 22, 7.3, 10],
-    [10, 6, 2, 18, 6.0, 6.5],
-    [8, 6, 0, 14, 4.7, 7],
-    [7, 6, 0, 13, 4.3, 5],
-    [1, -2, 0, -1, -0.5, 6],
-    [18, 17, 8, 43, 14.3, 13],
-    [14, 17, 3, 34, 11.3, 15],
-    [11, 17, 5, 33, 11.0, 12],
-    [9, 17, 4, 30, 10.0, 11],
-    [8, 17, 0, 25, 8.3, 9.5],
-    [27, 19, 5, 51, 10.2, 9.5],
-    [22, 19, 7, 48, 9.6, 8.5],
-    [19, 19, 6, 44, 8.8, 13],
-    [21, 19, 1, 41, 8.2, 9],
-    [14, 19, 0, 33, 6.6, 8],
-    [15, 8, 4, 27, 9.0, 9.5],
-    [14, 8, 1, 23, 7.7, 13],
-    [12, 8, 2, 22, 7.3, 9],
-    [10, 8, 2, 20, 6.7, 8.5],
-    [10, 8, 1, 19, 6.3, 8.5],
-    [26, 10, 9, 45, 11.3, 13],
-    [19, 10, 2, 31, 7.8, 10],
-    [19, 10, 2, 31, 7.8, 9.5],
-    [10, 10, 1, 21, 5.3, 7.5],
-    [10, 10, 0, 20, 5.0, 8],
-    [39, 14, 13, 66, 13.2, 15],
-    [22, 14, 0, 36, 7.2, 8.5],
-    [19, 14, 3, 36, 7.2, 8.5],
-    [20, 14, 1, 35, 7.0, 8.5],
-    [13, 14, 0, 27, 5.4, 8],
-    [39, 3, 7, 49, 16.3, 14],
-    [17, 3, 4, 24, 8.0, 10.5],
-    [15, 3, 2, 20, 6.7, 8.5],
-    [12, 3, 2, 17, 5.7, 8.5],
-    [8, 3, 0, 11, 3.7, 6],
-    [20, 4, 2, 26, 8.7, 15],
-    [10, 4, 3, 17, 5.7, 8.5],
-    [12, 4, 0, 16, 5.3, 9],
-    [12, 4, 0, 16, 5.3, 8.5],
-    [10, 4, 1, 15, 5.0, 9],
-]
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Use only PPG (Points Per Game, 5th column) as the independent variable
-X = np.array([[row[4]] for row in data])  # PPG as a 2D array
-y = np.array([row[5] for row in data])    # Cost
+from player_info import players
+from app.costs import cost_model, fit_cost_model
 
-# Fit linear regression
-reg = LinearRegression().fit(X, y)
-a = reg.coef_[0]
-b = reg.intercept_
+# Use only PPG (Points Per Game) as the independent variable, Cost as the target
+rows = [(p['PPG'], p['Cost']) for p in players.values() if 'PPG' in p and 'Cost' in p]
 
-print(f"Cost = {a:.2f}*PPG + {b:.2f}")
+a, b = fit_cost_model(rows)
+print(f"Registry fit:   Cost = {a:.2f}*PPG + {b:.2f}  ({len(rows)} players)")
+
+# The pipeline's model: registry seed plus the PPG observed on every refresh
+a, b = cost_model()
+print(f"Pipeline model: Cost = {a:.2f}*PPG + {b:.2f}")
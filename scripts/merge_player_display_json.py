@@ -1,8 +1,12 @@
 import json
-from player_info import players
+import os
+import sys
 
-# Build a lowercase-name-to-info mapping for robust matching
-players_lower = {k.lower(): v for k, v in players.items()}
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Case, "(IGL)" suffixes and slash compounds like "yoman/Ash" all resolve through the index
+from app.identity import registry_entry
 
 with open("player_costs.json") as f:
     costs = json.load(f)
@@ -10,8 +14,7 @@ with open("player_costs.json") as f:
 merged = []
 for p in costs:
     name = p["name"]
-    # Try to match by lowercase name
-    info = players_lower.get(name.lower())
+    info = registry_entry(name)
     role = info["Role"] if info and "Role" in info else None
     merged.append({
         "name": name,
@@ -1,10 +1,15 @@
 import requests
 from bs4 import BeautifulSoup
 import json
+import os
 import re
+import sys
 import time
 from score_calc import calc_score
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.identity import name_key
+
 # 1. Scrape all playoff match URLs from the event page
 event_url = "https://www.vlr.gg/event/2282/valorant-masters-toronto-2025"
 headers = {'User-Agent': 'Mozilla/5.0'}
@@ -100,6 +105,8 @@ def scrape_match(overview_url):
 
         kda_tables = map_block.find_all('table')
         player_stats = {}
+        # name_key -> player_stats key, so the multikill tab's spelling joins in O(1)
+        stats_names = {}
         map_name = map_block.find('div', class_='map').text.strip() if map_block.find('div', class_='map') else 'Unknown'
         map_name = map_name.strip().split('\n')[0].strip()
 
@@ -127,6 +134,7 @@ def scrape_match(overview_url):
                         kills = int(kills_tag.find('span', class_='mod-both').text.strip())
                         assists = int(assists_tag.find('span', class_='mod-both').text.strip())
                         deaths = int(deaths_tag.find('span', class_='mod-both').text.strip())
+                        stats_names[name_key(name)] = name
                         player_stats[name] = {
                             'name': name,
                             'kills': kills,
@@ -160,11 +168,7 @@ def scrape_match(overview_url):
                 three_k = safe_int(cells[3]) if len(cells) > 3 else 0
                 four_k = safe_int(cells[4]) if len(cells) > 4 else 0
                 five_k = safe_int(cells[5]) if len(cells) > 5 else 0
-                matched_name = None
-                for existing_name in player_stats.keys():
-                    if name.lower() == existing_name.lower():
-                        matched_name = existing_name
-                        break
+                matched_name = stats_names.get(name_key(name))
                 if matched_name:
                     player_stats[matched_name].update({
                         '2K': two_k,
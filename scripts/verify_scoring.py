@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Check the vectorized scoring engine against calc_score and time it.
+Compares every json/*_stats.json plus a randomized sample covering all scoring branches, both
+row by row and as the per-player totals compute_points writes (through StatsTable), then
+scores 10^6 synthetic player-maps.
+Run from the project root with: python scripts/verify_scoring.py
+"""
+
+import glob
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from score_calc import calc_score
+from app.scoring import event_totals, score_columns, score_rows
+from app.table import StatsTable
+
+NAMES = ['alpha', 'bravo', 'charlie', 'delta', 'echo']
+
+
+def random_row(rng):
+    return {
+        'name': rng.choice(NAMES),
+        'kills': rng.choice([None, 0, 1, 3, 4, 5, 9, 10, 14, 15, 27, 40]),
+        '4K': rng.choice([None, 0, 0, 1, 2]),
+        '5K': rng.choice([None, 0, 0, 0, 1]),
+        # Keys written by the app's parser; calc_score does not read them
+        'four_k': rng.choice([None, 0, 1, 2]),
+        'five_k': rng.choice([None, 0, 1]),
+        'won_map': rng.choice([None, False, True]),
+        'map_differential': rng.choice([None, -13, -12, -10, -9, -5, 0, 4, 5, 9, 10, 12, 13]),
+        'series_score': rng.choice([None, '', '2-0', '0-2', '2-1', '3-0', '3-1', '3-2', '1-3']),
+        'r2_0': rng.choice([None, 0.0, 0.8, 1.49, 1.5, 1.6, 1.75, 1.9, 2.0, 2.4]),
+        'overall_rank': rng.choice([None, 0, 1, 2, 3, 4, 10]),
+    }
+
+
+def compare(rows, label):
+    expected = np.array([calc_score(r) for r in rows], dtype=np.int64)
+    for path_label, source in (('rows', rows), ('StatsTable', StatsTable.from_rows(rows))):
+        actual, valid = score_rows(source)
+        assert valid.all(), f"{label}: rows rejected by the vectorized engine ({path_label})"
+        mismatches = np.flatnonzero(expected != actual)
+        if len(mismatches):
+            i = int(mismatches[0])
+            raise SystemExit(f"{label} ({path_label}): {len(mismatches)} mismatches, first {rows[i]} -> {expected[i]} vs {actual[i]}")
+    print(f"✓ {label}: {len(rows)} rows identical")
+
+
+def compare_totals(path, label):
+    """Per-player totals of a stats file as compute_points writes them, against calc_score."""
+    with open(path, encoding='utf-8') as f:
+        rows = [r for r in json.load(f) if isinstance(r, dict)]
+    expected = defaultdict(int)
+    for r in rows:
+        if r.get('name'):
+            expected[r['name']] += calc_score(r)
+    actual = event_totals(path)
+    if actual != dict(expected):
+        diff = {n: (expected.get(n), actual.get(n)) for n in set(expected) | set(actual) if expected.get(n) != actual.get(n)}
+        raise SystemExit(f"{label}: totals differ for {len(diff)} players, e.g. {next(iter(diff.items()))}")
+    print(f"✓ {label}: {len(actual)} player totals identical")
+
+
+def main():
+    for path in sorted(glob.glob('json/*_stats.json')):
+        with open(path, encoding='utf-8') as f:
+            rows = [r for r in json.load(f) if isinstance(r, dict)]
+        compare(rows, path)
+        compare_totals(path, path)
+
+    rng = random.Random(0)
+    sample = [random_row(rng) for _ in range(200_000)]
+    compare(sample, 'randomized sample')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sample_stats.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(sample, f)
+        compare_totals(path, 'randomized sample')
+
+    n = 1_000_000
+    gen = np.random.default_rng(0)
+    columns = {
+        'kills': gen.integers(0, 40, n),
+        '4K': gen.integers(0, 3, n),
+        '5K': gen.integers(0, 2, n),
+        'won_map': gen.integers(0, 2, n).astype(bool),
+        'map_differential': gen.integers(-13, 14, n),
+        'series_score': gen.integers(0, 4, n).astype(np.int8),
+        'r2_0': gen.uniform(0, 2.5, n),
+        'overall_rank': gen.integers(0, 11, n),
+    }
+    start = time.perf_counter()
+    score_columns(columns)
+    print(f"Scored {n} player-maps in {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == '__main__':
+    main()